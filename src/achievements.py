@@ -0,0 +1,250 @@
+"""
+Event-driven unlocks and achievements.
+
+The engine publishes typed events (a challenge was completed, an attempt failed, a hint was
+used, the level changed). Each rule declares which events it listens to, so publishing an
+event only runs the rules subscribed to that event type - adding rules for other events
+doesn't make completions any slower.
+"""
+from collections import deque
+from typing import Callable, Dict, List, Type
+from challenge import Category
+
+
+class Event:
+    """Base class for everything the engine publishes"""
+
+
+class ChallengeCompleted(Event):
+    def __init__(self, challenge_id: str, category: str, score: int, time_taken: float,
+                 hints_used: int, attempts: int):
+        self.challenge_id = challenge_id
+        self.category = category
+        self.score = score
+        self.time_taken = time_taken
+        self.hints_used = hints_used
+        self.attempts = attempts
+
+
+class AttemptFailed(Event):
+    def __init__(self, challenge_id: str):
+        self.challenge_id = challenge_id
+
+
+class HintUsed(Event):
+    def __init__(self, challenge_id: str):
+        self.challenge_id = challenge_id
+
+
+class LevelChanged(Event):
+    def __init__(self, old_level: int, new_level: int):
+        self.old_level = old_level
+        self.new_level = new_level
+
+
+class Unlock:
+    """Something the player just earned - a level, a category or an achievement"""
+
+    def __init__(self, kind: str, id: str, title: str, description: str = ""):
+        self.kind = kind
+        self.id = id
+        self.title = title
+        self.description = description
+
+    def __repr__(self):
+        return f"Unlock({self.kind!r}, {self.id!r})"
+
+
+class Rule:
+    """A rule reacts to the event types in `events` and may unlock things or emit new events"""
+
+    id = "rule"
+    events: tuple = ()
+    one_shot = True  # Stop evaluating once earned
+
+    def evaluate(self, event: Event, progress: dict, state: dict,
+                 emit: Callable[[Event], None]) -> List[Unlock]:
+        raise NotImplementedError
+
+
+class LevelRule(Rule):
+    """Level up every `per_level` completed challenges"""
+
+    id = "level"
+    events = (ChallengeCompleted,)
+    one_shot = False
+
+    def __init__(self, per_level: int = 3):
+        self.per_level = per_level
+
+    def evaluate(self, event, progress, state, emit):
+        new_level = len(progress["completed_challenges"]) // self.per_level + 1
+        old_level = progress["current_level"]
+        if new_level <= old_level:
+            return []
+        progress["current_level"] = new_level
+        emit(LevelChanged(old_level, new_level))
+        return [Unlock("level", f"level_{new_level}", f"Level {new_level}")]
+
+
+class CategoryUnlockRule(Rule):
+    """Unlock a category once the player reaches a level"""
+
+    events = (LevelChanged,)
+
+    def __init__(self, category: Category, level: int):
+        self.category = category
+        self.level = level
+        self.id = f"unlock_{category.value}"
+
+    def evaluate(self, event, progress, state, emit):
+        if event.new_level < self.level or self.category.value in progress["unlocked_categories"]:
+            return []
+        progress["unlocked_categories"].append(self.category.value)
+        return [Unlock("category", self.category.value, self.category.value.replace('_', ' ').title())]
+
+
+class Achievement(Rule):
+    """Base for named achievements"""
+
+    def __init__(self, id: str, title: str, description: str):
+        self.id = id
+        self.title = title
+        self.description = description
+
+    def earned(self) -> List[Unlock]:
+        return [Unlock("achievement", self.id, self.title, self.description)]
+
+
+class MilestoneAchievement(Achievement):
+    """Complete `count` challenges in total"""
+
+    events = (ChallengeCompleted,)
+
+    def __init__(self, id, title, description, count: int):
+        super().__init__(id, title, description)
+        self.count = count
+
+    def evaluate(self, event, progress, state, emit):
+        return self.earned() if len(progress["completed_challenges"]) >= self.count else []
+
+
+class FirstTryStreakAchievement(Achievement):
+    """`length` challenges in a row solved without a failed attempt"""
+
+    events = (ChallengeCompleted, AttemptFailed)
+
+    def __init__(self, id, title, description, length: int):
+        super().__init__(id, title, description)
+        self.length = length
+
+    def evaluate(self, event, progress, state, emit):
+        if isinstance(event, AttemptFailed):
+            state["streak"] = 0
+            return []
+        state["streak"] = state.get("streak", 0) + 1 if event.attempts <= 1 else 0
+        return self.earned() if state["streak"] >= self.length else []
+
+
+class NoHintsAchievement(Achievement):
+    """`count` challenges in a row completed without using a hint"""
+
+    events = (ChallengeCompleted,)
+
+    def __init__(self, id, title, description, count: int):
+        super().__init__(id, title, description)
+        self.count = count
+
+    def evaluate(self, event, progress, state, emit):
+        state["run"] = state.get("run", 0) + 1 if event.hints_used == 0 else 0
+        return self.earned() if state["run"] >= self.count else []
+
+
+class SpeedAchievement(Achievement):
+    """Complete a challenge in under `seconds`"""
+
+    events = (ChallengeCompleted,)
+
+    def __init__(self, id, title, description, seconds: float):
+        super().__init__(id, title, description)
+        self.seconds = seconds
+
+    def evaluate(self, event, progress, state, emit):
+        return self.earned() if event.time_taken < self.seconds else []
+
+
+class CategoryMasteryAchievement(Achievement):
+    """Complete `count` challenges in one category"""
+
+    events = (ChallengeCompleted,)
+
+    def __init__(self, id, title, description, category: Category, count: int):
+        super().__init__(id, title, description)
+        self.category = category
+        self.count = count
+
+    def evaluate(self, event, progress, state, emit):
+        if event.category != self.category.value:
+            return []
+        state["count"] = state.get("count", 0) + 1
+        return self.earned() if state["count"] >= self.count else []
+
+
+def default_rules() -> List[Rule]:
+    """Progression and achievements used by the game"""
+    return [
+        LevelRule(per_level=3),
+        # Unlock new categories as player progresses - don't want to overwhelm beginners
+        CategoryUnlockRule(Category.DATA_STRUCTURES, level=2),
+        CategoryUnlockRule(Category.ALGORITHMS, level=4),
+        CategoryUnlockRule(Category.PROBLEM_SOLVING, level=6),
+        CategoryUnlockRule(Category.OPTIMIZATION, level=7),
+        CategoryUnlockRule(Category.DEBUGGING, level=8),
+        CategoryUnlockRule(Category.LEETCODE, level=10),
+        MilestoneAchievement("first_steps", "First Steps", "Complete your first challenge", count=1),
+        MilestoneAchievement("ten_down", "Ten Down", "Complete 10 challenges", count=10),
+        FirstTryStreakAchievement("hot_streak", "Hot Streak", "Solve 3 challenges in a row on the first try", length=3),
+        NoHintsAchievement("self_reliant", "Self Reliant", "Complete 5 challenges in a row without hints", count=5),
+        SpeedAchievement("speed_demon", "Speed Demon", "Complete a challenge in under a minute", seconds=60),
+        CategoryMasteryAchievement("algorithm_ace", "Algorithm Ace", "Complete 5 algorithm challenges",
+                                   Category.ALGORITHMS, count=5),
+    ]
+
+
+class AchievementEngine:
+    """Routes events to the rules subscribed to them and records what was earned"""
+
+    def __init__(self, rules: List[Rule] = None):
+        self.rules = rules if rules is not None else default_rules()
+        self._subscriptions: Dict[Type[Event], List[Rule]] = {}
+        for rule in self.rules:
+            for event_type in rule.events:
+                self._subscriptions.setdefault(event_type, []).append(rule)
+
+    def earned_achievements(self, progress: dict) -> List[Achievement]:
+        """Named achievements the player has (levels and category unlocks aren't listed)"""
+        earned = set(progress.get("achievements", []))
+        return [rule for rule in self.rules if isinstance(rule, Achievement) and rule.id in earned]
+
+    def subscribers(self, event_type: Type[Event]) -> List[Rule]:
+        return self._subscriptions.get(event_type, [])
+
+    def publish(self, event: Event, progress: dict) -> List[Unlock]:
+        """Evaluate only the rules listening for this event (and any events they emit)"""
+        earned = progress.setdefault("achievements", [])
+        rule_state = progress.setdefault("rule_state", {})
+        unlocks = []
+        queue = deque([event])
+
+        while queue:
+            current = queue.popleft()
+            for rule in self._subscriptions.get(type(current), []):
+                if rule.one_shot and rule.id in earned:
+                    continue
+                results = rule.evaluate(current, progress, rule_state.setdefault(rule.id, {}), queue.append)
+                if results and rule.one_shot:
+                    earned.append(rule.id)
+                    # Nothing left to track for a rule that can't fire again
+                    rule_state.pop(rule.id, None)
+                unlocks.extend(results)
+        return unlocks
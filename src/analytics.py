@@ -0,0 +1,254 @@
+"""
+Columnar attempt analytics.
+
+Every attempt is one row spread over typed `array` columns (challenge index, player index,
+timestamp, duration, hints, verdict). Aggregates are whole-column scans done with C-level
+helpers (Counter, itertools.compress) where possible, so they stay quick over millions
+of rows.
+
+On disk the store is a log of columnar segments: each flush appends only the rows added
+since the previous flush, so saving never rewrites history. A segment carries its own
+dictionary of the challenge and player ids its rows use, and its index columns point into
+that, so segments appended by different processes (the game and the daemon share one
+file) don't depend on each other's numbering.
+"""
+import argparse
+import json
+import os
+import statistics
+import struct
+import sys
+from array import array
+from collections import Counter
+from itertools import compress
+from typing import Dict, List
+
+FAIL = 0
+PASS = 1
+
+SEGMENT_MAGIC = b'ATT2'
+# Segments from before the per-segment dictionaries, with indices numbered across the file
+LEGACY_SEGMENT_MAGIC = b'ATT1'
+SEGMENT_HEADER = struct.Struct('<4sIII')  # magic, challenges json length, players json length, rows
+# Column name -> array typecode, in on-disk order
+COLUMNS = (
+    ('challenge', 'I'),
+    ('player', 'I'),
+    ('timestamp', 'd'),
+    ('duration', 'f'),
+    ('hints', 'H'),
+    ('verdict', 'B'),
+)
+
+
+class AttemptStore:
+    """Append-only columnar log of attempts with per-challenge/category aggregates"""
+
+    def __init__(self):
+        self.columns: Dict[str, array] = {name: array(code) for name, code in COLUMNS}
+        self.challenge_ids: List[str] = []
+        self.challenge_categories: List[str] = []
+        self.player_ids: List[str] = []
+        self._challenge_index: Dict[str, int] = {}
+        self._player_index: Dict[str, int] = {}
+        # How much has already been written by flush()
+        self._flushed_rows = 0
+
+    def __len__(self) -> int:
+        return len(self.columns['verdict'])
+
+    def _challenge(self, challenge_id: str, category: str) -> int:
+        index = self._challenge_index.get(challenge_id)
+        if index is None:
+            index = self._challenge_index[challenge_id] = len(self.challenge_ids)
+            self.challenge_ids.append(challenge_id)
+            self.challenge_categories.append(category)
+        return index
+
+    def _player(self, player_id: str) -> int:
+        index = self._player_index.get(player_id)
+        if index is None:
+            index = self._player_index[player_id] = len(self.player_ids)
+            self.player_ids.append(player_id)
+        return index
+
+    def record(self, challenge_id: str, category: str, player_id: str, timestamp: float,
+               duration: float, hints: int, verdict: int):
+        """Append one attempt"""
+        columns = self.columns
+        columns['challenge'].append(self._challenge(challenge_id, category))
+        columns['player'].append(self._player(player_id))
+        columns['timestamp'].append(timestamp)
+        columns['duration'].append(duration)
+        columns['hints'].append(min(hints, 0xFFFF))
+        columns['verdict'].append(verdict)
+
+    # --- persistence ---
+
+    def flush(self, path: str):
+        """Append everything recorded since the last flush as one segment"""
+        rows = len(self) - self._flushed_rows
+        if not rows:
+            return
+
+        # Renumber the ids these rows use from 0, so the segment stands on its own
+        chunks = {name: self.columns[name][self._flushed_rows:] for name, _ in COLUMNS}
+        challenge_numbers = {index: number for number, index in enumerate(sorted(set(chunks['challenge'])))}
+        player_numbers = {index: number for number, index in enumerate(sorted(set(chunks['player'])))}
+        chunks['challenge'] = array('I', [challenge_numbers[index] for index in chunks['challenge']])
+        chunks['player'] = array('I', [player_numbers[index] for index in chunks['player']])
+        challenges = [(self.challenge_ids[index], self.challenge_categories[index]) for index in challenge_numbers]
+        players = [self.player_ids[index] for index in player_numbers]
+
+        challenges_json = json.dumps(challenges).encode('utf-8')
+        players_json = json.dumps(players).encode('utf-8')
+        parts = [SEGMENT_HEADER.pack(SEGMENT_MAGIC, len(challenges_json), len(players_json), rows),
+                 challenges_json, players_json]
+        for name, _ in COLUMNS:
+            chunk = chunks[name]
+            if sys.byteorder != 'little':
+                chunk.byteswap()
+            parts.append(chunk.tobytes())
+
+        # One write in append mode, so segments from several processes don't interleave
+        with open(path, 'ab') as f:
+            f.write(b''.join(parts))
+        self._flushed_rows = len(self)
+
+    @classmethod
+    def load(cls, path: str) -> 'AttemptStore':
+        """Read every segment of a store file (a missing file is an empty store)"""
+        store = cls()
+        if not os.path.exists(path):
+            return store
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        offset = 0
+        view = memoryview(data)
+        while offset + SEGMENT_HEADER.size <= len(data):
+            magic, challenges_length, players_length, rows = SEGMENT_HEADER.unpack_from(data, offset)
+            if magic not in (SEGMENT_MAGIC, LEGACY_SEGMENT_MAGIC):
+                raise ValueError(f"{path} is corrupt at byte {offset}")
+            offset += SEGMENT_HEADER.size
+            segment_size = challenges_length + players_length + rows * sum(
+                array(code).itemsize for _, code in COLUMNS)
+            if offset + segment_size > len(data):
+                # A flush that was cut short - keep what was complete
+                break
+
+            # Where this segment's ids ended up in the store
+            challenge_map = [store._challenge(challenge_id, category) for challenge_id, category
+                             in json.loads(bytes(view[offset:offset + challenges_length]))]
+            offset += challenges_length
+            player_map = [store._player(player_id)
+                          for player_id in json.loads(bytes(view[offset:offset + players_length]))]
+            offset += players_length
+
+            for name, code in COLUMNS:
+                chunk = array(code)
+                size = rows * chunk.itemsize
+                chunk.frombytes(view[offset:offset + size])
+                if sys.byteorder != 'little':
+                    chunk.byteswap()
+                if magic == SEGMENT_MAGIC and name in ('challenge', 'player'):
+                    numbers = challenge_map if name == 'challenge' else player_map
+                    chunk = array(code, [numbers[number] for number in chunk])
+                store.columns[name].extend(chunk)
+                offset += size
+
+        store._flushed_rows = len(store)
+        return store
+
+    # --- aggregates ---
+
+    def _passed(self, column: str):
+        # Values of a column for passing attempts only (C-level filter)
+        return compress(self.columns[column], self.columns['verdict'])
+
+    def challenge_stats(self) -> Dict[str, dict]:
+        """Attempts, solves, solve rate, median solve time and hint usage per challenge"""
+        attempts = Counter(self.columns['challenge'])
+        solves = Counter(self._passed('challenge'))
+
+        solve_times: Dict[int, List[float]] = {}
+        hint_totals: Dict[int, int] = {}
+        for challenge, duration, hints in zip(self._passed('challenge'), self._passed('duration'),
+                                              self._passed('hints')):
+            solve_times.setdefault(challenge, []).append(duration)
+            hint_totals[challenge] = hint_totals.get(challenge, 0) + hints
+
+        return {
+            self.challenge_ids[index]: self._summarise(count, solves.get(index, 0),
+                                                       solve_times.get(index, []), hint_totals.get(index, 0))
+            for index, count in attempts.items()
+        }
+
+    def category_stats(self) -> Dict[str, dict]:
+        """Same aggregates rolled up per category"""
+        categories = self.challenge_categories
+        attempts, solves, hint_totals = Counter(), Counter(), Counter()
+        solve_times: Dict[str, List[float]] = {}
+
+        for index, count in Counter(self.columns['challenge']).items():
+            attempts[categories[index]] += count
+        for challenge, duration, hints in zip(self._passed('challenge'), self._passed('duration'),
+                                              self._passed('hints')):
+            category = categories[challenge]
+            solves[category] += 1
+            hint_totals[category] += hints
+            solve_times.setdefault(category, []).append(duration)
+
+        return {
+            category: self._summarise(count, solves[category], solve_times.get(category, []),
+                                      hint_totals[category])
+            for category, count in attempts.items()
+        }
+
+    def _summarise(self, attempts: int, solves: int, solve_times: List[float], hints: int) -> dict:
+        return {
+            "attempts": attempts,
+            "solves": solves,
+            "solve_rate": solves / attempts if attempts else 0.0,
+            "median_solve_time": statistics.median(solve_times) if solve_times else None,
+            "avg_hints": hints / solves if solves else 0.0,
+        }
+
+    def too_hard(self, min_attempts: int = 10, max_solve_rate: float = 0.3) -> List[tuple]:
+        """Challenges with enough attempts and a low solve rate, hardest first"""
+        flagged = [(challenge_id, stats) for challenge_id, stats in self.challenge_stats().items()
+                   if stats["attempts"] >= min_attempts and stats["solve_rate"] <= max_solve_rate]
+        return sorted(flagged, key=lambda item: item[1]["solve_rate"])
+
+
+def _format_stats(name: str, stats: dict) -> str:
+    median = stats["median_solve_time"]
+    median_text = f"{median:8.1f}s" if median is not None else "       -"
+    return (f"{name:<30}{stats['attempts']:>9}{stats['solves']:>8}{stats['solve_rate']:>8.0%}"
+            f"{median_text}{stats['avg_hints']:>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate recorded attempts")
+    parser.add_argument('store', nargs='?', default="attempt_analytics.bin")
+    parser.add_argument('--by', choices=['challenge', 'category'], default='challenge')
+    parser.add_argument('--too-hard', action='store_true', help="only list challenges that look too hard")
+    parser.add_argument('--min-attempts', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    store = AttemptStore.load(args.store)
+    print(f"{len(store):,} attempts by {len(store.player_ids):,} players")
+    print(f"{args.by:<30}{'attempts':>9}{'solves':>8}{'rate':>8}{'median':>9}{'hints':>8}")
+    if args.too_hard:
+        rows = store.too_hard(args.min_attempts)
+    elif args.by == 'category':
+        rows = sorted(store.category_stats().items())
+    else:
+        rows = sorted(store.challenge_stats().items())
+    for name, stats in rows:
+        print(_format_stats(name, stats))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,12 @@
 from typing import Dict, List, Callable, Any
 from enum import Enum
 import time
+import metering
+import memory_meter
+import vector_stats
+import static_check
+import perf_coach
+from contextlib import ExitStack
 
 # Setting up the difficulty and category enums to organize challenges
 class Difficulty(Enum):
@@ -16,11 +22,12 @@ class Category(Enum):
     PROBLEM_SOLVING = "problem_solving"
     DEBUGGING = "debugging"
     LEETCODE = "leetcode_style"
+    OPTIMIZATION = "optimization"
 
 class Challenge:
     def __init__(self, id: str, title: str, description: str, category: Category, 
                  difficulty: Difficulty, solution_checker: Callable, hints: List[str] = None, 
-                 expected_answer: str = None):
+                 expected_answer: str = None, requirements: static_check.Requirements = None):
         # Basic challenge info
         self.id = id
         self.title = title
@@ -30,16 +37,57 @@ class Challenge:
         self.solution_checker = solution_checker  # Function that validates user's solution
         self.hints = hints or []
         self.expected_answer = expected_answer  # What the correct solution should look like
+        # Checked on the AST before the code runs (arity, loops, forbidden imports)
+        self.requirements = requirements or static_check.Requirements()
         
+        self._init_tracking()
+        
+    def _init_tracking(self):
         # Tracking stuff for scoring and attempts
         self.start_time = None
         self.hints_used = 0
         self.attempts = 0
+        self.last_submission = None  # Code of the most recent check, kept with the completion
+        
+        # Optional metering mode: count executed lines instead of trusting the wall clock
+        self.metering = False
+        self.instruction_budget = metering.DEFAULT_INSTRUCTION_BUDGET
+        self.execution_cost = None
+        self.reference_cost = None
+        
+        # Optional memory profiling on a large generated input, memory_cap is in bytes
+        self.memory_profiling = False
+        self.memory_cap = None
+        self.peak_memory = None
+        self.reference_peak_memory = None
+        
+        # Shared per-test failure counts, so the tests wrong answers usually fail run first
+        self.test_stats = None
+        self.fail_fast = True
+        
+        # Tips on slow loop patterns in passing solutions, optionally timed against the reference
+        self.performance_tips = True
+        self.measure_speedup = False
+        
+        # Bumped by each warm-up, so a cancelled one can't release what a newer one relies on
+        self.warmup_generation = 0
         
     def start(self):
         # Mark when the challenge started for time tracking
         self.start_time = time.time()
         
+    def prepare(self):
+        # One-off checker work (reference, expected outputs, timings) ahead of the first submission
+        prepare = getattr(self.solution_checker, 'prepare', None)
+        if prepare:
+            prepare()
+        
+    def release(self):
+        # Let go of whatever prepare() built - the next check rebuilds what it needs
+        release = getattr(self.solution_checker, 'release', None)
+        if release:
+            release()
+        
     def get_hint(self) -> str:
         # Give player a hint if any are left
         if self.hints_used < len(self.hints):
@@ -51,16 +99,33 @@ class Challenge:
     def check_solution(self, user_code: str) -> tuple[bool, str]:
         # Run the user's code through our checker function
         self.attempts += 1
+        self.last_submission = user_code
         try:
-            success, message = self.solution_checker(user_code)
+            # Reject what can't pass before paying for running it
+            success, message = static_check.precheck(user_code, self.requirements)
+            if success and (self.metering or self.memory_profiling or self.test_stats is not None):
+                success, message = self._check_instrumented(user_code)
+            elif success:
+                success, message = self.solution_checker(user_code)
+            
+            # Correct isn't the whole story - point out loops that will crawl on big inputs
+            if success and self.performance_tips:
+                tips = perf_coach.coach(user_code, self.solution_checker, self.measure_speedup)
+                if tips:
+                    message += f"\n\n{tips}"
             
             # If they failed and this is their 3rd attempt, show the expected answer
             if not success and self.attempts >= 3 and self.expected_answer:
                 message += f"\n\nAfter 3 attempts, here's the expected solution:\n{self.expected_answer}"
             
             return success, message
-        except Exception as e:
-            error_msg = f"Error running your code: {e}"
+        except (Exception, SystemExit) as e:
+            # A submission's sys.exit() mustn't end the game or the daemon. Other BaseExceptions
+            # (KeyboardInterrupt, the verifier's and time budget's alarms) are meant to get through
+            if isinstance(e, SystemExit):
+                error_msg = f"Your code called exit ({e.code!r}) before it could be checked"
+            else:
+                error_msg = f"Error running your code: {e}"
             
             # Show expected answer after 3 failed attempts
             if self.attempts >= 3 and self.expected_answer:
@@ -68,6 +133,28 @@ class Challenge:
             
             return False, error_msg
             
+    def _check_instrumented(self, user_code: str) -> tuple[bool, str]:
+        # Run the checker with the meter/memory probe/test stats active so the checker can use them
+        meter = metering.ExecutionMeter(self.instruction_budget) if self.metering else None
+        probe = memory_meter.MemoryProbe(self.memory_cap) if self.memory_profiling else None
+        with ExitStack() as stack:
+            stack.enter_context(vector_stats.ordering(
+                vector_stats.TestRun(self.id, self.test_stats, self.fail_fast)))
+            if meter:
+                stack.enter_context(metering.metered(meter))
+            if probe:
+                stack.enter_context(memory_meter.profiling(probe))
+            success, message = self.solution_checker(user_code)
+        
+        if meter and meter.cost:
+            self.execution_cost = meter.cost
+            self.reference_cost = meter.reference_cost or None
+            message += f"\n{meter.describe()}"
+        if probe and probe.peak is not None:
+            self.peak_memory = probe.peak
+            self.reference_peak_memory = probe.reference_peak
+        return success, message
+            
     def get_time_taken(self) -> float:
         # Calculate how long they've been working on this
         if self.start_time:
@@ -82,6 +169,10 @@ class Challenge:
         # Faster completion gives bonus points
         time_bonus = max(0, 50 - int(time_taken / 10))
         
+        # With metering on, the bonus rewards efficient code instead (same on every machine)
+        if self.execution_cost and self.reference_cost:
+            time_bonus = int(50 * min(1.0, self.reference_cost / self.execution_cost))
+        
         # Using hints reduces score
         hint_penalty = self.hints_used * 10
         
@@ -0,0 +1,188 @@
+"""
+Paged browser over the available challenges so big catalogs don't flood the terminal
+"""
+from typing import List, Optional
+from challenge import Challenge, Category, Difficulty
+
+
+class ChallengeBrowser:
+    """Keeps a filtered/sorted view of challenges and pages through it"""
+
+    SORT_KEYS = {
+        'default': None,
+        'recommended': None,  # Uses the ranking handed in by the engine
+        'title': lambda c: c.title.lower(),
+        'difficulty': lambda c: (c.difficulty.value, c.title.lower()),
+        'category': lambda c: (c.category.value, c.title.lower()),
+    }
+
+    def __init__(self, challenges: List[Challenge], page_size: int = 8):
+        self.page_size = max(1, page_size)
+        self.sort_key = 'default'
+        self.category_filter: Optional[Category] = None
+        self.difficulty_filter: Optional[Difficulty] = None
+        self.page = 0
+        self._challenges = list(challenges)
+        self._ranking = {}
+        self._view: List[Challenge] = []
+        self._rebuild_view()
+
+    def set_ranking(self, ranked: List[Challenge]):
+        """Order used by the 'recommended' sort - ranked challenges first, the rest after"""
+        self._ranking = {challenge.id: position for position, challenge in enumerate(ranked)}
+        self.sort_key = 'recommended'
+        self.page = 0
+        self._rebuild_view()
+
+    def set_challenges(self, challenges: List[Challenge]):
+        """Swap in a new catalog, keeping the current filters and sorting"""
+        self._challenges = list(challenges)
+        self._rebuild_view()
+
+    def _rebuild_view(self):
+        # Filtering and sorting only happen when the view changes, never on a page flip
+        view = self._challenges
+        if self.category_filter is not None:
+            view = [c for c in view if c.category == self.category_filter]
+        if self.difficulty_filter is not None:
+            view = [c for c in view if c.difficulty == self.difficulty_filter]
+        key = self.SORT_KEYS[self.sort_key]
+        if self.sort_key == 'recommended':
+            unranked = len(self._ranking)
+            key = lambda c: self._ranking.get(c.id, unranked)
+        self._view = sorted(view, key=key) if key else list(view)
+        self.page = min(self.page, self.page_count - 1)
+
+    @property
+    def total(self) -> int:
+        return len(self._view)
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-len(self._view) // self.page_size))
+
+    def visible(self) -> List[Challenge]:
+        """Only the challenges on the current page"""
+        start = self.page * self.page_size
+        return self._view[start:start + self.page_size]
+
+    def first_number(self) -> int:
+        # Global position of the first visible item, handy for "showing 9-16 of 300"
+        return self.page * self.page_size + 1
+
+    def next_page(self) -> bool:
+        if self.page + 1 < self.page_count:
+            self.page += 1
+            return True
+        return False
+
+    def prev_page(self) -> bool:
+        if self.page > 0:
+            self.page -= 1
+            return True
+        return False
+
+    def jump_to(self, page_number: int) -> bool:
+        """Jump to a 1-based page number"""
+        if 1 <= page_number <= self.page_count:
+            self.page = page_number - 1
+            return True
+        return False
+
+    def select(self, number: int) -> Optional[Challenge]:
+        """Pick a challenge by its page-local number (1..page_size)"""
+        visible = self.visible()
+        if 1 <= number <= len(visible):
+            return visible[number - 1]
+        return None
+
+    def sort_by(self, key: str) -> bool:
+        if key not in self.SORT_KEYS:
+            return False
+        self.sort_key = key
+        self.page = 0
+        self._rebuild_view()
+        return True
+
+    def filter_category(self, name: Optional[str]) -> bool:
+        """Filter by category value or name, 'all'/None clears the filter"""
+        if name is None or name.lower() == 'all':
+            self.category_filter = None
+        else:
+            wanted = name.lower().replace(' ', '_')
+            matches = [c for c in Category if c.value == wanted or c.name.lower() == wanted
+                       or c.value.startswith(wanted)]
+            if not matches:
+                return False
+            self.category_filter = matches[0]
+        self.page = 0
+        self._rebuild_view()
+        return True
+
+    def filter_difficulty(self, name: Optional[str]) -> bool:
+        """Filter by difficulty name or number, 'all'/None clears the filter"""
+        if name is None or name.lower() == 'all':
+            self.difficulty_filter = None
+        else:
+            wanted = name.upper()
+            matches = [d for d in Difficulty if d.name == wanted or str(d.value) == wanted]
+            if not matches:
+                return False
+            self.difficulty_filter = matches[0]
+        self.page = 0
+        self._rebuild_view()
+        return True
+
+    def describe_filters(self) -> str:
+        # Short summary for the browser header
+        parts = [f"sort: {self.sort_key}"]
+        if self.category_filter is not None:
+            parts.append(f"category: {self.category_filter.value.replace('_', ' ').title()}")
+        if self.difficulty_filter is not None:
+            parts.append(f"difficulty: {self.difficulty_filter.name}")
+        return ", ".join(parts)
+
+    def handle_command(self, command: str):
+        """
+        Apply a browser command typed by the player.
+        Returns ('select', challenge), ('back', None), ('ok', None) or ('error', message).
+        """
+        command = command.strip()
+        if not command:
+            return 'ok', None
+
+        parts = command.split(None, 1)
+        action = parts[0].lower()
+        argument = parts[1].strip() if len(parts) > 1 else None
+
+        if action.isdigit():
+            number = int(action)
+            if number == 0:
+                return 'back', None
+            challenge = self.select(number)
+            if challenge:
+                return 'select', challenge
+            return 'error', f"Pick a number between 1 and {len(self.visible())} on this page"
+        if action in ('n', 'next'):
+            return ('ok', None) if self.next_page() else ('error', "Already on the last page")
+        if action in ('p', 'prev'):
+            return ('ok', None) if self.prev_page() else ('error', "Already on the first page")
+        if action in ('j', 'jump'):
+            if argument and argument.isdigit() and self.jump_to(int(argument)):
+                return 'ok', None
+            return 'error', f"Jump needs a page between 1 and {self.page_count}"
+        if action in ('s', 'sort'):
+            if argument and self.sort_by(argument.lower()):
+                return 'ok', None
+            return 'error', f"Sort by one of: {', '.join(self.SORT_KEYS)}"
+        if action in ('c', 'category'):
+            if self.filter_category(argument):
+                return 'ok', None
+            return 'error', f"Unknown category: {argument}"
+        if action in ('d', 'difficulty'):
+            if self.filter_difficulty(argument):
+                return 'ok', None
+            return 'error', f"Unknown difficulty: {argument}"
+        if action in ('q', 'quit', 'back'):
+            return 'back', None
+        return 'error', f"Unknown command: {command}"
@@ -0,0 +1,373 @@
+"""
+Compiled challenge packs: one file with a fixed-width index and marshalled entries,
+opened with mmap so entries are only read when somebody actually looks at them.
+
+Layout:
+    header   MAGIC, python magic, entry count, index offset
+    payloads marshal.dumps(dict) per challenge (reference code object, vectors, outputs...)
+    index    one fixed-width record per challenge, sorted by id
+"""
+import argparse
+import copy
+import importlib.util
+import marshal
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from challenge import Challenge, Category, Difficulty
+import metering
+import memory_meter
+from static_check import Requirements
+from challenge_parser import (ChallengeParser, find_function_with_param_count,
+                              get_test_vectors, run_test_vectors)
+
+PACK_MAGIC = b'CCAPACK1'
+PACK_EXTENSION = '.ccpack'
+HEADER = struct.Struct('<8s4sIQ')
+# id, title, category value, difficulty, payload offset, payload length
+INDEX_RECORD = struct.Struct('<64s96s24sBQI')
+
+
+class PackError(Exception):
+    """Raised when a pack file is missing, corrupt or built for another Python"""
+
+
+def _fixed(text: str, width: int) -> bytes:
+    data = text.encode('utf-8')
+    if len(data) > width:
+        # Cut on a character boundary so the stored text still decodes
+        data = data[:width].decode('utf-8', errors='ignore').encode('utf-8')
+    return data
+
+
+def _unfixed(data: bytes) -> str:
+    return data.rstrip(b'\0').decode('utf-8')
+
+
+def build_pack(problems_directory: str, pack_path: str, skip_ids=()) -> int:
+    """Compile every problem file in a directory into a single pack, returns the entry count"""
+    parser = ChallengeParser(problems_directory)
+    entries = []
+
+    for filename in sorted(os.listdir(problems_directory)):
+        if not filename.endswith('.py') or filename.startswith('__'):
+            continue
+        filepath = os.path.join(problems_directory, filename)
+        try:
+            challenge = parser.parse_problem_file(filepath)
+            if challenge.id in skip_ids:
+                continue
+            entries.append((challenge, _compile_payload(challenge, parser.extract_reference(filepath), filepath)))
+        except Exception as e:
+            print(f"Failed to pack {filename}: {e}")
+
+    entries.sort(key=lambda entry: entry[0].id)
+    ids = [challenge.id for challenge, _ in entries]
+    if len(set(ids)) != len(ids):
+        raise PackError("Duplicate challenge ids in problems directory")
+    too_long = [challenge_id for challenge_id in ids if len(challenge_id.encode('utf-8')) > 64]
+    if too_long:
+        raise PackError(f"Challenge ids longer than 64 bytes can't be indexed: {too_long[0]}")
+
+    with open(pack_path, 'wb') as f:
+        f.write(b'\0' * HEADER.size)  # Filled in once we know where the index goes
+        records = []
+        for challenge, payload in entries:
+            records.append(INDEX_RECORD.pack(
+                _fixed(challenge.id, 64), _fixed(challenge.title, 96),
+                _fixed(challenge.category.value, 24), challenge.difficulty.value,
+                f.tell(), len(payload)))
+            f.write(payload)
+        index_offset = f.tell()
+        f.write(b''.join(records))
+        f.seek(0)
+        f.write(HEADER.pack(PACK_MAGIC, importlib.util.MAGIC_NUMBER, len(records), index_offset))
+
+    return len(entries)
+
+
+def _compile_payload(challenge: Challenge, reference: dict, filepath: str) -> bytes:
+    # Run the reference once at pack time so players never have to
+    code = compile(reference['source'], filepath, 'exec')
+    namespace = {}
+    exec(code, namespace)
+    reference_func = namespace.get(reference['name'])
+    if reference_func is None:
+        raise PackError(f"Reference function {reference['name']} not found")
+
+    vectors = get_test_vectors(reference['name'])
+    expected = [reference_func(*copy.deepcopy(args)) for args in vectors]
+
+    return marshal.dumps({
+        'description': challenge.description,
+        'hints': challenge.hints,
+        'expected_answer': challenge.expected_answer,
+        'function_name': reference['name'],
+        'param_count': len(reference['params']),
+        'code': code,
+        'vectors': vectors,
+        'expected': expected,
+    })
+
+
+class ChallengePack:
+    """Read-only view of a pack file - opening it only reads the header"""
+
+    def __init__(self, pack_path: str):
+        self.path = pack_path
+        self._file = open(pack_path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:
+            self._file.close()
+            raise PackError(f"{pack_path} is empty") from e
+
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise PackError(f"{pack_path} is too small to be a challenge pack")
+        magic, python_magic, self.count, self._index_offset = HEADER.unpack_from(self._map, 0)
+        if magic != PACK_MAGIC:
+            self.close()
+            raise PackError(f"{pack_path} is not a challenge pack")
+        if python_magic != importlib.util.MAGIC_NUMBER:
+            # Marshalled code objects only load on the Python version that wrote them
+            self.close()
+            raise PackError(f"{pack_path} was built for a different Python version, rebuild it")
+        if self._index_offset + self.count * INDEX_RECORD.size > len(self._map):
+            self.close()
+            raise PackError(f"{pack_path} is truncated")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def record(self, position: int) -> dict:
+        """Index metadata for the entry at `position` (no payload read)"""
+        if not 0 <= position < self.count:
+            raise IndexError(position)
+        raw_id, title, category, difficulty, offset, length = INDEX_RECORD.unpack_from(
+            self._map, self._index_offset + position * INDEX_RECORD.size)
+        return {
+            'id': _unfixed(raw_id),
+            'title': _unfixed(title),
+            'category': Category(_unfixed(category)),
+            'difficulty': Difficulty(difficulty),
+            'offset': offset,
+            'length': length,
+        }
+
+    def _id_at(self, position: int) -> str:
+        start = self._index_offset + position * INDEX_RECORD.size
+        return _unfixed(self._map[start:start + 64])
+
+    def find(self, challenge_id: str) -> Optional[int]:
+        """Binary search the sorted index for an id"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._id_at(middle) < challenge_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self._id_at(low) == challenge_id:
+            return low
+        return None
+
+    def payload(self, position: int) -> dict:
+        record = self.record(position)
+        return marshal.loads(self._map[record['offset']:record['offset'] + record['length']])
+
+    def get(self, challenge_id: str) -> Optional['PackedChallenge']:
+        position = self.find(challenge_id)
+        return PackedChallenge(self, position, self.record(position)) if position is not None else None
+
+    def ids(self) -> Iterator[str]:
+        """Every entry's id, in order - reads only the id field of each index record"""
+        for position in range(self.count):
+            yield self._id_at(position)
+
+    def challenges(self) -> Iterator['PackedChallenge']:
+        """Every entry as a lazy challenge - only the index is touched"""
+        for position in range(self.count):
+            yield PackedChallenge(self, position, self.record(position))
+
+
+class PackedChallenge(Challenge):
+    """A challenge whose description, hints and tests stay in the pack until needed"""
+
+    _LAZY_FIELDS = ('description', 'hints', 'expected_answer')
+
+    def __init__(self, pack: ChallengePack, position: int, record: dict):
+        self._pack = pack
+        self._position = position
+        self._payload = None
+        self.id = record['id']
+        self.title = record['title']
+        self.category = record['category']
+        self.difficulty = record['difficulty']
+        self.solution_checker = self._check
+
+        # Same tracking state as a regular challenge
+        self._init_tracking()
+
+    def __getattr__(self, name):
+        # Only called for attributes we haven't set yet, i.e. the lazy payload fields
+        if name in PackedChallenge._LAZY_FIELDS:
+            value = self._load_payload()[name]
+            setattr(self, name, value)
+            return value
+        if name == 'requirements':
+            self.requirements = Requirements(function_arity=self._load_payload()['param_count'])
+            return self.requirements
+        raise AttributeError(name)
+
+    def _load_payload(self) -> dict:
+        if self._payload is None:
+            self._payload = self._pack.payload(self._position)
+        return self._payload
+
+    def prepare(self):
+        # Read the entry out of the pack ahead of the first submission
+        self._load_payload()
+
+    def load_reference(self):
+        """Execute the marshalled reference code and return the reference function"""
+        payload = self._load_payload()
+        namespace = {}
+        exec(payload['code'], namespace)
+        return namespace[payload['function_name']]
+
+    def _check(self, user_code: str) -> Tuple[bool, str]:
+        payload = self._load_payload()
+        try:
+            user_globals = {}
+            exec(user_code, user_globals)
+        except Exception as e:
+            return False, f"Error in your code: {e}"
+
+        user_func = find_function_with_param_count(user_globals, payload['param_count'])
+        if not user_func:
+            return False, f"Your code must define a function that takes {payload['param_count']} parameter(s)"
+
+        # Expected outputs were computed when the pack was built
+        vectors = [copy.deepcopy(tuple(args)) for args in payload['vectors']]
+        if metering.active_meter() and vectors:
+            # Metering mode wants the reference's cost on the same inputs to compare against
+            reference = self.load_reference()
+            for args in payload['vectors']:
+                metering.call(reference, *copy.deepcopy(tuple(args)), reference=True)
+        passed, message = run_test_vectors(user_func, vectors, payload['expected'])
+        if not passed:
+            return False, message
+        
+        memory_report = ""
+        if memory_meter.active_probe():
+            passed, memory_report = memory_meter.check_memory(
+                user_func, self.load_reference(), payload['function_name'])
+            if not passed:
+                return False, memory_report
+        message = "Great job! Your solution works correctly."
+        return True, f"{message}\n{memory_report}" if memory_report else message
+
+
+class PackCatalog(Mapping):
+    """Challenge id -> PackedChallenge across several packs, built only when looked up
+
+    Opening the catalog costs nothing per entry: a lookup binary-searches each pack's
+    index, and the PackedChallenge it builds is kept so its attempts and hints carry on.
+    `on_load` is called with each challenge the first time it's built (the engine uses it
+    to configure the challenge). Ids are expected to be unique - the first pack wins.
+    """
+
+    def __init__(self, packs: List[ChallengePack] = (), on_load: Callable = None):
+        self.packs = list(packs)
+        self.on_load = on_load
+        self._loaded: Dict[str, PackedChallenge] = {}
+
+    def __getitem__(self, challenge_id: str) -> 'PackedChallenge':
+        challenge = self._loaded.get(challenge_id)
+        if challenge is None:
+            for pack in self.packs:
+                challenge = pack.get(challenge_id)
+                if challenge is not None:
+                    break
+            else:
+                raise KeyError(challenge_id)
+            self._loaded[challenge_id] = challenge
+            if self.on_load:
+                self.on_load(challenge)
+        return challenge
+
+    def __contains__(self, challenge_id) -> bool:
+        # Without building the challenge (Mapping's default would)
+        return challenge_id in self._loaded or any(pack.find(challenge_id) is not None for pack in self.packs)
+
+    def __iter__(self) -> Iterator[str]:
+        for pack in self.packs:
+            yield from pack.ids()
+
+    def __len__(self) -> int:
+        return sum(len(pack) for pack in self.packs)
+
+    def loaded(self) -> List['PackedChallenge']:
+        """The challenges looked up so far"""
+        return list(self._loaded.values())
+
+    def close(self):
+        for pack in self.packs:
+            pack.close()
+
+
+def load_packs(directory: str) -> List[ChallengePack]:
+    """Open every pack in a directory (only their headers are read)"""
+    packs = []
+    if not os.path.isdir(directory):
+        return packs
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(PACK_EXTENSION):
+            try:
+                pack = ChallengePack(os.path.join(directory, filename))
+            except (OSError, PackError) as e:
+                print(f"Could not open pack {filename}: {e}")
+                continue
+            packs.append(pack)
+    return packs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect compiled challenge packs")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Compile a problems directory into a pack")
+    build.add_argument('problems_directory')
+    build.add_argument('pack_path')
+    show = commands.add_parser('list', help="List the challenges in a pack")
+    show.add_argument('pack_path')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        count = build_pack(args.problems_directory, args.pack_path)
+        print(f"Packed {count} challenges into {args.pack_path}")
+    else:
+        with ChallengePack(args.pack_path) as pack:
+            for position in range(len(pack)):
+                record = pack.record(position)
+                print(f"{record['id']:<30} {record['difficulty'].name:<7} {record['title']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
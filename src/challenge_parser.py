@@ -2,10 +2,16 @@
 Parser to convert external coding problems into the game's Challenge format
 """
 import ast
+import copy
 import re
 import os
 from typing import List, Tuple, Callable
 from challenge import Challenge, Category, Difficulty
+import metering
+import vector_stats
+import checker_spec
+from output_compare import describe_mismatch, short_repr
+from static_check import Requirements
 
 
 def find_function_with_param_count(user_globals: dict, expected_param_count: int):
@@ -18,11 +24,77 @@ def find_function_with_param_count(user_globals: dict, expected_param_count: int
     return None
 
 
+# Known inputs for the classic problems, keyed by the reference function's name
+BASIC_TESTS = {
+    # Two Sum test
+    'twoSum': [([2, 7, 11, 15], 9)],
+    # FizzBuzz test
+    'fizz_buzz': [(15,)],
+    # Palindrome test
+    'is_palindrome': [("A man, a plan, a canal: Panama",)],
+    # Container with water
+    'maxArea': [([1, 8, 6, 2, 5, 4, 8, 3, 7],)],
+    # Anagram test
+    'is_anagram': [("listen", "silent")],
+    # Plus one test
+    'plus_one': [([1, 2, 3],)],
+}
+
+
+def get_test_vectors(function_name: str) -> List[tuple]:
+    """Argument tuples to test a function with (empty if we don't know the problem)
+
+    Fresh copies every time - solutions that modify their input must not change BASIC_TESTS.
+    """
+    return [tuple(copy.deepcopy(args)) for args in BASIC_TESTS.get(function_name, [])]
+
+
+def run_test_vectors(user_func: Callable, vectors: List[tuple], expected_outputs: List) -> Tuple[bool, str]:
+    """Call the user's function on every vector and compare with the expected outputs
+
+    With a vector_stats run active, the vectors that failed most often run first and their
+    outcomes are recorded; in fail-fast mode (the default) we stop at the first failure.
+    """
+    run = vector_stats.active_run()
+    # Keys are taken before any call, since solutions may modify their arguments in place
+    keys = [vector_stats.vector_key(args) for args in vectors]
+    order = run.order(keys) if run else range(len(vectors))
+    failures = []
+    for index in order:
+        args, expected_result = vectors[index], expected_outputs[index]
+        message = None
+        try:
+            user_result = metering.call(user_func, *args)
+            
+            if expected_result != user_result:
+                message = f"Test failed with input {short_repr(args)}. {describe_mismatch(expected_result, user_result)}"
+        except NameError as e:
+            if 'true' in str(e).lower() or 'false' in str(e).lower():
+                message = f"Error: Use 'True' and 'False' (with capital letters) for boolean values, not 'true'/'false'"
+            else:
+                message = f"Name error in your code: {e}"
+        except (Exception, metering.BudgetExceeded) as e:
+            message = f"Error running test with {short_repr(args)}: {e}"
+        
+        if run:
+            run.record(keys[index], message is not None)
+        if message is not None:
+            if run is None or run.fail_fast:
+                return False, message
+            failures.append(message)
+    
+    if failures:
+        return False, f"{len(failures)} of {len(vectors)} tests failed. {failures[0]}"
+    return True, "All tests passed"
+
+
 class ChallengeParser:
     """Converts coding problem files to Challenge objects"""
     
     def __init__(self, problems_directory: str):
         self.problems_directory = problems_directory
+        # (mtime, size) per problem file as of the last parse/scan, used for hot reload
+        self._signatures = {}
         
     def parse_problem_file(self, filepath: str) -> Challenge:
         """Parse a single coding problem file into a Challenge object"""
@@ -61,7 +133,8 @@ class ChallengeParser:
             difficulty=difficulty,
             solution_checker=solution_checker,
             hints=hints,
-            expected_answer=expected_answer
+            expected_answer=expected_answer,
+            requirements=Requirements(function_arity=len(function_info['params']))
         )
     
     def _extract_function_info(self, content: str) -> dict:
@@ -109,75 +182,21 @@ class ChallengeParser:
         return test_cases[:3]  # Limit to first 3 test cases
     
     def _create_solution_checker(self, function_name: str, test_cases: List, original_content: str) -> Callable:
-        """Create a function to check user solutions"""
-        
-        def checker(user_code: str) -> Tuple[bool, str]:
-            try:
-                # Execute the original solution to get expected results
-                exec_globals = {}
-                exec(original_content, exec_globals)
-                expected_func = exec_globals.get(function_name)
-                
-                if not expected_func:
-                    return False, f"Could not find reference function {function_name}"
-                
-                # Execute user's code
-                user_globals = {}
-                exec(user_code, user_globals)
-                
-                # Find any function in user's code that matches the expected signature
-                original_params = len(expected_func.__code__.co_varnames[:expected_func.__code__.co_argcount])
-                user_func = find_function_with_param_count(user_globals, original_params)
-                
-                if not user_func:
-                    return False, f"Your code must define a function that takes {original_params} parameter(s)"
-                
-                # Test with basic cases if we have them
-                basic_tests = [
-                    # Two Sum test
-                    {'func': 'twoSum', 'args': [([2, 7, 11, 15], 9)], 'expected_type': list},
-                    # FizzBuzz test  
-                    {'func': 'fizz_buzz', 'args': [(15,)], 'expected_type': list},
-                    # Palindrome test
-                    {'func': 'is_palindrome', 'args': [("A man, a plan, a canal: Panama",)], 'expected_type': bool},
-                    # Container with water
-                    {'func': 'maxArea', 'args': [([1,8,6,2,5,4,8,3,7],)], 'expected_type': int},
-                    # Anagram test
-                    {'func': 'is_anagram', 'args': [("listen", "silent")], 'expected_type': bool},
-                    # Plus one test
-                    {'func': 'plus_one', 'args': [([1, 2, 3],)], 'expected_type': list},
-                ]
-                
-                # Find matching test for this function
-                matching_test = None
-                for test in basic_tests:
-                    if test['func'] == function_name:
-                        matching_test = test
-                        break
-                
-                if matching_test:
-                    for args in matching_test['args']:
-                        try:
-                            expected_result = expected_func(*args)
-                            user_result = user_func(*args)
-                            
-                            if expected_result != user_result:
-                                return False, f"Test failed with input {args}. Expected {expected_result}, got {user_result}"
-                        except NameError as e:
-                            if 'true' in str(e).lower() or 'false' in str(e).lower():
-                                return False, f"Error: Use 'True' and 'False' (with capital letters) for boolean values, not 'true'/'false'"
-                            else:
-                                return False, f"Name error in your code: {e}"
-                        except Exception as e:
-                            return False, f"Error running test with {args}: {e}"
-                
-                # If we get here, basic tests passed
-                return True, "Great job! Your solution works correctly."
-                
-            except Exception as e:
-                return False, f"Error in your code: {e}"
-        
-        return checker
+        """Create a (picklable) checker that tests user solutions against the original code"""
+        return checker_spec.FunctionSpec(
+            param_count=self._reference_param_count(original_content, function_name),
+            reference=function_name,
+            reference_source=original_content,
+            problem=function_name,
+            memory_problem=function_name
+        )
+    
+    def _reference_param_count(self, content: str, function_name: str) -> int:
+        """Positional parameters of the named function in the problem file"""
+        for node in ast.walk(ast.parse(content)):
+            if isinstance(node, ast.FunctionDef) and node.name == function_name:
+                return len(node.args.posonlyargs) + len(node.args.args)
+        return 0
     
     def _determine_category(self, challenge_id: str, content: str) -> Category:
         """Determine the appropriate category for the challenge"""
@@ -450,8 +469,9 @@ Return True if correct, False otherwise.""",
             print(f"Problems directory not found: {self.problems_directory}")
             return challenges
         
+        self._signatures = self._stat_problem_files()
         for filename in os.listdir(self.problems_directory):
-            if filename.endswith('.py') and not filename.startswith('__'):
+            if self._is_problem_file(filename):
                 filepath = os.path.join(self.problems_directory, filename)
                 try:
                     challenge = self.parse_problem_file(filepath)
@@ -460,4 +480,44 @@ Return True if correct, False otherwise.""",
                 except Exception as e:
                     print(f"Failed to parse {filename}: {e}")
         
-        return challenges
\ No newline at end of file
+        return challenges
+    
+    def _is_problem_file(self, filename: str) -> bool:
+        return filename.endswith('.py') and not filename.startswith('__')
+    
+    def _stat_problem_files(self) -> dict:
+        """Map each problem file path to its (mtime, size) signature"""
+        signatures = {}
+        try:
+            entries = os.scandir(self.problems_directory)
+        except OSError:
+            return signatures
+        with entries:
+            for entry in entries:
+                if self._is_problem_file(entry.name) and entry.is_file():
+                    stat = entry.stat()
+                    signatures[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+    
+    def snapshot(self):
+        """Remember the current state of the directory without parsing anything"""
+        self._signatures = self._stat_problem_files()
+    
+    def scan_changes(self) -> Tuple[List[str], List[str]]:
+        """Compare the directory with the last scan, returns (added_or_changed, removed) paths"""
+        current = self._stat_problem_files()
+        changed = [path for path, signature in current.items() if self._signatures.get(path) != signature]
+        removed = [path for path in self._signatures if path not in current]
+        self._signatures = current
+        return changed, removed
+    
+    def challenge_id_for(self, filepath: str) -> str:
+        """The id a problem file gets (or had, if it was deleted)"""
+        return self._generate_id(filepath)
+    
+    def extract_reference(self, filepath: str) -> dict:
+        """Reference function name, parameter names and full source of a problem file"""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+        function_info = self._extract_function_info(content)
+        return {'name': function_info['name'], 'params': function_info['params'], 'source': content}
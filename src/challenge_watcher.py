@@ -0,0 +1,94 @@
+"""
+Watches the problems directory and hot-swaps changed challenges into the game engine
+
+The background thread only scans and parses. What it finds waits on a queue until the
+main loop calls apply_pending(), so the engine (and its recommender) is only ever changed
+from the thread that reads it, and reload messages go through the UI like everything else.
+"""
+import queue
+import threading
+from typing import Callable, Iterable
+from challenge_parser import ChallengeParser
+
+
+class ChallengeWatcher:
+    """Polls file mtimes and reparses only the problem files that changed"""
+
+    def __init__(self, parser: ChallengeParser, engine, interval: float = 2.0,
+                 skip_ids: Iterable[str] = (), on_reload: Callable = None):
+        self.parser = parser
+        self.engine = engine
+        self.interval = interval
+        self.skip_ids = set(skip_ids)
+        self.on_reload = on_reload  # Called with (updated_challenges, removed_ids, errors)
+        self._stop = threading.Event()
+        self._thread = None
+        self._pending = queue.Queue()  # (updated, removed_ids, errors) found by the thread
+
+    def poll_once(self):
+        """Check the directory once and apply whatever changed (on the calling thread)"""
+        result = self._scan()
+        if result[0] or result[1] or result[2]:
+            self._apply(*result)
+        return result
+
+    def _scan(self):
+        changed, removed = self.parser.scan_changes()
+        if not changed and not removed:
+            return [], [], []
+
+        updated, errors = [], []
+        for filepath in changed:
+            try:
+                challenge = self.parser.parse_problem_file(filepath)
+            except Exception as e:
+                # Keep serving the old version until the file parses again
+                errors.append((filepath, str(e)))
+                continue
+            if challenge.id not in self.skip_ids:
+                updated.append(challenge)
+
+        removed_ids = [self.parser.challenge_id_for(path) for path in removed]
+        removed_ids = [cid for cid in removed_ids if cid not in self.skip_ids]
+        return updated, removed_ids, errors
+
+    def _apply(self, updated, removed_ids, errors):
+        if updated or removed_ids:
+            self.engine.apply_challenge_updates(updated, removed_ids)
+        if self.on_reload:
+            self.on_reload(updated, removed_ids, errors)
+
+    def apply_pending(self) -> int:
+        """Apply what the background thread found - call from the thread that uses the engine"""
+        applied = 0
+        while True:
+            try:
+                result = self._pending.get_nowait()
+            except queue.Empty:
+                return applied
+            self._apply(*result)
+            applied += 1
+
+    def start(self):
+        """Start polling in a background thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="challenge-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                result = self._scan()
+            except Exception as e:
+                # A flaky network drive shouldn't kill the watcher
+                result = [], [], [(self.parser.problems_directory, str(e))]
+            if result[0] or result[1] or result[2]:
+                self._pending.put(result)
@@ -1,43 +1,30 @@
 from challenge import Challenge, Category, Difficulty
-from challenge_parser import ChallengeParser, find_function_with_param_count
+from challenge_parser import ChallengeParser
+from checker_spec import ProgramSpec, FunctionSpec
+from challenge_pack import PackCatalog, load_packs
+from static_check import Requirements
+from time_budget import TimeBudget
 import os
 
+# Where the external coding problems live - override with CHALLENGE_PROBLEMS_DIR
+PROBLEMS_PATH = os.environ.get("CHALLENGE_PROBLEMS_DIR", r"C:\Users\kevve\OneDrive\Desktop\Coding Problems")
+
+# Compiled .ccpack files (see challenge_pack.py) - override with CHALLENGE_PACKS_DIR
+PACKS_PATH = os.environ.get("CHALLENGE_PACKS_DIR", "packs")
+
+# External problems we already cover with built-in challenges
+SKIPPED_EXTERNAL_IDS = {'fizzbuzzz', 'factorial'}
+
 def create_basic_challenges():
     """Set up the beginner challenges to get people started"""
     challenges = []
     
-    # Simple hello world challenge
-    def check_hello_world(code):
-        # Need to capture their output and check if it prints correctly
-        import io
-        import sys
-        import textwrap
-        
-        try:
-            # Clean up the code to handle any indentation issues
-            # This removes common indentation and cleans up the code
-            clean_code = textwrap.dedent(code).strip()
-            
-            # Capture printed output
-            old_stdout = sys.stdout
-            sys.stdout = captured_output = io.StringIO()
-            
-            exec_globals = {}
-            exec(clean_code, exec_globals)
-            
-            # Get what they printed
-            sys.stdout = old_stdout
-            output = captured_output.getvalue().strip()
-            
-            if "Hello, World!" in output:
-                return True, "Perfect! You've mastered your first print statement."
-            else:
-                return False, f"Expected 'Hello, World!' but got: '{output}'"
-                
-        except Exception as e:
-            if 'old_stdout' in locals():
-                sys.stdout = old_stdout
-            return False, f"Code error: {str(e)}"
+    # Simple hello world challenge - checks what they print (anything else printed is fine)
+    check_hello_world = ProgramSpec(
+        "Perfect! You've mastered your first print statement.",
+        expected_output="Hello, World!",
+        expected_match="contains"
+    )
     
     challenges.append(Challenge(
         id="hello_world",
@@ -51,19 +38,12 @@ def create_basic_challenges():
     ))
     
     # Variable assignment challenge
-    def check_variables(code):
-        try:
-            import textwrap
-            clean_code = textwrap.dedent(code).strip()
-            
-            exec_globals = {}
-            exec(clean_code, exec_globals)
-            # Check if they created the required variables
-            if 'name' in exec_globals and 'age' in exec_globals:
-                return True, "Perfect! You've learned about variables."
-            return False, "Make sure you create both 'name' and 'age' variables."
-        except Exception as e:
-            return False, f"Check your syntax - something went wrong: {e}"
+    check_variables = ProgramSpec(
+        "Perfect! You've learned about variables.",
+        required_names=['name', 'age'],
+        missing_message="Make sure you create both 'name' and 'age' variables.",
+        error_message="Check your syntax - something went wrong: {error}"
+    )
     
     challenges.append(Challenge(
         id="variables_basic",
@@ -77,19 +57,11 @@ def create_basic_challenges():
     ))
     
     # Loop challenge
-    def check_simple_loop(code):
-        try:
-            import textwrap
-            clean_code = textwrap.dedent(code).strip()
-            
-            exec_globals = {}
-            exec(clean_code, exec_globals)
-            # This is tricky to check but let's see if they used a loop keyword
-            if 'for' in clean_code or 'while' in clean_code:
-                return True, "Nice work with loops!"
-            return False, "Try using a for loop or while loop."
-        except Exception as e:
-            return False, f"Something's not right with your loop syntax: {e}"
+    check_simple_loop = ProgramSpec(
+        "Nice work with loops!",
+        error_message="Something's not right with your loop syntax: {error}",
+        needs_loop=True
+    )
     
     challenges.append(Challenge(
         id="simple_loop",
@@ -99,7 +71,8 @@ def create_basic_challenges():
         difficulty=Difficulty.MEDIUM,
         solution_checker=check_simple_loop,
         hints=["Use 'for i in range(1, 11):'", "Don't forget to print(i) inside the loop"],
-        expected_answer='for i in range(1, 11):\n  print(i)'
+        expected_answer='for i in range(1, 11):\n  print(i)',
+        requirements=Requirements(needs_loop=True)
     ))
     
     return challenges
@@ -109,15 +82,12 @@ def create_data_structure_challenges():
     challenges = []
     
     # List manipulation
-    def check_list_ops(code):
-        try:
-            exec_globals = {}
-            exec(code, exec_globals)
-            if 'my_list' in exec_globals and len(exec_globals['my_list']) > 0:
-                return True, "Great work with lists!"
-            return False, "Make sure you create and modify 'my_list'."
-        except:
-            return False, "Check your list syntax."
+    check_list_ops = ProgramSpec(
+        "Great work with lists!",
+        non_empty_names=['my_list'],
+        missing_message="Make sure you create and modify 'my_list'.",
+        error_message="Check your list syntax."
+    )
     
     challenges.append(Challenge(
         id="list_basics",
@@ -136,23 +106,16 @@ def create_algorithm_challenges():
     """More advanced algorithm challenges"""
     challenges = []
     
-    # Simple sorting challenge
-    def check_sort(code):
-        try:
-            exec_globals = {}
-            exec(code, exec_globals)
-            
-            # Look for any function that takes 1 parameter (list to sort)
-            sort_func = find_function_with_param_count(exec_globals, 1)
-            
-            if sort_func:
-                test_result = sort_func([3, 1, 4, 1, 5])
-                if test_result == [1, 1, 3, 4, 5]:
-                    return True, "Excellent sorting!"
-                return False, "Your function doesn't sort correctly."
-            return False, "Create a function that takes a list and returns it sorted."
-        except Exception as e:
-            return False, f"Error testing your function: {e}"
+    # Simple sorting challenge - any function that takes 1 parameter (list to sort),
+    # with an optional memory check against the built-in sort on a big list
+    check_sort = FunctionSpec(
+        param_count=1,
+        reference='builtins:sorted',
+        vectors=[([3, 1, 4, 1, 5],)],
+        memory_problem='sort',
+        success_message="Excellent sorting!",
+        missing_message="Create a function that takes a list and returns it sorted."
+    )
     
     challenges.append(Challenge(
         id="basic_sort",
@@ -162,26 +125,107 @@ def create_algorithm_challenges():
         difficulty=Difficulty.MEDIUM,
         solution_checker=check_sort,
         hints=["You can use the built-in sorted() function", "Or implement bubble sort if you're feeling brave"],
-        expected_answer='def my_sort_function(numbers):\n  return sorted(numbers)'
+        expected_answer='def my_sort_function(numbers):\n  return sorted(numbers)',
+        requirements=Requirements(function_arity=1)
     ))
     
     return challenges
 
-def create_external_challenges():
-    """Load challenges from external coding problems directory"""
+def _two_sum_reference(nums, target):
+    seen = {}
+    for i, num in enumerate(nums):
+        if target - num in seen:
+            return [seen[target - num], i]
+        seen[num] = i
+    return []
+
+def _max_area_reference(height):
+    left, right, best = 0, len(height) - 1, 0
+    while left < right:
+        best = max(best, (right - left) * min(height[left], height[right]))
+        if height[left] < height[right]:
+            left += 1
+        else:
+            right -= 1
+    return best
+
+def _is_anagram_reference(s, t):
+    from collections import Counter
+    return Counter(s) == Counter(t)
+
+def _make_timed_checker(problem: str, reference: str, param_count: int, time_budget: TimeBudget,
+                        extra_vectors=()):
+    # Correct on the usual test vectors first, then fast enough on the hidden large inputs
+    return FunctionSpec(
+        param_count=param_count,
+        reference=reference,
+        problem=problem,
+        vectors=extra_vectors,
+        time_budget=time_budget,
+        success_message="Correct and fast!"
+    )
+
+def create_optimization_challenges():
+    """Performance challenges - correct isn't enough, it also has to scale"""
     challenges = []
     
-    # Path to the external coding problems
-    problems_path = r"C:\Users\kevve\OneDrive\Desktop\Coding Problems"
+    # Each one is timed against the reference on hidden inputs up to 10^6 elements
+    two_sum_budget = TimeBudget('twoSum', [1_000, 10_000, 100_000, 1_000_000])
+    challenges.append(Challenge(
+        id="fast_two_sum",
+        title="Two Sum at Scale",
+        description="Write a function that takes a list of numbers and a target and returns the indices of the two numbers that add up to the target. Hidden tests use lists of up to a million numbers, so comparing every pair won't finish in time.",
+        category=Category.OPTIMIZATION,
+        difficulty=Difficulty.HARD,
+        solution_checker=_make_timed_checker('twoSum', 'challenges_data:_two_sum_reference', 2, two_sum_budget,
+                                              [([3, 2, 4], 6), ([3, 3], 6)]),
+        hints=["For each number, what other number would you need?", "A dict from value to index answers 'have I seen it?' in O(1)"],
+        expected_answer='def two_sum(nums, target):\n    seen = {}\n    for i, num in enumerate(nums):\n        if target - num in seen:\n            return [seen[target - num], i]\n        seen[num] = i',
+        requirements=Requirements(function_arity=2)
+    ))
+    
+    max_area_budget = TimeBudget('maxArea', [1_000, 10_000, 100_000, 1_000_000])
+    challenges.append(Challenge(
+        id="fast_max_area",
+        title="Container With Most Water at Scale",
+        description="Given a list of wall heights, return the largest amount of water two walls can hold (width times the shorter wall). Hidden tests use up to a million walls.",
+        category=Category.OPTIMIZATION,
+        difficulty=Difficulty.HARD,
+        solution_checker=_make_timed_checker('maxArea', 'challenges_data:_max_area_reference', 1, max_area_budget,
+                                              [([1, 1],), ([4, 3, 2, 1, 4],)]),
+        hints=["Start with the widest container: the two outermost walls", "Moving the taller wall inwards can never help - move the shorter one"],
+        expected_answer='def max_area(height):\n    left, right, best = 0, len(height) - 1, 0\n    while left < right:\n        best = max(best, (right - left) * min(height[left], height[right]))\n        if height[left] < height[right]:\n            left += 1\n        else:\n            right -= 1\n    return best',
+        requirements=Requirements(function_arity=1, needs_loop=True)
+    ))
+    
+    anagram_budget = TimeBudget('is_anagram', [1_000, 10_000, 100_000, 1_000_000])
+    challenges.append(Challenge(
+        id="fast_anagram",
+        title="Anagrams at Scale",
+        description="Write a function that takes two strings and returns True if they are anagrams of each other. Hidden tests use strings of up to a million letters.",
+        category=Category.OPTIMIZATION,
+        difficulty=Difficulty.MEDIUM,
+        solution_checker=_make_timed_checker('is_anagram', 'challenges_data:_is_anagram_reference', 2, anagram_budget,
+                                              [("rat", "car"), ("ab", "a")]),
+        hints=["Removing letters from a list one by one is O(n) per letter", "Count the letters of each string and compare the counts"],
+        expected_answer='def is_anagram(s, t):\n    from collections import Counter\n    return Counter(s) == Counter(t)',
+        requirements=Requirements(function_arity=2)
+    ))
+    
+    return challenges
+
+def create_external_challenges(parser: ChallengeParser = None):
+    """Load challenges from external coding problems directory"""
+    challenges = []
     
     try:
-        parser = ChallengeParser(problems_path)
+        parser = parser or ChallengeParser(PROBLEMS_PATH)
         external_challenges = parser.parse_all_problems()
         
         # Filter and organize the challenges
         for challenge in external_challenges:
             # Skip if we already have similar basic challenges
-            if challenge.id in ['fizzbuzzz', 'factorial']:
+            if challenge.id in SKIPPED_EXTERNAL_IDS:
                 continue
             challenges.append(challenge)
             
@@ -193,11 +237,31 @@ def create_external_challenges():
     
     return challenges
 
-def get_all_challenges():
-    """Combine all challenge sets into one big list"""
-    all_challenges = []
-    all_challenges.extend(create_basic_challenges())
-    all_challenges.extend(create_data_structure_challenges())
-    all_challenges.extend(create_algorithm_challenges())
-    all_challenges.extend(create_external_challenges())
+def load_pack_catalog(directory: str = None) -> PackCatalog:
+    """Open the compiled packs - entries are only read when the game looks them up"""
+    catalog = PackCatalog(load_packs(directory or PACKS_PATH))
+    if catalog.packs:
+        print(f"Opened {len(catalog.packs)} pack(s) with {len(catalog)} challenges")
+    return catalog
+
+def create_pack_challenges(directory: str = None):
+    """Every pack entry as a challenge, for tools that go through the whole catalog"""
+    return list(load_pack_catalog(directory).values())
+
+def create_builtin_challenges():
+    """Every challenge defined in this file"""
+    return (create_basic_challenges() + create_data_structure_challenges() +
+            create_algorithm_challenges() + create_optimization_challenges())
+
+def get_all_challenges(parser: ChallengeParser = None, include_packs: bool = True,
+                       packs_directory: str = None):
+    """Combine all challenge sets into one big list
+
+    The game and the daemon pass include_packs=False and register load_pack_catalog()
+    with the engine instead, so startup doesn't touch every pack entry.
+    """
+    all_challenges = create_builtin_challenges()
+    all_challenges.extend(create_external_challenges(parser))
+    if include_packs:
+        all_challenges.extend(create_pack_challenges(packs_directory))
     return all_challenges
\ No newline at end of file
@@ -0,0 +1,258 @@
+"""
+Declarative solution checkers that can be pickled and rebuilt in another process.
+
+A checker used to be a closure over whatever it needed (expected output, reference source,
+a time budget...), which can't be pickled - so challenges couldn't be sent to a process
+pool or cached on disk. A spec holds the same information as plain data and is called like
+the old closures: spec(user_code) -> (passed, message).
+
+    ProgramSpec   runs the code as a script: expected stdout, required (non-empty) names
+    FunctionSpec  finds a function with the right arity and tests it against a reference,
+                  given by import path ("challenges_data:_two_sum_reference") or as source
+
+Pickling goes through to_dict(), so compiled references and calibrated time budgets stay
+behind and are rebuilt lazily wherever the spec ends up.
+"""
+import ast
+import contextlib
+import copy
+import importlib
+import inspect
+import textwrap
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import metering
+import memory_meter
+from output_compare import OutputMismatch, StreamingComparer, StreamingSearch
+from static_check import has_loop
+import challenge_parser  # Module import: the parser builds FunctionSpecs itself
+from time_budget import TimeBudget
+
+
+def resolve_reference(path: str) -> Callable:
+    """'module:attribute' (e.g. 'builtins:sorted') to the object it names"""
+    module_name, _, attribute = path.partition(':')
+    if not attribute:
+        raise ValueError(f"Reference {path!r} should look like 'module:function'")
+    target = importlib.import_module(module_name)
+    for part in attribute.split('.'):
+        target = getattr(target, part)
+    return target
+
+
+class ProgramSpec:
+    """Run the code as a script and check what it printed and/or which names it defined
+
+    expected_match is "exact" (the whole output, line by line) or "contains" (the
+    expected text printed anywhere - what beginner challenges like Hello World ask for).
+    needs_loop rejects code without a for/while loop, whether or not a pre-check ran first.
+    """
+
+    kind = "program"
+    MATCH_MODES = ("exact", "contains")
+
+    def __init__(self, success_message: str, expected_output: str = None,
+                 required_names: Sequence[str] = (), non_empty_names: Sequence[str] = (),
+                 missing_message: str = None, error_message: str = "Code error: {error}",
+                 expected_match: str = "exact", needs_loop: bool = False):
+        if expected_match not in self.MATCH_MODES:
+            raise ValueError(f"expected_match must be one of {self.MATCH_MODES}, not {expected_match!r}")
+        self.success_message = success_message
+        self.expected_output = expected_output
+        self.expected_match = expected_match
+        self.required_names = tuple(required_names)
+        self.non_empty_names = tuple(non_empty_names)
+        self.missing_message = missing_message
+        self.error_message = error_message
+        self.needs_loop = needs_loop
+
+    def __call__(self, code: str) -> Tuple[bool, str]:
+        # Clean up the code to handle any indentation issues
+        clean_code = textwrap.dedent(code).strip()
+        if self.needs_loop:
+            try:
+                tree = ast.parse(clean_code)
+            except SyntaxError:
+                tree = None  # Running it reports the error
+            if tree is not None and not has_loop(tree):
+                return False, "Try using a for loop or while loop."
+        exec_globals = {}
+        # Output is checked as it's printed, never buffered in full
+        comparer = None
+        if self.expected_output is not None:
+            comparer = (StreamingSearch(self.expected_output) if self.expected_match == "contains"
+                        else StreamingComparer(self.expected_output))
+        try:
+            with contextlib.redirect_stdout(comparer) if comparer else contextlib.nullcontext():
+                exec(clean_code, exec_globals)
+        except OutputMismatch:
+            pass  # Already wrong - no need to let it keep printing
+        except Exception as e:
+            return False, self.error_message.format(error=e)
+
+        if comparer is not None:
+            report = comparer.finish()
+            if report:
+                return False, report
+
+        for name in self.required_names + self.non_empty_names:
+            value = exec_globals.get(name)
+            if name not in exec_globals or (name in self.non_empty_names and not value):
+                return False, self.missing_message or f"Make sure you create '{name}'."
+        return True, self.success_message
+
+    def to_dict(self) -> dict:
+        return _drop_defaults(self, {
+            "success_message": self.success_message,
+            "expected_output": self.expected_output,
+            "required_names": list(self.required_names),
+            "non_empty_names": list(self.non_empty_names),
+            "missing_message": self.missing_message,
+            "error_message": self.error_message,
+            "expected_match": self.expected_match,
+            "needs_loop": self.needs_loop,
+        })
+
+    def __reduce__(self):
+        return spec_from_dict, (self.to_dict(),)
+
+
+class FunctionSpec:
+    """Find a function taking `param_count` arguments and compare it with a reference
+
+    The reference is an import path, or - with `reference_source` - the name of a function
+    defined in that source. Test vectors are the known ones for `problem` plus `vectors`;
+    expected outputs come from the reference on every check, so metering mode sees its cost.
+    """
+
+    kind = "function"
+
+    def __init__(self, param_count: int, reference: str, reference_source: str = None,
+                 problem: str = None, vectors: Sequence[tuple] = (), memory_problem: str = None,
+                 time_budget: TimeBudget = None,
+                 success_message: str = "Great job! Your solution works correctly.",
+                 missing_message: str = None):
+        self.param_count = param_count
+        self.reference = reference
+        self.reference_source = reference_source
+        self.problem = problem
+        self.vectors = [tuple(args) for args in vectors]
+        self.memory_problem = memory_problem
+        self.time_budget = time_budget
+        self.success_message = success_message
+        self.missing_message = missing_message
+        self._reference_func = None
+        self._expected_outputs = None  # Filled in by prepare()
+
+    def load_reference(self) -> Optional[Callable]:
+        """The reference function, compiled or imported once per process"""
+        if self._reference_func is None:
+            if self.reference_source is not None:
+                namespace = {}
+                exec(compile(self.reference_source, f"<reference {self.reference}>", 'exec'), namespace)
+                self._reference_func = namespace.get(self.reference)
+            else:
+                self._reference_func = resolve_reference(self.reference)
+        return self._reference_func
+
+    def prepare(self):
+        """Compile the reference, work out the expected outputs and calibrate the time budget"""
+        reference = self.load_reference()
+        if reference is None:
+            return
+        self._expected_outputs = [reference(*args) for args in self.test_vectors()]
+        if self.time_budget is not None:
+            self.time_budget.ensure_calibrated(reference)
+
+    def release(self):
+        self._expected_outputs = None
+        if self.time_budget is not None:
+            self.time_budget.reset()
+
+    def test_vectors(self) -> List[tuple]:
+        known = challenge_parser.get_test_vectors(self.problem) if self.problem else []
+        return known + [copy.deepcopy(args) for args in self.vectors]
+
+    def __call__(self, code: str) -> Tuple[bool, str]:
+        try:
+            reference = self.load_reference()
+            if reference is None:
+                return False, f"Could not find reference function {self.reference}"
+
+            user_globals = {}
+            exec(code, user_globals)
+            user_func = challenge_parser.find_function_with_param_count(user_globals, self.param_count)
+            if not user_func:
+                return False, (self.missing_message or
+                               f"Your code must define a function that takes {self.param_count} parameter(s)")
+
+            vectors = self.test_vectors()
+            if vectors:
+                expected_outputs = self._expected_outputs
+                if expected_outputs is None or metering.active_meter():
+                    # Metering mode needs the reference's cost on these inputs, so it runs again. Give
+                    # the reference its own copy so in-place solutions don't change the user's input
+                    expected_outputs = [metering.call(reference, *copy.deepcopy(args), reference=True)
+                                        for args in vectors]
+                passed, message = challenge_parser.run_test_vectors(user_func, vectors, expected_outputs)
+                if not passed:
+                    return False, message
+
+            message = self.success_message
+            if self.memory_problem:
+                # Optional memory check on a large generated input
+                passed, memory_report = memory_meter.check_memory(user_func, reference, self.memory_problem)
+                if not passed:
+                    return False, memory_report
+                if memory_report:
+                    message = f"{message}\n{memory_report}"
+
+            if self.time_budget is not None:
+                passed, timing_report = self.time_budget.check(user_func, reference)
+                if not passed:
+                    return False, timing_report
+                message = f"{message} {timing_report}"
+            return True, message
+
+        except Exception as e:
+            return False, f"Error in your code: {e}"
+
+    def to_dict(self) -> dict:
+        return _drop_defaults(self, {
+            "param_count": self.param_count,
+            "reference": self.reference,
+            "reference_source": self.reference_source,
+            "problem": self.problem,
+            "vectors": list(self.vectors),
+            "memory_problem": self.memory_problem,
+            "time_budget": self.time_budget.to_dict() if self.time_budget is not None else None,
+            "success_message": self.success_message,
+            "missing_message": self.missing_message,
+        })
+
+    def __reduce__(self):
+        return spec_from_dict, (self.to_dict(),)
+
+
+SPEC_KINDS: Dict[str, type] = {spec.kind: spec for spec in (ProgramSpec, FunctionSpec)}
+
+
+def _drop_defaults(spec, fields: dict) -> dict:
+    # Leave out anything still at its default - most specs only set a couple of fields
+    parameters = inspect.signature(type(spec)).parameters
+    data = {"kind": spec.kind}
+    for name, value in fields.items():
+        default = parameters[name].default
+        if isinstance(default, tuple):
+            default = list(default)
+        if default is inspect.Parameter.empty or value != default:
+            data[name] = value
+    return data
+
+
+def spec_from_dict(data: dict):
+    """Rebuild a spec from to_dict() output"""
+    fields = dict(data)
+    spec_class = SPEC_KINDS[fields.pop("kind")]
+    if fields.get("time_budget") is not None:
+        fields["time_budget"] = TimeBudget.from_dict(fields["time_budget"])
+    return spec_class(**fields)
@@ -0,0 +1,321 @@
+"""
+Long-running grading daemon speaking JSON-RPC 2.0, one JSON object per line.
+
+    python src/daemon.py                      # requests on stdin, responses on stdout
+    python src/daemon.py --socket /tmp/cca.sock
+
+The catalog is loaded (and parsed references compiled) once at startup, so a request
+only pays for the grading itself. Methods:
+
+    list      {"available_only": true}          -> [{id, title, category, difficulty, completed}]
+    submit    {"challenge_id": ..., "code": ...} -> {passed, message, output, attempts, score, unlocks, faster_than}
+    hint      {"challenge_id": ...}              -> {hint, hints_used}
+    progress  {}                                 -> the player's stats
+
+Checkers redirect sys.stdout, so grading is serialized with a lock even when several
+socket clients are connected. A submission that's still running after --timeout seconds
+is stopped by an alarm and fails; with --socket, the clients' threads hand their requests
+to the main thread so the alarm can reach them.
+"""
+import argparse
+import contextlib
+import copy
+import inspect
+import json
+import os
+import queue
+import socketserver
+import sys
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional
+from challenge import Challenge
+from challenge_parser import ChallengeParser
+from output_compare import BoundedCapture
+from challenge_watcher import ChallengeWatcher
+from challenges_data import get_all_challenges, load_pack_catalog, PROBLEMS_PATH, SKIPPED_EXTERNAL_IDS
+from game_engine import GameEngine
+from metering import DEFAULT_INSTRUCTION_BUDGET
+from time_budget import run_with_deadline
+
+GRADING_TIMEOUT = 10.0     # Seconds a submission may run before it's stopped and failed
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+UNKNOWN_CHALLENGE = -32001
+CHALLENGE_LOCKED = -32002
+
+
+class RPCError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class GradingService:
+    """The RPC methods, backed by one GameEngine"""
+
+    def __init__(self, engine: GameEngine, timeout: float = GRADING_TIMEOUT):
+        self.engine = engine
+        self.timeout = timeout
+        # One in-progress copy per challenge, so attempts/hints/time carry over between calls
+        self.sessions: Dict[str, Challenge] = {}
+        self.lock = threading.Lock()
+        self.watcher: Optional[ChallengeWatcher] = None
+        # Set by serve_main_thread(): requests from other threads are queued for it
+        self.main_jobs: Optional[queue.Queue] = None
+        self.methods = {
+            "list": self.list,
+            "submit": self.submit,
+            "hint": self.hint,
+            "progress": self.progress,
+        }
+
+    def _session(self, challenge_id) -> Challenge:
+        if not isinstance(challenge_id, str):
+            raise RPCError(INVALID_PARAMS, "challenge_id must be a string")
+        challenge = self.engine.get_challenge(challenge_id)
+        if challenge is None:
+            raise RPCError(UNKNOWN_CHALLENGE, f"Unknown challenge '{challenge_id}'")
+        if challenge.category.value not in self.engine.player_progress["unlocked_categories"]:
+            raise RPCError(CHALLENGE_LOCKED, f"Challenge '{challenge_id}' is still locked")
+
+        session = self.sessions.get(challenge_id)
+        if session is None or session.solution_checker is not challenge.solution_checker:
+            # New (or hot-reloaded) challenge - start a fresh attempt
+            session = copy.copy(challenge)
+            session.hints_used = 0
+            session.attempts = 0
+            session.start()
+            self.sessions[challenge_id] = session
+        return session
+
+    def list(self, available_only: bool = True):
+        completed = set(self.engine.player_progress["completed_challenges"])
+        challenges = (self.engine.get_available_challenges() if available_only
+                      else self.engine.all_challenges())
+        return [{
+            "id": challenge.id,
+            "title": challenge.title,
+            "category": challenge.category.value,
+            "difficulty": challenge.difficulty.name,
+            "completed": challenge.id in completed,
+        } for challenge in challenges]
+
+    def submit(self, challenge_id: str, code: str):
+        if not isinstance(code, str):
+            raise RPCError(INVALID_PARAMS, "code must be a string")
+        session = self._session(challenge_id)
+        # Anything the submission prints goes back to the client (up to a limit), not into the RPC stream
+        output = BoundedCapture()
+        with contextlib.redirect_stdout(output):
+            finished, elapsed, verdict = run_with_deadline(session.check_solution, (code,), self.timeout)
+        if finished:
+            passed, message = verdict
+        else:
+            passed, message = False, f"Ran for {elapsed:.1f}s - submissions get {self.timeout:g}s"
+
+        result = {"passed": passed, "message": message, "output": output.getvalue(),
+                  "attempts": session.attempts, "score": None, "unlocks": [], "faster_than": None}
+        if not passed:
+            self.engine.record_failed_attempt(session)
+        elif challenge_id not in self.engine.player_progress["completed_challenges"]:
+            result["faster_than"] = self.engine.solve_time_rank(session)
+            result["score"] = self.engine.complete_challenge(session)
+            result["unlocks"] = [unlock.title for unlock in self.engine.pop_unlocks()]
+            del self.sessions[challenge_id]
+        return result
+
+    def hint(self, challenge_id: str):
+        session = self._session(challenge_id)
+        used = session.hints_used
+        hint = session.get_hint()
+        if session.hints_used > used:
+            self.engine.record_hint(session)
+        return {"hint": hint, "hints_used": session.hints_used}
+
+    def progress(self):
+        return self.engine.get_player_stats()
+
+    def handle(self, request) -> Optional[dict]:
+        """Run one decoded request, returns the response (None for notifications)"""
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" or \
+                not isinstance(request.get("method"), str):
+            return _error(None, INVALID_REQUEST, "Invalid request")
+        request_id = request.get("id")
+        params = request.get("params", {})
+
+        method = self.methods.get(request["method"])
+        try:
+            if method is None:
+                raise RPCError(METHOD_NOT_FOUND, f"Unknown method '{request['method']}'")
+            args = _bind(method, params)
+            result = self.run_on_main_thread(self._call, method, args)
+        except RPCError as e:
+            return _error(request_id, e.code, e.message) if "id" in request else None
+        except Exception as e:
+            # Saving progress failed, say - the client hears about it and the daemon carries on
+            return _error(request_id, INTERNAL_ERROR, f"Internal error: {e}") if "id" in request else None
+
+        if "id" not in request:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def _call(self, method, args: inspect.BoundArguments):
+        with self.lock:
+            if self.watcher is not None:
+                # Reloaded problem files are swapped in here, never from the watcher's thread
+                self.watcher.apply_pending()
+            return method(*args.args, **args.kwargs)
+
+    def run_on_main_thread(self, func, *args):
+        """func(*args) on the main thread, where the grading timeout can interrupt it
+
+        Runs in place unless serve_main_thread() is taking requests from other threads.
+        """
+        if self.main_jobs is None or threading.current_thread() is threading.main_thread():
+            return func(*args)
+        future = Future()
+        self.main_jobs.put((future, func, args))
+        return future.result()
+
+    def serve_main_thread(self):
+        """Run queued requests until interrupted - call on the main thread"""
+        self.main_jobs = queue.Queue()
+        try:
+            while True:
+                future, func, args = self.main_jobs.get()
+                try:
+                    future.set_result(func(*args))
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            self.main_jobs = None
+
+    def handle_line(self, line: str) -> Optional[str]:
+        """Decode one line, run it and encode the response"""
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            return json.dumps(_error(None, PARSE_ERROR, f"Parse error: {e}"))
+        response = self.handle(request)
+        return json.dumps(response) if response is not None else None
+
+
+def _bind(method, params) -> inspect.BoundArguments:
+    # Check the params against the method's signature before running anything
+    try:
+        if isinstance(params, dict):
+            return inspect.signature(method).bind(**params)
+        if isinstance(params, list):
+            return inspect.signature(method).bind(*params)
+    except TypeError as e:
+        raise RPCError(INVALID_PARAMS, str(e))
+    raise RPCError(INVALID_PARAMS, "params must be an object or an array")
+
+
+def _error(request_id, code: int, message: str) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def serve_stream(service: GradingService, infile, outfile):
+    """Answer requests line by line until the input closes"""
+    for line in infile:
+        if not line.strip():
+            continue
+        response = service.handle_line(line)
+        if response is not None:
+            outfile.write(response + "\n")
+            outfile.flush()
+
+
+class _RPCHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in self.rfile:
+            line = raw.decode('utf-8', errors='replace')
+            if not line.strip():
+                continue
+            response = self.server.service.handle_line(line)
+            if response is not None:
+                self.wfile.write(response.encode('utf-8') + b"\n")
+
+
+class RPCSocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """One thread per connected client - the service lock keeps grading one at a time"""
+
+    daemon_threads = True
+
+    def __init__(self, path: str, service: GradingService):
+        if os.path.exists(path):
+            os.unlink(path)  # Stale socket from an earlier run
+        self.service = service
+        super().__init__(path, _RPCHandler)
+
+
+def _log_reload_errors(updated, removed_ids, errors):
+    # stdout may be the RPC channel
+    for path, error in errors:
+        print(f"Couldn't load {path}: {error}", file=sys.stderr)
+
+
+def create_service(player_id: str = "player", metering_budget: Optional[int] = None,
+                   watch: bool = True, timeout: float = GRADING_TIMEOUT) -> GradingService:
+    """Load the catalog once into a fresh engine"""
+    engine = GameEngine(player_id=player_id)
+    parser = ChallengeParser(PROBLEMS_PATH)
+    # Parsing reports on stdout, which may be our RPC channel
+    with contextlib.redirect_stdout(sys.stderr):
+        for challenge in get_all_challenges(parser, include_packs=False):
+            engine.add_challenge(challenge)
+        engine.add_packs(load_pack_catalog())
+    if metering_budget is not None:
+        engine.enable_metering(metering_budget)
+
+    service = GradingService(engine, timeout)
+    if watch:
+        service.watcher = ChallengeWatcher(parser, engine, skip_ids=SKIPPED_EXTERNAL_IDS,
+                                           on_reload=_log_reload_errors)
+        service.watcher.start()
+    return service
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade submissions over JSON-RPC without the interactive game")
+    parser.add_argument('--socket', help="listen on this Unix socket instead of stdin/stdout")
+    parser.add_argument('--player', default="player", help="player id to record progress under")
+    parser.add_argument('--metered', action='store_true', help="score by executed lines instead of time")
+    parser.add_argument('--budget', type=int, default=DEFAULT_INSTRUCTION_BUDGET)
+    parser.add_argument('--timeout', type=float, default=GRADING_TIMEOUT,
+                        help="seconds a submission may run before it fails")
+    args = parser.parse_args(argv)
+
+    service = create_service(args.player, args.budget if args.metered else None, timeout=args.timeout)
+    try:
+        if args.socket:
+            with RPCSocketServer(args.socket, service) as server:
+                print(f"Listening on {args.socket}", file=sys.stderr)
+                threading.Thread(target=server.serve_forever, daemon=True).start()
+                try:
+                    service.serve_main_thread()
+                finally:
+                    server.shutdown()
+        else:
+            serve_stream(service, sys.stdin, sys.stdout)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if service.watcher:
+            service.watcher.stop()
+        service.engine.save_progress()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,82 +1,306 @@
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 import json
 import os
+import time
 from challenge import Challenge, Category, Difficulty
+from challenge_pack import PackCatalog
+from recommender import ChallengeRecommender
+from leaderboard import LeaderboardSet, load_progress_store
+from analytics import AttemptStore, FAIL, PASS
+from vector_stats import VectorFailureStats
+from review import ReviewScheduler, solve_quality
+from solve_stats import SolveTimeStats
+from achievements import (AchievementEngine, Unlock, ChallengeCompleted, AttemptFailed,
+                          HintUsed)
 
 class GameEngine:
-    def __init__(self):
+    def __init__(self, player_id: str = "player", persist: bool = True):
         # Set up the main game state - keeping track of all challenges and player data
+        # (persist=False keeps everything in memory, e.g. for simulated players)
+        self.persist = persist
         self.challenges: Dict[str, Challenge] = {}
+        # Compiled packs, looked up by id on demand instead of loaded into self.challenges
+        self.packs: Optional[PackCatalog] = None
         self.player_progress = {
             "score": 0,
             "completed_challenges": [],
             "unlocked_categories": [Category.BASICS.value],  # Everyone starts with basics
-            "current_level": 1
+            "current_level": 1,
+            "completion_log": [],  # When/what/how many points, used to rebuild leaderboards
+            "solutions": {},  # Accepted code per challenge, for the similarity report
+            "reviews": {}  # Spaced-repetition card per completed challenge
         }
+        # Ratings for the player and every challenge, used for "what should I do next"
+        self.player_id = player_id
+        # Each player id saves separately (the default one keeps the original file name)
+        self.progress_file = ("player_progress.json" if player_id == "player"
+                              else f"player_progress_{player_id}.json")
+        self.ratings_file = "challenge_ratings.json"
+        self.recommender = ChallengeRecommender()
+        # Shared deployments keep one <player_id>.json per player in here
+        self.players_dir = "players"
+        self.leaderboards = LeaderboardSet()
+        # Line-count budget for metering mode, None keeps the normal wall-clock scoring
+        self.metering_budget = None
+        # Memory profiling on large inputs, with an optional cap in bytes
+        self.memory_profiling = False
+        self.memory_cap = None
+        # Time passing solutions that get performance tips against the reference
+        self.measure_speedup = False
+        # Level-ups, category unlocks and achievements are rules reacting to engine events
+        self.achievements = AchievementEngine()
+        self.pending_unlocks: List[Unlock] = []
+        # Every attempt, hint count and solve time, for "which challenges are too hard"
+        self.analytics_file = "attempt_analytics.bin"
+        self.analytics = AttemptStore()
+        # How often each test vector has failed, to run the likeliest failures first
+        self.test_stats_file = "test_failure_stats.json"
+        self.test_stats = VectorFailureStats()
+        # Everyone's solve times per challenge, for "faster than X% of learners"
+        self.solve_times_file = "solve_time_stats.json"
+        self.solve_times = SolveTimeStats()
         self.load_progress()
+        # Due dates for reviewing completed challenges (cards are saved with the progress)
+        self.reviews = ReviewScheduler(self.player_progress.setdefault("reviews", {}))
+        self.rebuild_leaderboards()
         
     def load_progress(self):
         # Try to load existing save data if it exists
-        progress_file = "player_progress.json"
-        if os.path.exists(progress_file):
-            with open(progress_file, 'r') as f:
+        if not self.persist:
+            return
+        if os.path.exists(self.progress_file):
+            with open(self.progress_file, 'r') as f:
                 self.player_progress = json.load(f)
+            self.player_progress.setdefault("completion_log", [])
+            self.player_progress.setdefault("solutions", {})
+        if os.path.exists(self.ratings_file):
+            with open(self.ratings_file, 'r') as f:
+                self.recommender.load_dict(json.load(f))
+        self.analytics = AttemptStore.load(self.analytics_file)
+        self.test_stats = VectorFailureStats.load(self.test_stats_file)
+        self.solve_times = SolveTimeStats.load(self.solve_times_file)
                 
     def save_progress(self):
         # Write current progress to disk so we don't lose it
-        with open("player_progress.json", 'w') as f:
+        if not self.persist:
+            return
+        with open(self.progress_file, 'w') as f:
             json.dump(self.player_progress, f, indent=2)
+        with open(self.ratings_file, 'w') as f:
+            json.dump(self.recommender.to_dict(), f)
+        if os.path.isdir(self.players_dir):
+            with open(os.path.join(self.players_dir, f"{self.player_id}.json"), 'w') as f:
+                json.dump(self.player_progress, f, indent=2)
+        # Only the attempts since the last save get appended
+        self.analytics.flush(self.analytics_file)
+        self.test_stats.save(self.test_stats_file)
+        self.solve_times.save(self.solve_times_file)
+            
+    def rebuild_leaderboards(self):
+        # Everyone in the shared store plus us (our in-memory progress is the freshest copy)
+        progress = load_progress_store(self.players_dir) if self.persist else {}
+        progress[self.player_id] = self.player_progress
+        self.leaderboards.rebuild(progress)
             
     def add_challenge(self, challenge: Challenge):
         # Register a new challenge in our system
+        self._configure_challenge(challenge)
         self.challenges[challenge.id] = challenge
+        self.recommender.add_challenge(challenge.id, challenge.difficulty)
+        
+    def add_packs(self, packs: PackCatalog):
+        # Pack entries are configured and rated the first time something looks them up
+        packs.on_load = self._pack_challenge_loaded
+        self.packs = packs
+        
+    def _pack_challenge_loaded(self, challenge: Challenge):
+        self._configure_challenge(challenge)
+        self.recommender.add_challenge(challenge.id, challenge.difficulty)
+        
+    def get_challenge(self, challenge_id: str) -> Optional[Challenge]:
+        # Problem files and built-ins first, then the packs
+        challenge = self.challenges.get(challenge_id)
+        if challenge is None and self.packs is not None:
+            challenge = self.packs.get(challenge_id)
+        return challenge
+        
+    def has_challenge(self, challenge_id: str) -> bool:
+        return challenge_id in self.challenges or (self.packs is not None and challenge_id in self.packs)
+        
+    def all_challenges(self) -> Iterator[Challenge]:
+        # Everything in the catalog - this is the one place every pack entry gets built
+        yield from self.challenges.values()
+        if self.packs is not None:
+            for challenge_id in self.packs:
+                if challenge_id not in self.challenges:
+                    yield self.packs[challenge_id]
+        
+    def _configured_challenges(self) -> List[Challenge]:
+        # Pack entries not looked up yet get configured when they are
+        loaded = self.packs.loaded() if self.packs is not None else []
+        return list(self.challenges.values()) + loaded
+        
+    def enable_metering(self, budget: int):
+        # Grade by executed lines (with a runaway-loop budget) instead of wall-clock time
+        self.metering_budget = budget
+        for challenge in self._configured_challenges():
+            self._configure_challenge(challenge)
+        
+    def enable_memory_profiling(self, memory_cap: int = None):
+        # Measure peak memory on large inputs, failing anything over memory_cap bytes
+        self.memory_profiling = True
+        self.memory_cap = memory_cap
+        for challenge in self._configured_challenges():
+            self._configure_challenge(challenge)
+        
+    def enable_speedup_measurement(self):
+        # Back the performance tips with a timing of the solution against the reference
+        self.measure_speedup = True
+        for challenge in self._configured_challenges():
+            self._configure_challenge(challenge)
+        
+    def _configure_challenge(self, challenge: Challenge):
+        challenge.test_stats = self.test_stats
+        if self.metering_budget is not None:
+            challenge.metering = True
+            challenge.instruction_budget = self.metering_budget
+        if self.memory_profiling:
+            challenge.memory_profiling = True
+            challenge.memory_cap = self.memory_cap
+        if self.measure_speedup:
+            challenge.measure_speedup = True
+        
+    def apply_challenge_updates(self, updated: List[Challenge], removed_ids: List[str] = ()):
+        # Build the new catalog on the side and swap it in with one assignment, so readers
+        # see either the old or the new dict. Challenges being played keep their own objects.
+        challenges = dict(self.challenges)
+        for challenge_id in removed_ids:
+            challenges.pop(challenge_id, None)
+        for challenge in updated:
+            self._configure_challenge(challenge)
+            challenges[challenge.id] = challenge
+        self.challenges = challenges
+        
+        for challenge_id in removed_ids:
+            self.recommender.remove_challenge(challenge_id)
+        for challenge in updated:
+            self.recommender.add_challenge(challenge.id, challenge.difficulty)
         
     def get_available_challenges(self) -> List[Challenge]:
         # Only show challenges the player has unlocked and hasn't completed yet
         available = []
-        for challenge in self.challenges.values():
+        for challenge in self.all_challenges():
             if (challenge.category.value in self.player_progress["unlocked_categories"] and
                 challenge.id not in self.player_progress["completed_challenges"]):
                 available.append(challenge)
         return available
         
+    def _is_available(self, challenge_id: str) -> bool:
+        challenge = self.get_challenge(challenge_id)
+        return (challenge is not None and
+                challenge.category.value in self.player_progress["unlocked_categories"] and
+                challenge.id not in self.player_progress["completed_challenges"])
+        
+    def get_recommended_challenges(self, k: int = 5) -> List[Challenge]:
+        # Best next challenges for the player's current skill rating
+        ids = self.recommender.recommend(self.player_id, k, is_candidate=self._is_available)
+        return [self.get_challenge(challenge_id) for challenge_id in ids]
+        
+    def record_failed_attempt(self, challenge: Challenge):
+        # A wrong answer nudges the player's rating down and the challenge's up
+        self.recommender.record_result(self.player_id, challenge.id, False)
+        self._record_attempt(challenge, FAIL)
+        self._publish(AttemptFailed(challenge.id))
+        
+    def record_hint(self, challenge: Challenge):
+        # Hints feed the achievement rules (e.g. "no hints in 5 challenges")
+        self._publish(HintUsed(challenge.id))
+        
     def complete_challenge(self, challenge: Challenge) -> int:
         # Handle when player finishes a challenge - award points and check for unlocks
         score = challenge.calculate_score()
         self.player_progress["score"] += score
         self.player_progress["completed_challenges"].append(challenge.id)
+        if challenge.last_submission is not None:
+            self.player_progress["solutions"][challenge.id] = challenge.last_submission
+        self.recommender.record_result(self.player_id, challenge.id, True)
+        self._record_attempt(challenge, PASS)
+        self.solve_times.record(challenge.id, challenge.get_time_taken())
+        
+        # Keep the leaderboards current instead of re-sorting everyone later
+        completed_at = time.time()
+        self.player_progress["completion_log"].append({
+            "id": challenge.id,
+            "category": challenge.category.value,
+            "score": score,
+            "time": completed_at
+        })
+        self.leaderboards.record_completion(self.player_id, challenge.category.value, score, completed_at)
+        
+        # First review tomorrow, or sooner/later depending on how the solve went
+        self.reviews.schedule(challenge.id, self._solve_quality(challenge), completed_at)
         
         # See if they leveled up or unlocked new stuff
-        self._check_progression()
+        self._publish(ChallengeCompleted(challenge.id, challenge.category.value, score,
+                                         challenge.get_time_taken(), challenge.hints_used, challenge.attempts))
         self.save_progress()
         
         return score
         
-    def _check_progression(self):
-        # Figure out if player should level up based on completed challenges
-        completed_count = len(self.player_progress["completed_challenges"])
-        new_level = completed_count // 3 + 1  # Level up every 3 challenges
+    def solve_time_rank(self, challenge: Challenge) -> Optional[float]:
+        # Percentage of recorded solves slower than this one - ask before completing it,
+        # so the learner is compared with everyone else (None until there are enough solves)
+        return self.solve_times.faster_than(challenge.id, challenge.get_time_taken())
+        
+    def get_due_reviews(self, limit: int = 5) -> List[Challenge]:
+        # Completed challenges whose review is due, most overdue first
+        ids = self.reviews.due(limit=limit, is_candidate=self.has_challenge)
+        return [self.get_challenge(challenge_id) for challenge_id in ids]
+        
+    def complete_review(self, challenge: Challenge) -> dict:
+        # A review earns no points, it just moves the next review further out (or resets it)
+        self.recommender.record_result(self.player_id, challenge.id, True)
+        self._record_attempt(challenge, PASS)
+        card = self.reviews.schedule(challenge.id, self._solve_quality(challenge))
+        self.save_progress()
+        return card
+        
+    def _solve_quality(self, challenge: Challenge) -> int:
+        # Harder challenges get more time before slowness counts against the solve
+        return solve_quality(challenge.get_time_taken(), challenge.hints_used, challenge.attempts,
+                             expected_time=60 * challenge.difficulty.value)
+        
+    def _record_attempt(self, challenge: Challenge, verdict: int):
+        # One row per submission - failures are written out with the next save
+        self.analytics.record(challenge.id, challenge.category.value, self.player_id, time.time(),
+                              challenge.get_time_taken(), challenge.hints_used, verdict)
+        
+    def _publish(self, event):
+        # Run the rules listening for this event and queue anything new for the UI
+        self.pending_unlocks.extend(self.achievements.publish(event, self.player_progress))
+        
+    def pop_unlocks(self) -> List[Unlock]:
+        # Hand over (and forget) whatever was earned since the last call
+        unlocks, self.pending_unlocks = self.pending_unlocks, []
+        return unlocks
+        
+    def get_leaderboard(self, board: str = "global", k: int = 10) -> List[tuple]:
+        # Top k (player_id, score) pairs - board is 'global', 'category:<name>' or 'window:<daily|weekly>'
+        return self.leaderboards.board(board).top(k)
+        
+    def get_rank(self, board: str = "global"):
+        # 1-based rank of this player on a board, None if they haven't scored there yet
+        return self.leaderboards.board(board).rank(self.player_id)
         
-        if new_level > self.player_progress["current_level"]:
-            self.player_progress["current_level"] = new_level
-            
-            # Unlock new categories as player progresses - don't want to overwhelm beginners
-            if new_level >= 2 and Category.DATA_STRUCTURES.value not in self.player_progress["unlocked_categories"]:
-                self.player_progress["unlocked_categories"].append(Category.DATA_STRUCTURES.value)
-            if new_level >= 4 and Category.ALGORITHMS.value not in self.player_progress["unlocked_categories"]:
-                self.player_progress["unlocked_categories"].append(Category.ALGORITHMS.value)
-            if new_level >= 6 and Category.PROBLEM_SOLVING.value not in self.player_progress["unlocked_categories"]:
-                self.player_progress["unlocked_categories"].append(Category.PROBLEM_SOLVING.value)
-            if new_level >= 8 and Category.DEBUGGING.value not in self.player_progress["unlocked_categories"]:
-                self.player_progress["unlocked_categories"].append(Category.DEBUGGING.value)
-            if new_level >= 10 and Category.LEETCODE.value not in self.player_progress["unlocked_categories"]:
-                self.player_progress["unlocked_categories"].append(Category.LEETCODE.value)
-                
     def get_player_stats(self) -> Dict:
         # Return current player info for display
         return {
             "level": self.player_progress["current_level"],
             "score": self.player_progress["score"],
             "completed": len(self.player_progress["completed_challenges"]),
+            "achievements": [a.title for a in self.achievements.earned_achievements(self.player_progress)],
+            "rating": round(self.recommender.player_rating(self.player_id)),
+            "rank": self.get_rank(),
+            "players": len(self.leaderboards.board("global")),
             "unlocked_categories": self.player_progress["unlocked_categories"]
         }
\ No newline at end of file
@@ -0,0 +1,482 @@
+"""
+Distributed grading: a coordinator hands submissions to grader processes over sockets.
+
+Workers (on this machine or others) connect to the coordinator, say hello and then send a
+heartbeat every second. The coordinator queues submissions and sends each one - the
+pickled challenge (its checker is a declarative spec, see checker_spec.py) plus the code -
+to a worker with a free slot, and resolves a Future with the verdict that comes back.
+
+A worker that disconnects, or goes HEARTBEAT_TIMEOUT seconds without a message, is dropped
+and its in-flight submissions go back to the front of the queue for another worker. A
+submission that has been lost with `max_attempts` workers fails instead of being retried
+forever.
+
+Each job carries a time limit (`job_timeout`): the worker stops a submission that runs past
+it with an alarm and reports a failed verdict. A worker that still hasn't answered a
+heartbeat timeout after that is stuck - the submission fails with GradingError and the
+worker is dropped.
+
+    python src/grading_cluster.py worker --connect gradehost:7070
+    python src/grading_cluster.py coordinator --listen 10.0.0.5:7070 < submissions.jsonl
+    python src/grading_cluster.py coordinator --listen /tmp/cca-grade.sock --local-workers 4 < submissions.jsonl
+
+Addresses are host:port for TCP, anything else is a Unix socket path; the coordinator listens
+on DEFAULT_LISTEN (localhost only) unless told otherwise. Messages are length-prefixed frames.
+What workers send (hello, heartbeat, result) is JSON, so the coordinator never unpickles
+anything a stranger on the network could send it. Jobs going the other way are pickles, so a
+worker must only connect to a coordinator it trusts - and anyone who can reach the coordinator
+can join as a worker and read the submissions, so don't listen beyond a trusted network.
+"""
+import argparse
+import contextlib
+import copy
+import itertools
+import json
+import os
+import pickle
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple, Union
+from challenge import Challenge
+from output_compare import BoundedCapture
+from time_budget import run_with_deadline
+
+HEARTBEAT_INTERVAL = 1.0     # Seconds between a worker's heartbeats
+HEARTBEAT_TIMEOUT = 5.0      # Silence after which a worker counts as dead
+MAX_ATTEMPTS = 3             # Workers a submission may be lost with before it fails
+JOB_TIMEOUT = 30.0           # Seconds a submission may run on a worker
+FRAME = struct.Struct('<I')
+MAX_FRAME = 64 * 1024 * 1024
+HELLO_MAX_FRAME = 64 * 1024  # Before a worker has introduced itself
+DEFAULT_LISTEN = "127.0.0.1:7070"
+
+
+class GradingError(Exception):
+    """A submission couldn't be graded (every worker it went to was lost, or we shut down)"""
+
+
+def parse_address(address: str) -> Tuple[int, Union[str, Tuple[str, int]]]:
+    """'host:port' -> TCP, anything else -> Unix socket path"""
+    host, _, port = address.rpartition(':')
+    if host and port.isdigit():
+        return socket.AF_INET, (host, int(port))
+    return socket.AF_UNIX, address
+
+
+def send_frame(sock: socket.socket, data: bytes) -> None:
+    sock.sendall(FRAME.pack(len(data)) + data)
+
+
+def send_json(sock: socket.socket, message: dict) -> None:
+    send_frame(sock, json.dumps(message).encode('utf-8'))
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks, remaining = [], size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 16))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_frame(sock: socket.socket, limit: int = MAX_FRAME) -> Optional[bytes]:
+    """The next frame, or None once the other side has closed the connection"""
+    header = _recv_exact(sock, FRAME.size)
+    if header is None:
+        return None
+    (size,) = FRAME.unpack(header)
+    if size > limit:
+        raise GradingError(f"Message of {size:,} bytes is too large")
+    return _recv_exact(sock, size)
+
+
+def recv_json(sock: socket.socket, limit: int = MAX_FRAME) -> Optional[dict]:
+    """The next JSON message (ValueError if it isn't a JSON object), None once the connection closed"""
+    data = recv_frame(sock, limit)
+    if data is None:
+        return None
+    message = json.loads(data.decode('utf-8'))
+    if not isinstance(message, dict):
+        raise ValueError("Expected a JSON object")
+    return message
+
+
+class _Job:
+    def __init__(self, job_id: int, payload: bytes, future: Future):
+        self.id = job_id
+        self.payload = payload
+        self.future = future
+        self.attempts = 0
+        self.dispatched = 0.0
+
+
+class _WorkerConnection:
+    def __init__(self, sock: socket.socket, peer: str):
+        self.sock = sock
+        self.name = peer
+        self.slots = 1
+        self.last_seen = time.monotonic()
+        self.jobs: Dict[int, _Job] = {}
+        self.alive = True
+        self.send_lock = threading.Lock()
+
+    def send(self, payload: bytes):
+        with self.send_lock:
+            send_frame(self.sock, payload)
+
+
+class GradingCoordinator:
+    """Queues submissions and farms them out to whichever workers are connected"""
+
+    def __init__(self, address: str, heartbeat_timeout: float = HEARTBEAT_TIMEOUT,
+                 max_attempts: int = MAX_ATTEMPTS, job_timeout: float = JOB_TIMEOUT):
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_attempts = max_attempts
+        self.job_timeout = job_timeout
+        family, bind_address = parse_address(address)
+        if family == socket.AF_UNIX and os.path.exists(bind_address):
+            os.unlink(bind_address)  # Stale socket from an earlier run
+        self._listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(bind_address)
+        self._listener.listen()
+        # Port 0 picks a free port - report the one we actually got
+        bound = self._listener.getsockname()
+        self.address = f"{bound[0]}:{bound[1]}" if family == socket.AF_INET else bound
+
+        self._condition = threading.Condition()
+        self._queue: deque = deque()
+        self._workers: List[_WorkerConnection] = []
+        self._job_ids = itertools.count(1)
+        self._closed = False
+        self.redispatched = 0
+        self._threads = [threading.Thread(target=self._accept_loop, daemon=True),
+                         threading.Thread(target=self._monitor_loop, daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, challenge: Challenge, code: str) -> Future:
+        """Queue a submission, the Future resolves to {passed, message, output, worker, attempts, seconds}
+
+        Raises GradingError if the challenge can't be pickled for the workers (pack entries hold an mmap).
+        """
+        # Failure stats are per host, and pickling them would ship the whole table
+        shipped = copy.copy(challenge)
+        shipped.test_stats = None
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise GradingError("The coordinator is closed")
+            job_id = next(self._job_ids)
+            try:
+                payload = pickle.dumps({"type": "job", "id": job_id, "challenge": shipped, "code": code,
+                                        "timeout": self.job_timeout})
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                raise GradingError(f"Can't send {challenge.id} to a worker: {e}")
+            self._queue.append(_Job(job_id, payload, future))
+            self._dispatch()
+        return future
+
+    def workers(self) -> List[str]:
+        with self._condition:
+            return [worker.name for worker in self._workers]
+
+    def wait_for_workers(self, count: int, timeout: float = None) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self._workers) >= count, timeout)
+
+    def in_flight(self) -> Dict[str, List[int]]:
+        """Job ids currently being graded, per worker"""
+        with self._condition:
+            return {worker.name: sorted(worker.jobs) for worker in self._workers if worker.jobs}
+
+    def _dispatch(self):
+        # Called with the condition held: fill every free worker slot from the queue
+        if self._closed:
+            return
+        for worker in list(self._workers):
+            while worker.alive and self._queue and len(worker.jobs) < worker.slots:
+                job = self._queue.popleft()
+                if job.attempts == 0 and not job.future.set_running_or_notify_cancel():
+                    continue  # Cancelled while it was queued
+                job.attempts += 1
+                job.dispatched = time.monotonic()
+                worker.jobs[job.id] = job
+                try:
+                    worker.send(job.payload)
+                except OSError:
+                    self._drop(worker, "send failed")
+
+    def _accept_loop(self):
+        while True:
+            try:
+                sock, peer = self._listener.accept()
+            except OSError:
+                return  # Listener closed
+            worker = _WorkerConnection(sock, str(peer) or "local")
+            threading.Thread(target=self._reader_loop, args=(worker,), daemon=True).start()
+
+    def _reader_loop(self, worker: _WorkerConnection):
+        try:
+            hello = recv_json(worker.sock, HELLO_MAX_FRAME)
+            if hello is None or hello.get("type") != "hello":
+                worker.sock.close()
+                return
+            with self._condition:
+                worker.name = str(hello.get("name") or worker.name)
+                worker.slots = max(1, int(hello.get("slots", 1)))
+                worker.last_seen = time.monotonic()
+                self._workers.append(worker)
+                self._dispatch()
+                self._condition.notify_all()
+
+            while True:
+                message = recv_json(worker.sock)
+                if message is None:
+                    break
+                with self._condition:
+                    worker.last_seen = time.monotonic()
+                    if message.get("type") == "result":
+                        self._finish(worker, message)
+        except (OSError, ValueError, TypeError, KeyError, GradingError):
+            pass  # Gone, or not speaking our protocol
+        with self._condition:
+            self._drop(worker, "disconnected")
+
+    def _finish(self, worker: _WorkerConnection, message: dict):
+        job = worker.jobs.pop(message["id"], None)
+        if job is None:
+            return  # Already given to another worker after this one was presumed dead
+        result = {key: message[key] for key in ("passed", "message", "output", "seconds")}
+        result.update(worker=worker.name, attempts=job.attempts)
+        job.future.set_result(result)
+        self._dispatch()
+
+    def _drop(self, worker: _WorkerConnection, reason: str):
+        # Called with the condition held - its jobs go back to the front of the queue
+        if not worker.alive:
+            return
+        worker.alive = False
+        if worker in self._workers:
+            self._workers.remove(worker)
+        with contextlib.suppress(OSError):
+            worker.sock.close()
+        for job in sorted(worker.jobs.values(), key=lambda job: job.id, reverse=True):
+            if job.attempts >= self.max_attempts:
+                job.future.set_exception(GradingError(
+                    f"Lost {job.attempts} workers while grading this submission (last: {worker.name}, {reason})"))
+            else:
+                self.redispatched += 1
+                self._queue.appendleft(job)
+        worker.jobs.clear()
+        self._dispatch()
+        self._condition.notify_all()
+
+    def _monitor_loop(self):
+        while True:
+            time.sleep(self.heartbeat_timeout / 4)
+            with self._condition:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                for worker in list(self._workers):
+                    if now - worker.last_seen > self.heartbeat_timeout:
+                        self._drop(worker, "missed heartbeats")
+                        continue
+                    # The worker's own alarm should have reported long before this
+                    overdue = [job for job in worker.jobs.values()
+                               if now - job.dispatched > self.job_timeout + self.heartbeat_timeout]
+                    for job in overdue:
+                        del worker.jobs[job.id]
+                        job.future.set_exception(GradingError(
+                            f"Still running on {worker.name} after {now - job.dispatched:.1f}s"))
+                    if overdue:
+                        self._drop(worker, "stuck on a submission")
+
+    def close(self):
+        """Stop accepting work, disconnect the workers and fail whatever is unfinished"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            for worker in list(self._workers):
+                with contextlib.suppress(OSError):
+                    worker.send(pickle.dumps({"type": "shutdown"}))
+                pending = list(worker.jobs.values())
+                worker.jobs.clear()
+                self._drop(worker, "shutting down")
+                self._queue.extend(pending)
+            while self._queue:
+                job = self._queue.popleft()
+                if not job.future.done():
+                    job.future.set_exception(GradingError("The coordinator shut down before grading this"))
+        self._listener.close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+
+class GradingWorker:
+    """Connects to a coordinator and grades whatever it sends, one submission at a time"""
+
+    def __init__(self, address: str, name: str = None, heartbeat_interval: float = HEARTBEAT_INTERVAL):
+        self.address = address
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.heartbeat_interval = heartbeat_interval
+        self.graded = 0
+        self._sock = None
+        self._send_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def _send(self, message: dict):
+        with self._send_lock:
+            send_json(self._sock, message)
+
+    def _heartbeat_loop(self):
+        # From its own thread, so a long grading run doesn't look like a dead worker
+        while not self._stopped.wait(self.heartbeat_interval):
+            try:
+                self._send({"type": "heartbeat"})
+            except OSError:
+                return
+
+    def grade(self, challenge: Challenge, code: str, timeout: float = None) -> dict:
+        """Run the checker, stopping it after `timeout` seconds (when we're on the main thread)"""
+        output = BoundedCapture()
+        started = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output):
+                if timeout is None:
+                    passed, message = challenge.check_solution(code)
+                else:
+                    finished, _, verdict = run_with_deadline(challenge.check_solution, (code,), timeout)
+                    passed, message = verdict if finished else (False, f"Still running after {timeout:g}s")
+        except KeyboardInterrupt:
+            raise
+        except BaseException as e:
+            # sys.exit() in a submission must not take the worker down with it
+            passed, message = False, f"Grader error: {e!r}"
+        return {"passed": bool(passed), "message": str(message), "output": output.getvalue(),
+                "seconds": time.perf_counter() - started}
+
+    def run(self) -> int:
+        """Grade until the coordinator shuts us down or goes away, returns how many were graded"""
+        family, address = parse_address(self.address)
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.connect(address)
+        self._send({"type": "hello", "name": self.name, "slots": 1})
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+        try:
+            while True:
+                try:
+                    data = recv_frame(self._sock)
+                    message = pickle.loads(data) if data is not None else None
+                except (OSError, EOFError, GradingError):
+                    break
+                if message is None or message.get("type") == "shutdown":
+                    break
+                if message.get("type") == "job":
+                    result = self.grade(message["challenge"], message["code"], message.get("timeout"))
+                    result.update(type="result", id=message["id"])
+                    try:
+                        self._send(result)
+                    except OSError:
+                        break  # The coordinator gave up on us
+                    self.graded += 1
+        finally:
+            self._stopped.set()
+            with contextlib.suppress(OSError):
+                self._sock.close()
+        return self.graded
+
+
+def start_local_workers(address: str, count: int, heartbeat_interval: float = HEARTBEAT_INTERVAL) -> List[subprocess.Popen]:
+    """Launch `count` worker processes on this machine, connected to `address`"""
+    return [subprocess.Popen([sys.executable, os.path.abspath(__file__), 'worker', '--connect', address,
+                              '--name', f"local-{index + 1}", '--heartbeat', str(heartbeat_interval)])
+            for index in range(count)]
+
+
+def _grade_batch(args) -> int:
+    # Submissions as JSON lines on stdin ({"challenge_id", "code"}), verdicts as JSON lines on stdout
+    from challenges_data import get_all_challenges
+    with contextlib.redirect_stdout(sys.stderr):
+        catalog = {challenge.id: challenge for challenge in get_all_challenges()}
+
+    with GradingCoordinator(args.listen, heartbeat_timeout=args.heartbeat_timeout,
+                            job_timeout=args.job_timeout) as coordinator:
+        print(f"Coordinator listening on {coordinator.address}", file=sys.stderr)
+        workers = start_local_workers(coordinator.address, args.local_workers) if args.local_workers else []
+        submissions = []
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            challenge = catalog.get(request.get("challenge_id"))
+            future, error = None, "Unknown challenge"
+            if challenge is not None:
+                # One submission that can't be sent fails on its own line, the rest still run
+                try:
+                    future = coordinator.submit(challenge, request.get("code", ""))
+                except GradingError as e:
+                    error = str(e)
+            submissions.append((request, future, error))
+
+        for request, future, error in submissions:
+            verdict = {"challenge_id": request.get("challenge_id")}
+            if future is None:
+                verdict.update(passed=False, message=error)
+            else:
+                try:
+                    verdict.update(future.result())
+                except GradingError as e:
+                    verdict.update(passed=False, message=str(e))
+            print(json.dumps(verdict), flush=True)
+    for worker in workers:
+        worker.wait()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade submissions on a pool of worker processes")
+    commands = parser.add_subparsers(dest='command', required=True)
+    coordinator = commands.add_parser('coordinator', help="Grade JSON-line submissions from stdin on connected workers")
+    coordinator.add_argument('--listen', default=DEFAULT_LISTEN,
+                             help=f"host:port or Unix socket path (default {DEFAULT_LISTEN}, this machine only)")
+    coordinator.add_argument('--local-workers', type=int, default=0, help="also start this many workers here")
+    coordinator.add_argument('--heartbeat-timeout', type=float, default=HEARTBEAT_TIMEOUT)
+    coordinator.add_argument('--job-timeout', type=float, default=JOB_TIMEOUT,
+                             help="seconds a submission may run before it fails")
+    worker = commands.add_parser('worker', help="Connect to a coordinator and grade what it sends")
+    worker.add_argument('--connect', required=True, help="the coordinator's host:port or socket path")
+    worker.add_argument('--name', help="shown in verdicts (default host:pid)")
+    worker.add_argument('--heartbeat', type=float, default=HEARTBEAT_INTERVAL, help="seconds between heartbeats")
+    args = parser.parse_args(argv)
+
+    if args.command == 'coordinator':
+        return _grade_batch(args)
+    try:
+        GradingWorker(args.connect, args.name, args.heartbeat).run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Large generated inputs for the known problems, used when grading efficiency (memory, time)
+"""
+import random
+from typing import Callable, Dict, Optional
+
+DEFAULT_LARGE_SIZE = 100_000
+
+
+def _two_sum(n: int, rng: random.Random) -> tuple:
+    # Multiples of 4 plus one 4k+1 and one 4k+2 at the end: the target is 3 mod 4, so the
+    # last two numbers are the only valid pair and early exits don't help
+    nums = [4 * value for value in rng.sample(range(-5 * n, 5 * n), n - 2)]
+    nums.append(4 * rng.randrange(n) + 1)
+    nums.append(4 * rng.randrange(n) + 2)
+    return (nums, nums[-1] + nums[-2])
+
+
+def _max_area(n: int, rng: random.Random) -> tuple:
+    return ([rng.randint(0, 10_000) for _ in range(n)],)
+
+
+def _palindrome(n: int, rng: random.Random) -> tuple:
+    half = ''.join(rng.choice('abcdefghij ,.') for _ in range(n // 2))
+    return (half + half[::-1],)
+
+
+def _anagram(n: int, rng: random.Random) -> tuple:
+    letters = [rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(n)]
+    shuffled = letters[:]
+    rng.shuffle(shuffled)
+    return (''.join(letters), ''.join(shuffled))
+
+
+def _plus_one(n: int, rng: random.Random) -> tuple:
+    # All nines forces the carry through every digit
+    return ([9] * n,)
+
+
+def _fizz_buzz(n: int, rng: random.Random) -> tuple:
+    return (n,)
+
+
+def _sort(n: int, rng: random.Random) -> tuple:
+    return ([rng.randint(-n, n) for _ in range(n)],)
+
+
+LARGE_INPUT_GENERATORS: Dict[str, Callable[[int, random.Random], tuple]] = {
+    'twoSum': _two_sum,
+    'maxArea': _max_area,
+    'is_palindrome': _palindrome,
+    'is_anagram': _anagram,
+    'plus_one': _plus_one,
+    'fizz_buzz': _fizz_buzz,
+    'sort': _sort,
+}
+
+
+def has_large_inputs(function_name: str) -> bool:
+    return function_name in LARGE_INPUT_GENERATORS
+
+
+def generate_large_input(function_name: str, n: int = DEFAULT_LARGE_SIZE, seed: int = 0) -> Optional[tuple]:
+    """Arguments of size n for a known problem (deterministic for a given seed), or None"""
+    generator = LARGE_INPUT_GENERATORS.get(function_name)
+    if generator is None:
+        return None
+    return generator(n, random.Random(seed))
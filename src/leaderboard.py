@@ -0,0 +1,223 @@
+"""
+Leaderboards kept up to date on every completion with an order-statistics treap
+"""
+import json
+import os
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class _Node:
+    __slots__ = ('key', 'priority', 'size', 'left', 'right')
+
+    def __init__(self, key):
+        self.key = key
+        self.priority = random.random()
+        self.size = 1
+        self.left = None
+        self.right = None
+
+
+def _size(node) -> int:
+    return node.size if node else 0
+
+
+def _update(node):
+    node.size = 1 + _size(node.left) + _size(node.right)
+
+
+def _split(node, key):
+    # Split into (keys < key, keys >= key)
+    if node is None:
+        return None, None
+    if node.key < key:
+        left, right = _split(node.right, key)
+        node.right = left
+        _update(node)
+        return node, right
+    left, right = _split(node.left, key)
+    node.left = right
+    _update(node)
+    return left, node
+
+
+def _merge(left, right):
+    if left is None or right is None:
+        return left or right
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+class OrderStatisticTree:
+    """Treap with subtree sizes: insert, remove, rank and k-th smallest in O(log n)"""
+
+    def __init__(self):
+        self._root = None
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def insert(self, key):
+        left, right = _split(self._root, key)
+        self._root = _merge(_merge(left, _Node(key)), right)
+
+    def remove(self, key) -> bool:
+        left, rest = _split(self._root, key)
+        # Everything in `rest` is >= key, so the smallest element is the one to drop
+        if rest is None:
+            self._root = left
+            return False
+        node = rest
+        while node.left is not None:
+            node = node.left
+        if node.key != key:
+            self._root = _merge(left, rest)
+            return False
+        # Walk down again to unlink it, fixing sizes on the way
+        rest = self._remove_min(rest)
+        self._root = _merge(left, rest)
+        return True
+
+    def _remove_min(self, node):
+        if node.left is None:
+            return node.right
+        node.left = self._remove_min(node.left)
+        _update(node)
+        return node
+
+    def rank(self, key) -> int:
+        """Number of keys strictly smaller than `key`"""
+        count, node = 0, self._root
+        while node is not None:
+            if node.key < key:
+                count += _size(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return count
+
+    def kth(self, index: int):
+        """0-based k-th smallest key"""
+        node = self._root
+        while node is not None:
+            left_size = _size(node.left)
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node.key
+            else:
+                index -= left_size + 1
+                node = node.right
+        raise IndexError(index)
+
+    def smallest(self, count: int) -> list:
+        """First `count` keys in order - O(log n + count)"""
+        result, stack, node = [], [], self._root
+        while (stack or node is not None) and len(result) < count:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                node = stack.pop()
+                result.append(node.key)
+                node = node.right
+        return result
+
+
+class Leaderboard:
+    """Scores per player, ranked highest first"""
+
+    def __init__(self):
+        self.scores: Dict[str, int] = {}
+        self._tree = OrderStatisticTree()
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def add_score(self, player_id: str, points: int):
+        self.set_score(player_id, self.scores.get(player_id, 0) + points)
+
+    def set_score(self, player_id: str, score: int):
+        if player_id in self.scores:
+            self._tree.remove((-self.scores[player_id], player_id))
+        self.scores[player_id] = score
+        # Negative score so the tree's smallest key is the best player, ties broken by id
+        self._tree.insert((-score, player_id))
+
+    def rank(self, player_id: str) -> Optional[int]:
+        """1-based rank, or None if the player isn't on this board"""
+        if player_id not in self.scores:
+            return None
+        return self._tree.rank((-self.scores[player_id], player_id)) + 1
+
+    def top(self, k: int = 10) -> List[Tuple[str, int]]:
+        return [(player_id, -negative) for negative, player_id in self._tree.smallest(k)]
+
+
+class LeaderboardSet:
+    """Global, per-category and time-windowed boards updated together on each completion"""
+
+    WINDOWS = {
+        "daily": 24 * 60 * 60,
+        "weekly": 7 * 24 * 60 * 60,
+    }
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.boards: Dict[str, Leaderboard] = {"global": Leaderboard()}
+        self._window_periods: Dict[str, int] = {}
+
+    def board(self, name: str) -> Leaderboard:
+        """Board by name: 'global', 'category:<value>' or 'window:<daily|weekly>'"""
+        if name.startswith("window:"):
+            self._roll_window(name[len("window:"):])
+        return self.boards.setdefault(name, Leaderboard())
+
+    def record_completion(self, player_id: str, category: str, points: int, timestamp: float = None):
+        timestamp = self.clock() if timestamp is None else timestamp
+        self.boards["global"].add_score(player_id, points)
+        self.board(f"category:{category}").add_score(player_id, points)
+        for window, length in self.WINDOWS.items():
+            # Only completions inside the current period count towards a window board
+            self._roll_window(window)
+            if int(timestamp // length) == self._window_periods[window]:
+                self.boards[f"window:{window}"].add_score(player_id, points)
+
+    def _roll_window(self, window: str):
+        # Start a fresh board when the current day/week is over
+        period = int(self.clock() // self.WINDOWS[window])
+        if self._window_periods.get(window) != period:
+            self._window_periods[window] = period
+            self.boards[f"window:{window}"] = Leaderboard()
+
+    def rebuild(self, progress_by_player: Dict[str, dict]):
+        """Recreate every board from saved progress (used at startup)"""
+        self.boards = {"global": Leaderboard()}
+        self._window_periods = {}
+        for player_id, progress in progress_by_player.items():
+            log = progress.get("completion_log", [])
+            for entry in log:
+                self.record_completion(player_id, entry["category"], entry["score"], entry["time"])
+            # Older saves have a score but no log, keep the global board right for them
+            self.boards["global"].set_score(player_id, progress.get("score", 0))
+
+
+def load_progress_store(directory: str) -> Dict[str, dict]:
+    """Read every <player_id>.json progress file in a shared progress directory"""
+    progress = {}
+    if not os.path.isdir(directory):
+        return progress
+    for filename in os.listdir(directory):
+        if filename.endswith('.json'):
+            try:
+                with open(os.path.join(directory, filename), 'r') as f:
+                    progress[filename[:-len('.json')]] = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable progress file {filename}: {e}")
+    return progress
@@ -0,0 +1,287 @@
+"""
+Synthetic load generator: simulated players browsing, asking for hints and submitting
+correct, wrong and looping code straight through GameEngine and the grading path.
+
+    python src/load_test.py --players 50 --workers 4 --duration 30
+
+Each worker process runs its share of the players round-robin in one thread (checkers
+redirect sys.stdout, so grading isn't thread-safe), and latencies from all workers are
+merged into p50/p95/p99 per operation.
+"""
+import argparse
+import ast
+import contextlib
+import copy
+import json
+import multiprocessing
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+from challenges_data import get_all_challenges
+from output_compare import BoundedCapture
+from game_engine import GameEngine
+
+DEFAULT_LOOP_BUDGET = 100_000  # Lines before a looping submission is stopped
+
+
+def _function_arity(code: Optional[str]) -> Optional[int]:
+    # Number of parameters of the first function in a solution, None if it has no function
+    try:
+        tree = ast.parse(code or "")
+    except SyntaxError:
+        return None
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            return len(node.args.args)
+    return None
+
+
+def build_corpus(challenges, extra_corpus: dict = None) -> Dict[str, dict]:
+    """Correct, wrong and looping submissions for every challenge with a known answer"""
+    corpus = {}
+    for challenge in challenges:
+        if not challenge.expected_answer:
+            continue
+        arity = _function_arity(challenge.expected_answer)
+        if arity is None:
+            # Script-style challenges: a wrong script, and no looping one - the checker
+            # exec()s top-level code directly, so nothing could stop the loop
+            entry = {"correct": [challenge.expected_answer], "wrong": ["x = 1"], "looping": []}
+        else:
+            params = ", ".join(f"a{i}" for i in range(arity))
+            entry = {
+                "correct": [challenge.expected_answer],
+                "wrong": [f"def attempt({params}):\n    return None"],
+                "looping": [f"def attempt({params}):\n    n = 0\n    while True:\n        n += 1"],
+            }
+        corpus[challenge.id] = entry
+
+    for challenge_id, submissions in (extra_corpus or {}).items():
+        entry = corpus.setdefault(challenge_id, {"correct": [], "wrong": [], "looping": []})
+        for kind in ("correct", "wrong", "looping"):
+            entry[kind].extend(submissions.get(kind, []))
+    return corpus
+
+
+class LatencyRecorder:
+    """Latencies per operation name, in seconds"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+
+    def timed(self, operation: str, func, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.samples.setdefault(operation, []).append(time.perf_counter() - started)
+
+    def merge(self, samples: Dict[str, List[float]]):
+        for operation, values in samples.items():
+            self.samples.setdefault(operation, []).extend(values)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class VirtualPlayer:
+    """One simulated learner, advanced one action at a time by the scheduler"""
+
+    def __init__(self, player_id: str, challenges, corpus: dict, recorder: LatencyRecorder,
+                 rng: random.Random, budget: Optional[int], hint_rate: float, wrong_rate: float,
+                 loop_rate: float):
+        self.player_id = player_id
+        self.catalog = [c for c in challenges if c.id in corpus and corpus[c.id]["correct"]]
+        self.corpus = corpus
+        self.recorder = recorder
+        self.rng = rng
+        self.budget = budget
+        self.hint_rate = hint_rate
+        self.wrong_rate = wrong_rate
+        self.loop_rate = loop_rate if budget is not None else 0.0
+        self.unexpected_failures = 0
+        self.engine = self._new_engine()
+        self.actions = self._behaviour()
+
+    def _new_engine(self) -> GameEngine:
+        engine = GameEngine(player_id=self.player_id, persist=False)
+        for challenge in self.catalog:
+            engine.add_challenge(challenge)
+        if self.budget is not None:
+            engine.enable_metering(self.budget)
+        return engine
+
+    def step(self):
+        next(self.actions)
+
+    def _session(self, challenge):
+        # Private copy so players sharing a catalog don't share attempts/hints/timers
+        session = copy.copy(challenge)
+        session.start_time = None
+        session.hints_used = 0
+        session.attempts = 0
+        return session
+
+    def _behaviour(self):
+        timed = self.recorder.timed
+        while True:
+            available = timed("browse", self.engine.get_available_challenges)
+            recommended = timed("recommend", self.engine.get_recommended_challenges, 5)
+            yield
+            if not available:
+                # Finished everything they can reach - start over as a fresh player
+                self.engine = self._new_engine()
+                continue
+
+            challenge = self._session(self.rng.choice(recommended or available))
+            challenge.start()
+            submissions = self.corpus[challenge.id]
+
+            if self.rng.random() < self.hint_rate:
+                timed("hint", challenge.get_hint)
+                self.engine.record_hint(challenge)
+                yield
+
+            while self.rng.random() < self.wrong_rate:
+                if submissions["looping"] and self.rng.random() < self.loop_rate:
+                    operation, code = "submit_looping", self.rng.choice(submissions["looping"])
+                else:
+                    operation, code = "submit_wrong", self.rng.choice(submissions["wrong"])
+                timed(operation, challenge.check_solution, code)
+                self.engine.record_failed_attempt(challenge)
+                yield
+
+            success, _ = timed("submit_correct", challenge.check_solution,
+                               self.rng.choice(submissions["correct"]))
+            if success:
+                timed("complete", self.engine.complete_challenge, challenge)
+            else:
+                self.unexpected_failures += 1
+            yield
+
+
+def run_worker(options: dict) -> dict:
+    """Simulate a slice of the players for `duration` seconds, returns raw samples"""
+    rng = random.Random(options["seed"])
+    recorder = LatencyRecorder()
+
+    # Checkers and problem parsing print - keep the report readable
+    # (discarded as it's written - a long run would otherwise pile it all up in memory)
+    with contextlib.redirect_stdout(BoundedCapture(limit=0)):
+        challenges = get_all_challenges()
+        corpus = build_corpus(challenges, options.get("extra_corpus"))
+        players = [
+            VirtualPlayer(f"vp{options['worker']}-{i}", challenges, corpus, recorder,
+                          random.Random(rng.random()), options["budget"], options["hint_rate"],
+                          options["wrong_rate"], options["loop_rate"])
+            for i in range(options["players"])
+        ]
+
+        deadline = time.perf_counter() + options["duration"]
+        while players and time.perf_counter() < deadline:
+            for player in players:
+                player.step()
+
+    return {
+        "samples": recorder.samples,
+        "unexpected_failures": sum(player.unexpected_failures for player in players),
+    }
+
+
+def run_load_test(players: int = 10, workers: int = 1, duration: float = 10.0, seed: int = 0,
+                  budget: Optional[int] = DEFAULT_LOOP_BUDGET, hint_rate: float = 0.3,
+                  wrong_rate: float = 0.4, loop_rate: float = 0.1, extra_corpus: dict = None) -> dict:
+    """Run the simulation and return per-operation stats"""
+    workers = max(1, min(workers, players))
+    jobs = []
+    for worker in range(workers):
+        # Spread the players as evenly as possible over the workers
+        share = players // workers + (1 if worker < players % workers else 0)
+        jobs.append({"worker": worker, "players": share, "duration": duration, "seed": seed + worker,
+                     "budget": budget, "hint_rate": hint_rate, "wrong_rate": wrong_rate,
+                     "loop_rate": loop_rate, "extra_corpus": extra_corpus})
+
+    started = time.perf_counter()
+    if workers == 1:
+        results = [run_worker(jobs[0])]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(run_worker, jobs)
+    elapsed = time.perf_counter() - started
+
+    recorder = LatencyRecorder()
+    for result in results:
+        recorder.merge(result["samples"])
+
+    operations = {}
+    for operation, values in sorted(recorder.samples.items()):
+        values.sort()
+        operations[operation] = {
+            "count": len(values),
+            "throughput": len(values) / elapsed,
+            "p50": percentile(values, 0.50),
+            "p95": percentile(values, 0.95),
+            "p99": percentile(values, 0.99),
+            "max": values[-1],
+        }
+    return {
+        "players": players,
+        "workers": workers,
+        "elapsed": elapsed,
+        "operations": operations,
+        "total_throughput": sum(op["count"] for op in operations.values()) / elapsed,
+        "unexpected_failures": sum(result["unexpected_failures"] for result in results),
+    }
+
+
+def print_report(report: dict):
+    print(f"\n{report['players']} players on {report['workers']} worker(s) for {report['elapsed']:.1f}s")
+    print(f"{'operation':<16}{'count':>8}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    print("-" * 74)
+    for operation, stats in report["operations"].items():
+        print(f"{operation:<16}{stats['count']:>8}{stats['throughput']:>10.1f}"
+              f"{stats['p50'] * 1000:>10.2f}{stats['p95'] * 1000:>10.2f}"
+              f"{stats['p99'] * 1000:>10.2f}{stats['max'] * 1000:>10.2f}")
+    print("-" * 74)
+    print(f"Total throughput: {report['total_throughput']:.1f} ops/s")
+    if report["unexpected_failures"]:
+        print(f"Warning: {report['unexpected_failures']} 'correct' submissions from the corpus failed")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate many players against the game engine")
+    parser.add_argument('--players', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=1, help="worker processes to spread players over")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds to run")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--budget', type=int, default=DEFAULT_LOOP_BUDGET,
+                        help="metering budget that stops looping submissions (0 = no metering, no loops)")
+    parser.add_argument('--hint-rate', type=float, default=0.3)
+    parser.add_argument('--wrong-rate', type=float, default=0.4)
+    parser.add_argument('--loop-rate', type=float, default=0.1, help="share of wrong submissions that loop")
+    parser.add_argument('--corpus', help="JSON file of extra submissions: {id: {correct/wrong/looping: [...]}}")
+    parser.add_argument('--json', action='store_true', help="print the raw report as JSON")
+    args = parser.parse_args(argv)
+
+    extra_corpus = None
+    if args.corpus:
+        with open(args.corpus, 'r') as f:
+            extra_corpus = json.load(f)
+
+    report = run_load_test(args.players, args.workers, args.duration, args.seed,
+                           args.budget or None, args.hint_rate, args.wrong_rate, args.loop_rate,
+                           extra_corpus)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
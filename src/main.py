@@ -1,8 +1,16 @@
 #!/usr/bin/env python3
 
+import argparse
+import copy
 from game_engine import GameEngine
 from ui import GameUI
-from challenges_data import get_all_challenges
+from challenges_data import get_all_challenges, load_pack_catalog, PROBLEMS_PATH, SKIPPED_EXTERNAL_IDS
+from challenge_parser import ChallengeParser
+from challenge_watcher import ChallengeWatcher
+from metering import DEFAULT_INSTRUCTION_BUDGET
+from challenge_browser import ChallengeBrowser
+from submission_watcher import SubmissionWatcher, prepare_submission_file
+from warmup import Warmup
 
 class Game:
     def __init__(self):
@@ -10,23 +18,43 @@ class Game:
         self.engine = GameEngine()
         self.ui = GameUI()
         self.running = True
+        self.page_size = 8  # How many challenges the browser shows per page
+        # Prepares the challenge on screen in the background, ahead of the first submission
+        self.warmup = Warmup()
         
         # Load all the challenges into our game engine
-        for challenge in get_all_challenges():
+        parser = ChallengeParser(PROBLEMS_PATH)
+        for challenge in get_all_challenges(parser, include_packs=False):
             self.engine.add_challenge(challenge)
+        # Pack entries stay in their files until something looks them up
+        self.engine.add_packs(load_pack_catalog())
+        
+        # Pick up added/edited/deleted problem files without a restart
+        self.watcher = ChallengeWatcher(parser, self.engine, skip_ids=SKIPPED_EXTERNAL_IDS,
+                                        on_reload=self.ui.show_challenge_reload)
+        self.watcher.start()
     
     def run(self):
         # Main game loop - keep going until player quits
         self.ui.clear_screen()
         self.ui.print_header()
         
-        while self.running:
-            self.show_main_menu()
+        try:
+            while self.running:
+                self.show_main_menu()
+        finally:
+            self.watcher.stop()
+            # Failed attempts since the last completion still need writing out
+            self.engine.save_progress()
+            # Make sure the last frame (e.g. the goodbye message) reaches the terminal
+            self.ui.flush()
     
     def show_main_menu(self):
         # Handle the main menu interactions
+        # Swap in problem files the watcher picked up while we were busy
+        self.watcher.apply_pending()
         self.ui.show_main_menu()
-        choice = self.ui.get_user_choice(4)
+        choice = self.ui.get_user_choice(5)
         
         if choice == 1:
             self.start_challenge()
@@ -35,6 +63,8 @@ class Game:
         elif choice == 3:
             self.show_categories()
         elif choice == 4:
+            self.review_challenges()
+        elif choice == 5:
             self.quit_game()
         elif choice is None:  # Ctrl+C handling
             self.quit_game()
@@ -48,74 +78,149 @@ class Game:
             self.ui.pause()
             return
         
-        self.ui.clear_screen()
-        self.ui.print_header()
-        self.ui.show_challenges(available_challenges)
-        
-        print(f"\nChoose a challenge (1-{len(available_challenges)}) or 0 to go back: ", end="")
-        choice = self.ui.get_user_choice(len(available_challenges))
-        
-        if choice is None or choice == 0:
-            return
-        
-        # Start the selected challenge
-        selected_challenge = available_challenges[choice - 1]
-        self.play_challenge(selected_challenge)
+        # Page through the catalog instead of dumping everything at once
+        browser = ChallengeBrowser(available_challenges, page_size=self.page_size)
+        # Best matches for the player's rating go first, the rest keep their usual order
+        browser.set_ranking(self.engine.get_recommended_challenges(k=self.page_size))
+        message = None
+        while True:
+            self.ui.clear_screen()
+            self.ui.print_header()
+            self.ui.show_challenge_page(browser)
+            if message:
+                self.ui.show_error(message)
+            
+            action, value = browser.handle_command(self.ui.get_browser_command())
+            if action == 'back':
+                return
+            if action == 'select':
+                self.play_challenge(value)
+                return
+            message = value if action == 'error' else None
+    
+    def review_challenges(self):
+        # Replay completed challenges as their spaced-repetition reviews come due
+        while True:
+            due = self.engine.get_due_reviews(limit=1)
+            if not due:
+                self.ui.clear_screen()
+                self.ui.print_header()
+                next_due = self.engine.reviews.next_due()
+                self.ui.show_no_reviews(next_due[0] if next_due else None)
+                self.ui.pause()
+                return
+            # Fresh attempt/hint counts so the review is judged on its own
+            session = copy.copy(due[0])
+            session.hints_used = 0
+            session.attempts = 0
+            if not self.play_challenge(session, review=True):
+                return
     
-    def play_challenge(self, challenge):
-        # Handle the actual challenge gameplay
+    def play_challenge(self, challenge, review=False) -> bool:
+        # Handle the actual challenge gameplay - returns True if it was solved
         challenge.start()
         self.ui.show_challenge_details(challenge)
-        
+        # Get the checker ready (reference, expected outputs, timings) while they read and type
+        self.warmup.start(challenge)
+        attempts_before = challenge.attempts
+        try:
+            return self.solve_loop(challenge, review)
+        finally:
+            if challenge.attempts == attempts_before:
+                # Left without submitting - don't hold on to what was prepared
+                self.warmup.cancel()
+            else:
+                self.warmup.keep()
+    
+    def solve_loop(self, challenge, review=False) -> bool:
+        # Read code and commands until they solve it or quit
         while True:
             user_input = self.ui.get_user_code()
             
             if user_input == 'QUIT':
-                break
+                return False
             elif user_input == 'HINT':
                 hint = challenge.get_hint()
+                self.engine.record_hint(challenge)
                 self.ui.show_hint(hint)
                 continue
+            elif user_input == 'WATCH':
+                if self.watch_challenge(challenge, review):
+                    return True
+                continue
             elif user_input == 'EDIT':
                 # Let them edit their previous code
                 user_input = self.ui.get_user_code(editing_mode=True, previous_code=self.ui.last_submitted_code)
-                if user_input in ['QUIT', 'HINT']:
+                if user_input in ['QUIT', 'HINT', 'WATCH']:
                     if user_input == 'QUIT':
-                        break
+                        return False
                     elif user_input == 'HINT':
                         hint = challenge.get_hint()
+                        self.engine.record_hint(challenge)
                         self.ui.show_hint(hint)
                         continue
+                    elif user_input == 'WATCH':
+                        if self.watch_challenge(challenge, review):
+                            return True
+                        continue
             
             # Check if their solution is correct
             success, message = challenge.check_solution(user_input)
             
             if success:
-                # They got it right! Award points and mark complete
-                score = self.engine.complete_challenge(challenge)
-                self.ui.show_result(True, message, score)
-                
-                # Check if they unlocked anything new
-                self.check_for_unlocks()
-                self.ui.pause()
-                break
+                self.finish_challenge(challenge, message, review)
+                return True
             else:
                 # Not quite right, let them try again
+                self.engine.record_failed_attempt(challenge)
                 self.ui.show_result(False, message)
                 attempts_left = 3 - challenge.attempts
                 if attempts_left > 0:
-                    print(f"\nYou have {attempts_left} attempt(s) left before seeing the solution.")
-                print(f"Try again, type {self.ui.colors['info']}EDIT{self.ui.colors['reset']} to modify your previous code, or {self.ui.colors['info']}QUIT{self.ui.colors['reset']} to return to menu.")
+                    self.ui.echo(f"\nYou have {attempts_left} attempt(s) left before seeing the solution.")
+                self.ui.echo(f"Try again, type {self.ui.colors['info']}EDIT{self.ui.colors['reset']} to modify your previous code, or {self.ui.colors['info']}QUIT{self.ui.colors['reset']} to return to menu.")
+    
+    def finish_challenge(self, challenge, message, review=False):
+        if review:
+            # Reviews don't score again, they just push the next review out
+            card = self.engine.complete_review(challenge)
+            self.ui.show_result(True, message)
+            self.ui.show_review_scheduled(card)
+        else:
+            # They got it right! Award points and mark complete
+            faster_than = self.engine.solve_time_rank(challenge)
+            score = self.engine.complete_challenge(challenge)
+            self.ui.show_result(True, message, score, faster_than)
+            
+            # Check if they unlocked anything new
+            self.check_for_unlocks()
+        self.ui.pause()
+    
+    def watch_challenge(self, challenge, review=False) -> bool:
+        # Grade the challenge's file every time it's saved - returns True once it passes
+        path = prepare_submission_file(challenge, starter_code=self.ui.last_submitted_code or "")
+        watcher = SubmissionWatcher(path)
+        self.ui.show_watching(path)
+        try:
+            while True:
+                code = watcher.wait()
+                self.ui.echo(f"\nChecking your saved code (attempt {challenge.attempts + 1})...")
+                self.ui.last_submitted_code = code
+                success, message = challenge.check_solution(code)
+                if success:
+                    self.finish_challenge(challenge, message, review)
+                    return True
+                self.engine.record_failed_attempt(challenge)
+                self.ui.show_result(False, message)
+                self.ui.flush()
+        except KeyboardInterrupt:
+            self.ui.echo("\nStopped watching. Type your code, WATCH again, or QUIT.")
+            return False
     
     def check_for_unlocks(self):
-        # See if player unlocked new categories and let them know
-        stats = self.engine.get_player_stats()
-        current_level = stats['level']
-        
-        # This is a simple way to show level up messages
-        # In a real game might want to track this better
-        if current_level > 1:
-            print(f"\nYou're now level {current_level}! Keep up the great work!")
+        # Show whatever the achievement rules unlocked with this completion (if anything)
+        unlocks = self.engine.pop_unlocks()
+        if unlocks:
+            self.ui.show_unlocks(unlocks)
     
     def show_progress(self):
         # Display current player stats
@@ -123,6 +228,8 @@ class Game:
         self.ui.print_header()
         stats = self.engine.get_player_stats()
         self.ui.show_progress(stats)
+        self.ui.show_leaderboard("Top Players", self.engine.get_leaderboard("global", 5), self.engine.player_id)
+        self.ui.show_leaderboard("This Week", self.engine.get_leaderboard("window:weekly", 5), self.engine.player_id)
         self.ui.pause()
     
     def show_categories(self):
@@ -131,8 +238,8 @@ class Game:
         self.ui.print_header()
         stats = self.engine.get_player_stats()
         
-        print("\nChallenge Categories:")
-        print("=" * 30)
+        self.ui.echo("\nChallenge Categories:")
+        self.ui.echo("=" * 30)
         
         all_categories = {
             "basics": "Fundamentals - Variables, loops, basic syntax",
@@ -140,27 +247,48 @@ class Game:
             "algorithms": "Sorting, searching, and algorithmic thinking",
             "problem_solving": "Real-world coding challenges",
             "debugging": "Find and fix broken code",
-            "leetcode_style": "Classic interview questions and LeetCode problems"
+            "leetcode_style": "Classic interview questions and LeetCode problems",
+            "optimization": "Correct isn't enough - solutions must scale to huge inputs"
         }
         
         for category, description in all_categories.items():
             if category in stats['unlocked_categories']:
-                print(f"✓ {category.replace('_', ' ').title()}: {description}")
+                self.ui.echo(f"✓ {category.replace('_', ' ').title()}: {description}")
             else:
-                print(f"🔒 {category.replace('_', ' ').title()}: {description} (Locked)")
+                self.ui.echo(f"🔒 {category.replace('_', ' ').title()}: {description} (Locked)")
         
         self.ui.pause()
     
     def quit_game(self):
         # Clean exit from the game
-        print(f"\nThanks for playing Code Challenge Arena!")
-        print("Keep practicing and you'll be a coding master in no time!")
+        self.ui.echo(f"\nThanks for playing Code Challenge Arena!")
+        self.ui.echo("Keep practicing and you'll be a coding master in no time!")
         self.running = False
 
 def main():
     # Entry point - start up the game
+    arg_parser = argparse.ArgumentParser(description="Code Challenge Arena")
+    arg_parser.add_argument('--metered', action='store_true',
+                            help="score by executed lines of your function instead of wall-clock time")
+    arg_parser.add_argument('--budget', type=int, default=DEFAULT_INSTRUCTION_BUDGET,
+                            help="line budget per check in metered mode (stops runaway loops)")
+    arg_parser.add_argument('--memory', action='store_true',
+                            help="measure peak memory of your solution on a large input")
+    arg_parser.add_argument('--memory-cap', type=float, default=None, metavar='MB',
+                            help="fail solutions that use more than this many MB (implies --memory)")
+    arg_parser.add_argument('--speedup', action='store_true',
+                            help="time solutions that get performance tips against the reference")
+    args = arg_parser.parse_args()
+    
     try:
         game = Game()
+        if args.metered:
+            game.engine.enable_metering(args.budget)
+        if args.memory or args.memory_cap is not None:
+            cap = int(args.memory_cap * 1024 * 1024) if args.memory_cap is not None else None
+            game.engine.enable_memory_profiling(cap)
+        if args.speedup:
+            game.engine.enable_speedup_measurement()
         game.run()
     except KeyboardInterrupt:
         print("\n\nThanks for playing!")
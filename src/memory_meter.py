@@ -0,0 +1,119 @@
+"""
+Peak-memory measurement with tracemalloc, compared against the reference solution
+
+The solution runs on the large input under a deadline: a correct but quadratic answer
+would otherwise take minutes there (longer still with tracemalloc hooking every
+allocation), so it's stopped and reported as too slow to profile instead.
+"""
+import copy
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Optional, Tuple
+from input_generators import generate_large_input, DEFAULT_LARGE_SIZE
+from time_budget import run_with_deadline
+
+PROFILE_TIMEOUT = 5.0    # Seconds the solution gets on the large input before we give up
+
+
+class TooSlowToProfile(Exception):
+    """The function didn't finish on the large input within the deadline"""
+
+
+def format_bytes(size: int) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def measure_peak(func: Callable, *args, timeout: float = None) -> Tuple[object, int]:
+    """Run func(*args) and return (result, peak bytes allocated while it ran)
+
+    With a timeout, raises TooSlowToProfile if the call takes longer (it's interrupted
+    on the main thread, see run_with_deadline).
+    """
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        if timeout is None:
+            result = func(*args)
+        else:
+            finished, _, result = run_with_deadline(func, args, timeout)
+            if not finished:
+                raise TooSlowToProfile()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    return result, max(0, peak - baseline)
+
+
+class MemoryProbe:
+    """Settings and results for one memory-profiled check"""
+
+    def __init__(self, memory_cap: Optional[int] = None, input_size: int = DEFAULT_LARGE_SIZE,
+                 timeout: float = PROFILE_TIMEOUT):
+        self.memory_cap = memory_cap  # Bytes, None means report only
+        self.input_size = input_size
+        self.timeout = timeout
+        self.peak = None
+        self.reference_peak = None
+
+    def check(self, user_func: Callable, reference_func: Optional[Callable],
+              problem: str) -> Tuple[bool, str]:
+        """Measure both functions on the same large input, returns (passed, report)"""
+        args = generate_large_input(problem, self.input_size)
+        if args is None:
+            return True, ""
+
+        # Each run gets its own copy so the input itself isn't counted and can't be shared
+        size_note = f"n={self.input_size:,}"
+        try:
+            _, self.peak = measure_peak(user_func, *copy.deepcopy(args), timeout=self.timeout)
+        except TooSlowToProfile:
+            # It already passed the tests - this is about memory, so say why there's no number
+            return True, (f"Too slow to profile at {size_note} (stopped after {self.timeout:g}s) - "
+                          f"a faster solution would get a memory report")
+        except Exception as e:
+            return False, f"Your solution failed on a large input ({size_note}): {e}"
+        report = f"Peak memory: {format_bytes(self.peak)} at {size_note}"
+        if reference_func is not None:
+            _, self.reference_peak = measure_peak(reference_func, *copy.deepcopy(args))
+            ratio = self.peak / max(self.reference_peak, 1)
+            report += f" (reference: {format_bytes(self.reference_peak)}, {ratio:.1f}x)"
+
+        if self.memory_cap is not None and self.peak > self.memory_cap:
+            return False, (f"Your solution used {format_bytes(self.peak)} at {size_note}, "
+                           f"over the {format_bytes(self.memory_cap)} memory cap. {report}")
+        return True, report
+
+
+_state = threading.local()
+
+
+def active_probe() -> Optional[MemoryProbe]:
+    return getattr(_state, 'probe', None)
+
+
+@contextmanager
+def profiling(probe: MemoryProbe):
+    """Make `probe` the one used by check_memory() for the duration of a check"""
+    previous = active_probe()
+    _state.probe = probe
+    try:
+        yield probe
+    finally:
+        _state.probe = previous
+
+
+def check_memory(user_func: Callable, reference_func: Optional[Callable], problem: str) -> Tuple[bool, str]:
+    """Called by checkers once the tests pass - a no-op unless memory profiling is on"""
+    probe = active_probe()
+    if probe is None:
+        return True, ""
+    return probe.check(user_func, reference_func, problem)
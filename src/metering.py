@@ -0,0 +1,168 @@
+"""
+Deterministic execution-cost metering for user functions.
+
+Instead of wall-clock time we count the line events executed inside the user's own code
+(the function under test plus any helpers/lambdas defined in the same submission). The
+count doesn't depend on host load, and a budget stops runaway loops.
+
+Once the budget is spent the submission gets BudgetExceeded, a BaseException so the usual
+`except Exception` can't swallow it. It isn't raised by the tracer itself where that can
+be helped: CPython switches a tracer off when it raises, so code that caught the exception
+(a bare `except:`) would run on unmetered. On the main thread every further line sends a
+SIGALRM instead (_thread.interrupt_main), whose handler raises it in the submission while
+tracing stays on - whatever catches it, the next line raises it again, until it's out.
+Other threads can't handle signals, so there the tracer raises it.
+"""
+import _thread
+import signal
+import sys
+import threading
+import types
+from contextlib import contextmanager
+from typing import Callable, Optional, Set
+from time_budget import can_use_alarm
+
+DEFAULT_INSTRUCTION_BUDGET = 5_000_000
+
+
+class BudgetExceeded(BaseException):
+    """Raised inside the user's code once it has used up its instruction budget"""
+
+
+def _nested_code(code: types.CodeType, found: Set[types.CodeType]):
+    # Inner functions, lambdas and comprehensions live in co_consts
+    if code in found:
+        return
+    found.add(code)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _nested_code(const, found)
+
+
+def user_code_objects(func: Callable) -> Set[types.CodeType]:
+    """Code objects that belong to the submission `func` came from"""
+    found = set()
+    code = getattr(func, '__code__', None)
+    if code is None:
+        return found
+    _nested_code(code, found)
+    # Helper functions defined next to it in the same exec() share its globals and filename
+    for value in getattr(func, '__globals__', {}).values():
+        helper = getattr(value, '__code__', None)
+        if (isinstance(value, types.FunctionType) and value.__globals__ is func.__globals__
+                and helper.co_filename == code.co_filename):
+            _nested_code(helper, found)
+    return found
+
+
+class ExecutionMeter:
+    """Counts line events in user code across any number of calls"""
+
+    def __init__(self, budget: Optional[int] = DEFAULT_INSTRUCTION_BUDGET):
+        self.budget = budget
+        self.cost = 0             # Lines executed by the user's code
+        self.reference_cost = 0   # Lines executed by the reference on the same inputs
+        self.exceeded = False
+
+    def call(self, func: Callable, *args, reference: bool = False):
+        """Run func(*args) with metering on - reference runs are counted but never limited"""
+        tracked = user_code_objects(func)
+        counter = [0]
+        limit = None if reference or self.budget is None else self.budget - self.cost
+        message = f"instruction budget of {self.budget:,} lines exceeded - is there an infinite loop?"
+        use_signal = limit is not None and can_use_alarm()
+        state = {"exceeded": False, "armed": False, "returned": False, "outer_handler": None}
+
+        def local_trace(frame, event, arg):
+            if event == 'line':
+                counter[0] += 1
+                if limit is not None and counter[0] > limit:
+                    self.exceeded = True
+                    if not use_signal:
+                        raise BudgetExceeded(message)  # Switches the tracer off, but it's all we have here
+                    if not state["exceeded"]:
+                        state["exceeded"] = True
+                        state["outer_handler"] = signal.signal(signal.SIGALRM, raise_exceeded)
+                    if not state["armed"]:
+                        state["armed"] = True
+                        # Python runs signal handlers at its next check for pending work, and
+                        # a call checks right after it returns - so calling interrupt_main()
+                        # would run the handler here in the tracer. Called by map() and
+                        # unpacked, nothing checks until the submission's next jump or call
+                        (_,) = map(_thread.interrupt_main, (signal.SIGALRM,))
+            return local_trace
+
+        def global_trace(frame, event, arg):
+            # Only frames running the submission get a line tracer, library code runs untraced
+            return local_trace if frame.f_code in tracked else None
+
+        def raise_exceeded(signum, frame):
+            if not state["armed"]:
+                # Not ours: an alarm that was already running (verify_catalog's timeout) went off
+                if callable(state["outer_handler"]):
+                    state["outer_handler"](signum, frame)
+                return
+            if state["returned"]:
+                return
+            if frame.f_code not in tracked:
+                # In the tracer (raising there would switch it off) or a library - go off again
+                # once back in the submission (map() again, so not in this handler)
+                (_,) = map(_thread.interrupt_main, (signum,))
+                return
+            state["armed"] = False
+            raise BudgetExceeded(message)
+
+        previous = sys.gettrace()
+        sys.settrace(global_trace)
+        try:
+            result = func(*args)
+        except BudgetExceeded:
+            result = None
+        finally:
+            state["returned"] = True
+            if state["exceeded"] and use_signal:
+                # A call runs any handler still pending (ours, which now ignores it) before
+                # the outer handler is back
+                signal.getsignal(signal.SIGALRM)
+                signal.signal(signal.SIGALRM, state["outer_handler"])
+            sys.settrace(previous)
+            if reference:
+                self.reference_cost += counter[0]
+            else:
+                self.cost += counter[0]
+        if limit is not None and counter[0] > limit:
+            # Also when the submission caught it and returned anyway
+            raise BudgetExceeded(message)
+        return result
+
+    def describe(self) -> str:
+        text = f"Execution cost: {self.cost:,} lines"
+        if self.reference_cost:
+            text += f" (reference solution: {self.reference_cost:,})"
+        return text
+
+
+_state = threading.local()
+
+
+def active_meter() -> Optional[ExecutionMeter]:
+    return getattr(_state, 'meter', None)
+
+
+@contextmanager
+def metered(meter: ExecutionMeter):
+    """Make `meter` the one used by call() for the duration of a check"""
+    previous = active_meter()
+    _state.meter = meter
+    try:
+        yield meter
+    finally:
+        _state.meter = previous
+
+
+def call(func: Callable, *args, reference: bool = False):
+    """Call a user (or reference) function, metered if a check is running in metering mode"""
+    meter = active_meter()
+    if meter is None:
+        return func(*args)
+    return meter.call(func, *args, reference=reference)
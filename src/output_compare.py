@@ -0,0 +1,306 @@
+"""
+Compact comparisons of what a solution produced against what was expected.
+
+Nothing here builds the full repr of a big value or keeps a whole program's output around.
+Printed output is compared line by line as it's written, and only the last few matching
+lines are remembered for context. Once a line differs the comparison is over: the program
+is stopped (or further output dropped) and the report shows where it went wrong. Returned
+values are compared up to their first differing index or key, and only a small window
+around it is shown.
+"""
+import io
+import reprlib
+from collections import deque
+from typing import Iterable, Optional, Union
+
+CONTEXT = 2          # Lines/items shown before (and after) the first difference
+LINE_WIDTH = 60      # Characters of a long line shown around its first differing column
+SHORT_REPR = 80      # Values whose repr fits in this many characters are shown in full
+OUTPUT_LIMIT = 1_000_000  # Characters a "contains" check lets a program print before stopping it
+
+class _ShortRepr(reprlib.Repr):
+    def repr_int(self, value, level):
+        if value.bit_length() > 4 * self.maxlong:
+            # Formatting a huge int is slow (and past 4300 digits, an error)
+            return f"<int with about {int(value.bit_length() * 0.30103) + 1:,} digits>"
+        return super().repr_int(value, level)
+
+
+_short = _ShortRepr()
+_short.maxlist = _short.maxtuple = _short.maxset = _short.maxfrozenset = 8
+_short.maxdict = 6
+_short.maxstring = _short.maxother = LINE_WIDTH
+_short.maxlong = 40
+
+
+def short_repr(value) -> str:
+    """repr() cut down to a few items and characters per level"""
+    return _short.repr(value)
+
+
+def _repr_cost(value, budget: int) -> int:
+    # Roughly the length of repr(value), giving up (-1) as soon as it goes over budget
+    if isinstance(value, (str, bytes)):
+        cost = len(value) + 3
+    elif isinstance(value, int) and not isinstance(value, bool) and value.bit_length() > 4 * budget:
+        return -1  # A huge int - don't even try to format it
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        if len(value) > budget:
+            return -1
+        cost = 2
+        for item in value:
+            item_cost = _repr_cost(item, budget - cost)
+            if item_cost < 0:
+                return -1
+            cost += item_cost + 2
+    elif isinstance(value, dict):
+        if len(value) > budget:
+            return -1
+        cost = 2
+        for key, item in value.items():
+            key_cost = _repr_cost(key, budget - cost)
+            item_cost = _repr_cost(item, budget - cost) if key_cost >= 0 else -1
+            if item_cost < 0:
+                return -1
+            cost += key_cost + item_cost + 4
+    else:
+        cost = len(short_repr(value))
+    return cost if cost <= budget else -1
+
+
+def _is_small(value) -> bool:
+    return _repr_cost(value, SHORT_REPR) >= 0
+
+
+def _clip(text: str, column: int, width: int = LINE_WIDTH) -> str:
+    """repr of `text`, cut to `width` characters around `column`"""
+    if len(text) <= width:
+        return repr(text)
+    start = max(0, min(column - width // 2, len(text) - width))
+    clipped = repr(text[start:start + width])
+    return ("..." if start > 0 else "") + clipped + ("..." if start + width < len(text) else "")
+
+
+def _first_difference(expected, actual) -> int:
+    for index, (left, right) in enumerate(zip(expected, actual)):
+        if left != right:
+            return index
+    return min(len(expected), len(actual))
+
+
+def _window(sequence, index: int) -> str:
+    if isinstance(sequence, str):
+        return _clip(sequence, index)
+    start, end = max(0, index - CONTEXT), min(len(sequence), index + CONTEXT + 1)
+    items = [short_repr(item) for item in sequence[start:end]]
+    if start > 0:
+        items.insert(0, "...")
+    if end < len(sequence):
+        items.append("...")
+    opening, closing = ("[", "]") if isinstance(sequence, list) else ("(", ")")
+    return opening + ", ".join(items) + closing
+
+
+def describe_mismatch(expected, actual) -> str:
+    """"Expected X, got Y" - narrowed to the first difference when the values are big"""
+    if _is_small(expected) and _is_small(actual):
+        return f"Expected {expected!r}, got {actual!r}"
+
+    if type(expected) is type(actual) and isinstance(expected, (list, tuple, str)):
+        index = _first_difference(expected, actual)
+        lengths = ""
+        if len(expected) != len(actual):
+            lengths = f" (expected length {len(expected):,}, got {len(actual):,})"
+        return (f"First difference at index {index:,}{lengths}: "
+                f"expected {_window(expected, index)}, got {_window(actual, index)}")
+
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key, value in expected.items():
+            if key not in actual:
+                return f"Missing key {short_repr(key)} (expected {short_repr(value)})"
+            if actual[key] != value:
+                return (f"Different value for key {short_repr(key)}: "
+                        f"expected {short_repr(value)}, got {short_repr(actual[key])}")
+        extra = next(key for key in actual if key not in expected)
+        return f"Unexpected key {short_repr(extra)} (value {short_repr(actual[extra])})"
+
+    return f"Expected {short_repr(expected)}, got {short_repr(actual)}"
+
+
+class OutputMismatch(BaseException):
+    """Raised from print() once the output has diverged - BaseException so `except Exception` can't eat it"""
+
+
+class StreamingComparer(io.TextIOBase):
+    """A stdout replacement that checks each line against the expected output as it's printed
+
+    Trailing whitespace on a line and blank lines at the very end don't count. Memory use
+    is the current partial line (bounded by the expected line's length) plus `context`
+    previous lines, however much gets printed.
+    """
+
+    def __init__(self, expected: Union[str, Iterable[str]], context: int = CONTEXT,
+                 stop_on_mismatch: bool = True):
+        lines = expected.rstrip('\n').splitlines() if isinstance(expected, str) else expected
+        self._expected = iter(lines)
+        self._current = self._next_expected()
+        self._previous = deque(maxlen=context)
+        self._partial = []
+        self._partial_length = 0
+        self._blank_extra = 0  # Blank lines printed after the expected output ran out
+        self.stop_on_mismatch = stop_on_mismatch
+        self.line_number = 0
+        self.mismatch = None   # (line number, expected line or None, actual line or None)
+
+    def _next_expected(self) -> Optional[str]:
+        line = next(self._expected, None)
+        return line.rstrip() if line is not None else None
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if self.mismatch is None:
+            *complete, rest = text.split('\n')
+            for piece in complete:
+                self._partial.append(piece)
+                self._end_line(''.join(self._partial))
+                self._partial, self._partial_length = [], 0
+                if self.mismatch is not None:
+                    break
+            if self.mismatch is None and rest:
+                self._partial.append(rest)
+                self._partial_length += len(rest)
+                self._check_partial()
+        if self.mismatch is not None and self.stop_on_mismatch:
+            raise OutputMismatch()
+        return len(text)
+
+    def _check_partial(self):
+        # A line that's already longer than the expected one can only match through
+        # trailing whitespace - settle it now instead of buffering it
+        expected_length = len(self._current) if self._current is not None else 0
+        if self._partial_length <= expected_length + LINE_WIDTH:
+            return
+        line = ''.join(self._partial)
+        if line.rstrip() == self._current:
+            self._partial, self._partial_length = [self._current], expected_length
+        else:
+            self._diverged(line)
+
+    def _end_line(self, line: str):
+        line = line.rstrip()
+        if self._current is None:
+            if not line:
+                self._blank_extra += 1
+                return
+            self._diverged(line)
+            return
+        if line != self._current:
+            self._diverged(line)
+            return
+        self.line_number += 1
+        self._previous.append(line[:LINE_WIDTH])
+        self._current = self._next_expected()
+
+    def _diverged(self, line: Optional[str]):
+        line_number = self.line_number + 1 + (self._blank_extra if self._current is None else 0)
+        self.mismatch = (line_number, self._current, line)
+        self._partial, self._partial_length = [], 0
+
+    def finish(self) -> Optional[str]:
+        """Call once the program is done: None if the output matched, else the report"""
+        if self.mismatch is None and self._partial:
+            self._end_line(''.join(self._partial))
+            self._partial, self._partial_length = [], 0
+        while self.mismatch is None and self._current is not None:
+            if self._current:
+                self._diverged(None)  # Output stopped early
+            else:
+                self.line_number += 1
+                self._current = self._next_expected()
+        return self.report()
+
+    def report(self) -> Optional[str]:
+        if self.mismatch is None:
+            return None
+        line_number, expected, actual = self.mismatch
+        column = _first_difference(expected or "", actual or "")
+        lines = [f"Your output differs from the expected output at line {line_number:,}:"]
+        first = self.line_number - len(self._previous) + 1
+        for offset, previous in enumerate(self._previous):
+            lines.append(f"  {first + offset:>5} | {previous}")
+        lines.append(f"  expected: {_clip(expected, column) if expected is not None else '(no more output)'}")
+        lines.append(f"  got:      {_clip(actual, column) if actual is not None else '(no more output)'}")
+        return "\n".join(lines)
+
+
+class StreamingSearch(io.TextIOBase):
+    """A stdout replacement that only checks `needle` turns up somewhere in the output
+
+    Keeps the last len(needle) - 1 characters (a match may span two writes) and the
+    first LINE_WIDTH characters for the report. Extra output is allowed, but not endless
+    output: past `limit` characters the program is stopped and the check fails.
+    """
+
+    def __init__(self, needle: str, limit: int = OUTPUT_LIMIT):
+        self.needle = needle
+        self.limit = limit
+        self.found = False
+        self.overflowed = False
+        self._tail = ""
+        self._head = ""
+        self._length = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self._length += len(text)
+        if self._length > self.limit:
+            self.overflowed = True
+            raise OutputMismatch()
+        if len(self._head) < LINE_WIDTH:
+            self._head += text[:LINE_WIDTH - len(self._head)]
+        if not self.found:
+            window = self._tail + text
+            self.found = self.needle in window
+            self._tail = window[max(0, len(window) - len(self.needle) + 1):] if len(self.needle) > 1 else ""
+        return len(text)
+
+    def finish(self) -> Optional[str]:
+        """None if the needle was printed, else the report"""
+        if self.overflowed:
+            return f"Your program printed over {self.limit:,} characters and was stopped - does a loop never end?"
+        if self.found:
+            return None
+        printed = self._head.strip()
+        got = _clip(printed, 0) if printed else "no output"
+        return f"Expected {self.needle!r} somewhere in your output, got {got}"
+
+
+class BoundedCapture(io.TextIOBase):
+    """A stdout replacement that keeps the first `limit` characters and counts the rest"""
+
+    def __init__(self, limit: int = 64 * 1024):
+        self.limit = limit
+        self._kept = []
+        self._length = 0
+        self.dropped = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        room = self.limit - self._length
+        if room > 0:
+            self._kept.append(text[:room])
+            self._length += min(room, len(text))
+        self.dropped += max(0, len(text) - max(room, 0))
+        return len(text)
+
+    def getvalue(self) -> str:
+        kept = ''.join(self._kept)
+        if self.dropped:
+            kept += f"\n... ({self.dropped:,} more characters not shown)"
+        return kept
@@ -0,0 +1,373 @@
+"""
+Performance coach: points out the classic hot-loop slowdowns in a solution that passed.
+
+A correct answer can still be quadratic. After a submission passes, its AST is walked
+looking for patterns that do O(n) work on every pass of a loop:
+
+    membership    `x in some_list` - a linear scan each time, a set makes it O(1)
+    str_concat    `text += piece` - may copy the whole string each time, ''.join() doesn't
+    pop_front     `items.pop(0)` / `items.insert(0, x)` - shifts every element, use a deque
+    resort        sorting the same list again on every pass, sort once or use heapq/bisect
+    pair_scan     nested loops comparing every pair, a dict of what's been seen is one pass
+
+These are heuristics on names (Python has no types to go on), so each finding is a tip
+with a line number, never a reason to fail. A parameter the code loops over could be a
+list or a string, so it only gets advice that holds for both - unless it's used like a
+string (`s.lower()`, `s: str`), in which case `c in s` is left alone. Optionally the solution and the reference are
+timed on the same large generated input, so the tip comes with the speedup it would buy.
+"""
+import ast
+import copy
+import textwrap
+from typing import List, Optional, Set, Tuple
+from input_generators import generate_large_input
+from time_budget import run_with_deadline
+
+COACH_SIZE = 20_000      # Items in the generated input the speedup is measured on
+COACH_TIMEOUT = 2.0      # Seconds the solution gets on it before we stop waiting
+
+# Calls whose result is a list, and ones whose result is a hash-based container
+LIST_FACTORIES = frozenset({'list', 'sorted'})
+HASHED_FACTORIES = frozenset({'set', 'frozenset', 'dict', 'Counter', 'defaultdict', 'OrderedDict'})
+LIST_ANNOTATIONS = frozenset({'list', 'List'})
+# Methods only strings have - a name they're called on isn't a list
+STR_METHODS = frozenset({'lower', 'upper', 'casefold', 'strip', 'lstrip', 'rstrip', 'split', 'splitlines',
+                         'startswith', 'endswith', 'find', 'rfind', 'replace', 'isalpha', 'isdigit',
+                         'isalnum', 'isspace', 'islower', 'isupper', 'encode', 'format'})
+
+
+class Finding:
+    """One anti-pattern at one line of the (dedented) submission"""
+
+    def __init__(self, line: int, pattern: str, advice: str):
+        self.line = line
+        self.pattern = pattern
+        self.advice = advice
+
+    def __str__(self) -> str:
+        return f"Line {self.line}: {self.advice}"
+
+    def __repr__(self) -> str:
+        return f"Finding({self.line}, {self.pattern!r})"
+
+
+def _names(node: ast.AST) -> Set[str]:
+    return {child.id for child in ast.walk(node) if isinstance(child, ast.Name)}
+
+
+def _call_name(node: ast.AST) -> Optional[str]:
+    # 'list' for list(...), 'Counter' for collections.Counter(...)
+    if isinstance(node, ast.Call):
+        if isinstance(node.func, ast.Name):
+            return node.func.id
+        if isinstance(node.func, ast.Attribute):
+            return node.func.attr
+    return None
+
+
+def _is_list_value(node: ast.AST) -> bool:
+    return isinstance(node, (ast.List, ast.ListComp)) or _call_name(node) in LIST_FACTORIES
+
+
+def _is_hashed_value(node: ast.AST) -> bool:
+    return (isinstance(node, (ast.Set, ast.SetComp, ast.Dict, ast.DictComp))
+            or _call_name(node) in HASHED_FACTORIES)
+
+
+def _is_str_value(node: ast.AST) -> bool:
+    return ((isinstance(node, ast.Constant) and isinstance(node.value, str))
+            or isinstance(node, ast.JoinedStr) or _call_name(node) == 'str')
+
+
+def _is_list_annotation(node: Optional[ast.AST]) -> bool:
+    if isinstance(node, ast.Subscript):
+        node = node.value
+    return isinstance(node, ast.Name) and node.id in LIST_ANNOTATIONS
+
+
+def _is_str_annotation(node: Optional[ast.AST]) -> bool:
+    return isinstance(node, ast.Name) and node.id == 'str'
+
+
+def _iterated_name(node: ast.AST) -> Optional[str]:
+    # `nums` in `for x in nums` and `for i in range(len(nums))`
+    if _call_name(node) == 'range' and node.args:
+        node = node.args[-1] if len(node.args) < 3 else None
+        if _call_name(node) != 'len' or not node.args:
+            return None
+        node = node.args[0]
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def _collect_kinds(tree: ast.AST) -> Tuple[Set[str], Set[str], Set[str], Set[str]]:
+    """Names that are lists, other sequences a loop walks, hash-based containers and strings"""
+    lists, sequences, hashed, strings = set(), set(), set(), set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.For, ast.AsyncFor, ast.comprehension)):
+            # A parameter the code walks through is a sequence - a list or a string
+            name = _iterated_name(node.iter)
+            if name:
+                sequences.add(name)
+            continue
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr in STR_METHODS and isinstance(node.func.value, ast.Name)):
+            strings.add(node.func.value.id)
+            continue
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign):
+            targets, value = [node.target], node.value
+            if _is_list_annotation(node.annotation) and isinstance(node.target, ast.Name):
+                lists.add(node.target.id)
+        elif isinstance(node, ast.arg):
+            if _is_list_annotation(node.annotation):
+                lists.add(node.arg)
+            elif _is_str_annotation(node.annotation):
+                strings.add(node.arg)
+            continue
+        else:
+            continue
+        if value is None:
+            continue
+        for target in targets:
+            if not isinstance(target, ast.Name):
+                continue
+            if _is_list_value(value):
+                lists.add(target.id)
+            elif _is_hashed_value(value):
+                hashed.add(target.id)
+            elif _is_str_value(value):
+                strings.add(target.id)
+    # A name that's a set (or a string) somewhere might be one where it matters - don't guess
+    lists -= hashed | strings
+    return lists, sequences - lists - hashed - strings, hashed, strings
+
+
+class _Loop:
+    """An enclosing loop and the names its target binds"""
+
+    def __init__(self, node: ast.AST, targets: Set[str]):
+        self.node = node
+        self.targets = targets
+
+
+class _HotLoopVisitor(ast.NodeVisitor):
+    def __init__(self, lists: Set[str], sequences: Set[str], hashed: Set[str], strings: Set[str]):
+        self.lists = lists
+        self.sequences = sequences
+        self.hashed = hashed
+        self.strings = strings
+        self.loops: List[_Loop] = []   # Innermost last
+        self.findings: List[Finding] = []
+        self._seen = set()
+
+    def _report(self, node: ast.AST, pattern: str, advice: str):
+        key = (node.lineno, pattern)
+        if key not in self._seen:
+            self._seen.add(key)
+            self.findings.append(Finding(node.lineno, pattern, advice))
+
+    def _loop_targets(self) -> Set[str]:
+        return set().union(*(loop.targets for loop in self.loops)) if self.loops else set()
+
+    # Loops - whatever runs once (a for loop's iterable, the first generator of a
+    # comprehension) is visited outside the loop, everything else inside it
+
+    def visit_For(self, node):
+        self.visit(node.iter)
+        self._check_pair_scan(node)
+        self.loops.append(_Loop(node, _names(node.target)))
+        for child in node.body:
+            self.visit(child)
+        self.loops.pop()
+        for child in node.orelse:
+            self.visit(child)
+
+    visit_AsyncFor = visit_For
+
+    def visit_While(self, node):
+        self.loops.append(_Loop(node, set()))
+        self.visit(node.test)
+        for child in node.body:
+            self.visit(child)
+        self.loops.pop()
+        for child in node.orelse:
+            self.visit(child)
+
+    def _visit_comprehension(self, node, elements):
+        generators = node.generators
+        self.visit(generators[0].iter)
+        for index, generator in enumerate(generators):
+            if index:
+                self.visit(generator.iter)
+            self.loops.append(_Loop(generator, _names(generator.target)))
+            for condition in generator.ifs:
+                self.visit(condition)
+        for element in elements:
+            self.visit(element)
+        del self.loops[len(self.loops) - len(generators):]
+
+    def visit_ListComp(self, node):
+        self._visit_comprehension(node, [node.elt])
+
+    visit_SetComp = visit_GeneratorExp = visit_ListComp
+
+    def visit_DictComp(self, node):
+        self._visit_comprehension(node, [node.key, node.value])
+
+    # Patterns
+
+    def visit_Compare(self, node):
+        if self.loops:
+            for op, comparator in zip(node.ops, node.comparators):
+                if isinstance(op, (ast.In, ast.NotIn)) and self._is_scanned(comparator):
+                    self._report(node, 'membership', self._membership_advice(comparator))
+                    break
+        self.generic_visit(node)
+
+    def _is_scanned(self, node: ast.AST) -> bool:
+        if _is_list_value(node):
+            return True
+        return isinstance(node, ast.Name) and (node.id in self.lists or node.id in self.sequences)
+
+    def _membership_advice(self, node: ast.AST) -> str:
+        if isinstance(node, ast.Name) and node.id in self.lists:
+            return (f"`in {node.id}` searches the whole list on every pass of the loop - keep the "
+                    f"items in a set instead, or build one before the loop (`{node.id}_set = set({node.id})`)")
+        if isinstance(node, ast.Name):
+            # Walked by a loop, but it could as well be a string as a list
+            return (f"`in {node.id}` scans all of `{node.id}` on every pass of the loop - to look up "
+                    f"single items, build a set of them once before the loop (`{node.id}_set = set({node.id})`)")
+        return ("`in [...]` searches a list on every pass of the loop - "
+                "use a set (`{...}`), built once outside the loop")
+
+    def visit_AugAssign(self, node):
+        if (self.loops and isinstance(node.op, ast.Add) and isinstance(node.target, ast.Name)
+                and (node.target.id in self.strings or _is_str_value(node.value))):
+            name = node.target.id
+            self._report(node, 'str_concat',
+                         f"`{name} += ...` in a loop can copy the whole string each time - "
+                         f"append the pieces to a list and `''.join()` them once after the loop")
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        if self.loops:
+            self._check_pop_front(node)
+            self._check_resort(node)
+        self.generic_visit(node)
+
+    def _check_pop_front(self, node: ast.Call):
+        if not isinstance(node.func, ast.Attribute):
+            return
+        args = node.args
+        front = args and isinstance(args[0], ast.Constant) and args[0].value == 0
+        if node.func.attr == 'pop' and len(args) == 1 and front:
+            self._report(node, 'pop_front',
+                         "`.pop(0)` shifts every remaining element down one - use a "
+                         "`collections.deque` and `.popleft()` (or walk an index instead)")
+        elif node.func.attr == 'insert' and len(args) == 2 and front:
+            self._report(node, 'pop_front',
+                         "`.insert(0, ...)` shifts every element up one - use a "
+                         "`collections.deque` and `.appendleft()`, or append and reverse once at the end")
+
+    def _check_resort(self, node: ast.Call):
+        if isinstance(node.func, ast.Name) and node.func.id == 'sorted' and node.args:
+            sorted_value = node.args[0]
+        elif isinstance(node.func, ast.Attribute) and node.func.attr == 'sort' and not node.args:
+            sorted_value = node.func.value
+        else:
+            return
+        # sorted(word) for each word sorts something new every time - that's fine
+        if _names(sorted_value) & self._loop_targets():
+            return
+        self._report(node, 'resort',
+                     "the same list is sorted again on every pass of the loop - sort it once "
+                     "before the loop, or keep it in order with `bisect.insort` or a `heapq`")
+
+    def _check_pair_scan(self, node: ast.For):
+        # An inner for loop, directly under an outer one, that compares their items for equality
+        outer = next((loop for loop in reversed(self.loops) if isinstance(loop.node, ast.For)), None)
+        if outer is None or not outer.targets:
+            return
+        inner_targets = _names(node.target)
+        # Walking the outer item's own contents (rows of a grid...) isn't a pair scan
+        if _call_name(node.iter) != 'range' and _names(node.iter) & outer.targets:
+            return
+        for child in ast.walk(ast.Module(body=node.body, type_ignores=[])):
+            if (isinstance(child, ast.Compare) and any(isinstance(op, (ast.Eq, ast.NotEq)) for op in child.ops)
+                    and _names(child) & outer.targets and _names(child) & inner_targets):
+                self._report(node, 'pair_scan',
+                             "these nested loops compare every pair of items (O(n^2)) - keep a dict "
+                             "(or set) of the items seen so far and look each match up in one pass")
+                return
+
+
+def analyze(code: str) -> List[Finding]:
+    """Hot-loop anti-patterns in the code, in line order (line numbers of the dedented code)"""
+    try:
+        tree = ast.parse(textwrap.dedent(code).strip())
+    except SyntaxError:
+        return []
+    visitor = _HotLoopVisitor(*_collect_kinds(tree))
+    visitor.visit(tree)
+    return sorted(visitor.findings, key=lambda finding: finding.line)
+
+
+def measure_speedup(code: str, checker, size: int = COACH_SIZE,
+                    timeout: float = COACH_TIMEOUT) -> Optional[Tuple[Optional[float], float, int]]:
+    """Time the solution and the checker's reference on one large generated input
+
+    Returns (solution seconds or None if it ran past `timeout`, reference seconds, size),
+    or None when the checker has no reference or there's no generator for its problem.
+    The timeout only interrupts the solution on the main thread (see run_with_deadline).
+    """
+    load_reference = getattr(checker, 'load_reference', None)
+    param_count = getattr(checker, 'param_count', None)
+    problem = getattr(checker, 'problem', None) or getattr(checker, 'memory_problem', None)
+    if load_reference is None or not problem:
+        return None
+    args = generate_large_input(problem, size)
+    if args is None:
+        return None
+    # Imported here: challenge_parser imports challenge, which imports this module
+    import challenge_parser
+    try:
+        reference = load_reference()
+        user_globals = {}
+        exec(textwrap.dedent(code).strip(), user_globals)
+        user_func = challenge_parser.find_function_with_param_count(user_globals, param_count)
+        if reference is None or user_func is None:
+            return None
+        _, reference_time, _ = run_with_deadline(reference, copy.deepcopy(args), timeout)
+        finished, user_time, _ = run_with_deadline(user_func, copy.deepcopy(args), timeout)
+    except Exception:
+        return None  # It passed the checks - a crash on a huge input isn't ours to report here
+    return (user_time if finished else None), reference_time, size
+
+
+def describe_speedup(measurement: Tuple[Optional[float], float, int], timeout: float = COACH_TIMEOUT) -> str:
+    user_time, reference_time, size = measurement
+    if user_time is None:
+        return (f"On a generated input of {size:,} items your solution was still running after "
+                f"{timeout:g}s; the reference took {reference_time:.3f}s.")
+    ratio = user_time / max(reference_time, 1e-6)
+    if ratio < 1.5:
+        return (f"On a generated input of {size:,} items your solution took {user_time:.3f}s, "
+                f"about as fast as the reference ({reference_time:.3f}s) - the tips matter more as inputs grow.")
+    return (f"On a generated input of {size:,} items your solution took {user_time:.3f}s and "
+            f"the reference {reference_time:.3f}s - {ratio:.0f}x faster.")
+
+
+def coach(code: str, checker=None, measure: bool = False) -> str:
+    """The tips for a passing solution ("" if there are none), with the speedup if `measure`"""
+    findings = analyze(code)
+    if not findings:
+        return ""
+    lines = ["Performance tips - it passed, but these get slow on big inputs:"]
+    lines.extend(f"  {finding}" for finding in findings)
+    # Optimization challenges already timed it against the reference
+    if measure and checker is not None and getattr(checker, 'time_budget', None) is None:
+        measurement = measure_speedup(code, checker)
+        if measurement is not None:
+            lines.append(describe_speedup(measurement))
+    return "\n".join(lines)
@@ -0,0 +1,130 @@
+"""
+Elo/Glicko-style ratings for players and challenges, used to recommend the next challenge
+"""
+import bisect
+from typing import Dict, List, Optional, Callable
+from challenge import Difficulty
+
+
+DEFAULT_PLAYER_RATING = 1000.0
+DEFAULT_DEVIATION = 350.0   # Glicko-style uncertainty, shrinks as we see more results
+MIN_DEVIATION = 60.0
+MAX_K = 64.0
+MIN_K = 12.0
+# Aim for challenges the player solves ~2 times out of 3: slightly below their rating
+TARGET_OFFSET = -120.0
+
+
+def seed_rating(difficulty: Difficulty) -> float:
+    """Starting rating for a challenge before anyone has attempted it"""
+    return 800.0 + 200.0 * difficulty.value
+
+
+def expected_score(rating: float, opponent: float) -> float:
+    """Elo win probability of `rating` against `opponent`"""
+    return 1.0 / (1.0 + 10 ** ((opponent - rating) / 400.0))
+
+
+class ChallengeRecommender:
+    """
+    Keeps [rating, deviation] for every player and challenge. Challenge ratings also live
+    in a sorted list so "challenges near rating r" is a bisect plus a walk outwards.
+    """
+
+    def __init__(self):
+        self.players: Dict[str, List[float]] = {}
+        self.challenges: Dict[str, List[float]] = {}
+        self._sorted: List[tuple] = []  # (rating, challenge_id), kept sorted on every update
+
+    def add_challenge(self, challenge_id: str, difficulty: Difficulty):
+        # Keep an existing (learned) rating if we loaded one from disk
+        if challenge_id in self.challenges:
+            return
+        rating = seed_rating(difficulty)
+        self.challenges[challenge_id] = [rating, DEFAULT_DEVIATION]
+        bisect.insort(self._sorted, (rating, challenge_id))
+
+    def remove_challenge(self, challenge_id: str):
+        entry = self.challenges.pop(challenge_id, None)
+        if entry is not None:
+            self._remove_sorted(entry[0], challenge_id)
+
+    def player_rating(self, player_id: str) -> float:
+        return self.players.get(player_id, [DEFAULT_PLAYER_RATING])[0]
+
+    def challenge_rating(self, challenge_id: str) -> Optional[float]:
+        entry = self.challenges.get(challenge_id)
+        return entry[0] if entry else None
+
+    def record_result(self, player_id: str, challenge_id: str, success: bool):
+        """Update both ratings after a single attempt
+
+        Finding the challenge's old and new spots is a bisect, but moving it shifts the list
+        in between, so this is O(n) in the catalog size (a memmove - cheap for a few
+        thousand challenges).
+        """
+        if challenge_id not in self.challenges:
+            return
+        player = self.players.setdefault(player_id, [DEFAULT_PLAYER_RATING, DEFAULT_DEVIATION])
+        challenge = self.challenges[challenge_id]
+
+        expected = expected_score(player[0], challenge[0])
+        outcome = 1.0 if success else 0.0
+        delta = outcome - expected
+
+        old_challenge_rating = challenge[0]
+        player[0] += self._k_factor(player[1]) * delta
+        challenge[0] -= self._k_factor(challenge[1]) * delta
+        player[1] = self._shrink(player[1])
+        challenge[1] = self._shrink(challenge[1])
+
+        # Move the challenge to its new spot in the sorted list
+        self._remove_sorted(old_challenge_rating, challenge_id)
+        bisect.insort(self._sorted, (challenge[0], challenge_id))
+
+    def recommend(self, player_id: str, k: int = 5,
+                  is_candidate: Callable[[str], bool] = None) -> List[str]:
+        """
+        Top-k challenge ids closest to the player's target rating.
+        Walks outwards from the bisect point, so the cost is O(log n + k + skipped).
+        """
+        target = self.player_rating(player_id) + TARGET_OFFSET
+        right = bisect.bisect_left(self._sorted, (target, ''))
+        left = right - 1
+        picked = []
+
+        while len(picked) < k and (left >= 0 or right < len(self._sorted)):
+            # Take whichever neighbour is closer to the target
+            if right >= len(self._sorted) or (left >= 0 and
+                                              target - self._sorted[left][0] <= self._sorted[right][0] - target):
+                challenge_id = self._sorted[left][1]
+                left -= 1
+            else:
+                challenge_id = self._sorted[right][1]
+                right += 1
+            if is_candidate is None or is_candidate(challenge_id):
+                picked.append(challenge_id)
+
+        return picked
+
+    def _remove_sorted(self, rating: float, challenge_id: str):
+        index = bisect.bisect_left(self._sorted, (rating, challenge_id))
+        if index < len(self._sorted) and self._sorted[index] == (rating, challenge_id):
+            del self._sorted[index]
+
+    def _k_factor(self, deviation: float) -> float:
+        # Uncertain ratings move fast, well-established ones settle down
+        spread = (deviation - MIN_DEVIATION) / (DEFAULT_DEVIATION - MIN_DEVIATION)
+        return MIN_K + (MAX_K - MIN_K) * max(0.0, min(1.0, spread))
+
+    def _shrink(self, deviation: float) -> float:
+        return max(MIN_DEVIATION, deviation * 0.93)
+
+    def to_dict(self) -> dict:
+        return {"players": self.players, "challenges": self.challenges}
+
+    def load_dict(self, data: dict):
+        """Restore saved ratings (challenges that no longer exist are simply ignored later)"""
+        self.players = {pid: list(entry) for pid, entry in data.get("players", {}).items()}
+        self.challenges = {cid: list(entry) for cid, entry in data.get("challenges", {}).items()}
+        self._sorted = sorted((entry[0], cid) for cid, entry in self.challenges.items())
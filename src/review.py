@@ -0,0 +1,104 @@
+"""
+Spaced-repetition review of completed challenges (SM-2).
+
+Every completed challenge gets a card: ease factor, interval in days, successful
+repetitions in a row and the time it's next due. How well a solve went (time, hints,
+attempts) becomes an SM-2 quality from 0-5, which stretches or resets the interval.
+
+Due times live in a min-heap, so "what's due now" is a peek at the top and scheduling is a
+push - O(log n) however many challenges the player has completed. Rescheduling pushes a
+new entry and leaves the old one in the heap; stale entries are recognised (their due time
+no longer matches the card) and dropped when they reach the top.
+"""
+import heapq
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+DAY = 24 * 60 * 60
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+
+
+def solve_quality(time_taken: float, hints_used: int, attempts: int, expected_time: float) -> int:
+    """SM-2 quality (0-5) of one solve: 5 is quick, first try, no hints"""
+    quality = 5
+    quality -= min(hints_used, 2)
+    quality -= min(max(attempts - 1, 0), 2)
+    if time_taken > 2 * expected_time:
+        quality -= 1
+    return max(0, quality)
+
+
+class ReviewScheduler:
+    """SM-2 cards for one player, stored in (and saved with) their progress dict"""
+
+    def __init__(self, cards: Dict[str, dict] = None):
+        self.cards = cards if cards is not None else {}
+        self._heap: List[Tuple[float, str]] = [(card["due"], challenge_id)
+                                               for challenge_id, card in self.cards.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def schedule(self, challenge_id: str, quality: int, now: float = None) -> dict:
+        """Apply one review (or the first solve) with the given quality, returns the card"""
+        now = time.time() if now is None else now
+        card = self.cards.get(challenge_id)
+        if card is None:
+            card = self.cards[challenge_id] = {"ease": INITIAL_EASE, "interval": 0.0, "repetitions": 0}
+
+        if quality < 3:
+            # Lapsed - start the intervals over, but keep the (lowered) ease
+            card["repetitions"] = 0
+            card["interval"] = 1.0
+        else:
+            if card["repetitions"] == 0:
+                card["interval"] = 1.0
+            elif card["repetitions"] == 1:
+                card["interval"] = 6.0
+            else:
+                card["interval"] = round(card["interval"] * card["ease"], 2)
+            card["repetitions"] += 1
+        card["ease"] = max(MIN_EASE, card["ease"] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        card["due"] = now + card["interval"] * DAY
+
+        heapq.heappush(self._heap, (card["due"], challenge_id))
+        return card
+
+    def remove(self, challenge_id: str):
+        # Its heap entry becomes stale and is dropped when it reaches the top
+        self.cards.pop(challenge_id, None)
+
+    def _drop_stale(self):
+        heap = self._heap
+        while heap:
+            due, challenge_id = heap[0]
+            card = self.cards.get(challenge_id)
+            if card is not None and card["due"] == due:
+                return
+            heapq.heappop(heap)
+
+    def next_due(self) -> Optional[Tuple[float, str]]:
+        """(due time, challenge id) of the card due soonest"""
+        self._drop_stale()
+        return self._heap[0] if self._heap else None
+
+    def due(self, now: float = None, limit: int = 10, is_candidate: Callable[[str], bool] = None) -> List[str]:
+        """Up to `limit` challenge ids due by `now`, most overdue first"""
+        now = time.time() if now is None else now
+        popped, found = [], []
+        while len(found) < limit:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            entry = heapq.heappop(self._heap)
+            if entry[1] in found:
+                continue  # Rescheduled to the exact same time - a duplicate entry
+            popped.append(entry)
+            if is_candidate is None or is_candidate(entry[1]):
+                found.append(entry[1])
+        # Peeking only - they stay due until reviewed
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+        return found
@@ -0,0 +1,232 @@
+"""
+Near-duplicate detection across learners' accepted solutions.
+
+Each submission becomes a stream of normalized AST tokens (node types, with names and
+literals reduced to placeholders, so renaming variables doesn't hide a copy). Hashed
+k-grams of that stream are winnowed into a fingerprint set, and a MinHash signature of the
+set is indexed with banded LSH: a query only looks at the buckets its bands fall into, so
+finding candidates doesn't mean comparing against every other submission. Candidates are
+confirmed with the exact Jaccard similarity of their fingerprints.
+
+    python src/similarity.py players --threshold 0.8
+"""
+import argparse
+import ast
+import random
+import sys
+import zlib
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from leaderboard import load_progress_store
+
+KGRAM = 5           # Tokens per hashed k-gram
+WINDOW = 4          # Winnowing window (in k-grams)
+NUM_PERM = 64       # MinHash signature length
+BANDS = 16          # LSH bands (NUM_PERM / BANDS rows each)
+MIN_TOKENS = 25     # Shorter solutions all look alike - not worth flagging
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+def normalized_tokens(code: str) -> List[str]:
+    """Pre-order AST node types - variable names and constant values are dropped"""
+    tree = ast.parse(code)
+    tokens = []
+
+    def visit(node):
+        tokens.append(type(node).__name__)
+        if isinstance(node, ast.Constant):
+            tokens.append(type(node.value).__name__)
+        elif isinstance(node, (ast.BinOp, ast.UnaryOp, ast.BoolOp)):
+            tokens.append(type(node.op).__name__)
+        elif isinstance(node, ast.Compare):
+            tokens.extend(type(op).__name__ for op in node.ops)
+        elif isinstance(node, ast.Attribute):
+            tokens.append(node.attr)  # Method names (append, sort...) say what the code does
+        for child in ast.iter_child_nodes(node):
+            # Contexts (Load/Store) and operators are already covered above
+            if not isinstance(child, (ast.expr_context, ast.operator, ast.unaryop, ast.boolop, ast.cmpop)):
+                visit(child)
+
+    for statement in tree.body:
+        visit(statement)
+    return tokens
+
+
+def winnow(tokens: List[str], k: int = KGRAM, window: int = WINDOW) -> Set[int]:
+    """Fingerprints: the minimum k-gram hash of every window of `window` k-grams"""
+    if len(tokens) < k:
+        return set()
+    # crc32 is stable across runs, unlike hash() on strings
+    # Attribute names are kept as tokens, and identifiers can be any Unicode letters
+    hashes = [zlib.crc32("\x1f".join(tokens[i:i + k]).encode('utf-8')) for i in range(len(tokens) - k + 1)]
+    if len(hashes) <= window:
+        return {min(hashes)}
+    return {min(hashes[start:start + window]) for start in range(len(hashes) - window + 1)}
+
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """NUM_PERM universal hash functions, the same for every submission"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+                       for _ in range(num_perm)]
+
+    def signature(self, fingerprints: Set[int]) -> Tuple[int, ...]:
+        return tuple(min((a * value + b) % MERSENNE_PRIME for value in fingerprints)
+                     for a, b in self.params)
+
+
+class Submission:
+    def __init__(self, submission_id: str, player_id: str, fingerprints: Set[int],
+                 signature: Tuple[int, ...]):
+        self.id = submission_id
+        self.player_id = player_id
+        self.fingerprints = fingerprints
+        self.signature = signature
+
+
+class SimilarityIndex:
+    """MinHash LSH over one challenge's submissions"""
+
+    def __init__(self, hasher: MinHasher = None, bands: int = BANDS, min_tokens: int = MIN_TOKENS):
+        self.hasher = hasher or MinHasher()
+        self.bands = bands
+        self.rows = len(self.hasher.params) // bands
+        self.min_tokens = min_tokens
+        self.submissions: Dict[str, Submission] = {}
+        self._buckets: List[Dict[Tuple[int, ...], List[str]]] = [{} for _ in range(bands)]
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> Iterator[Tuple[int, Tuple[int, ...]]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def _fingerprint(self, code: str) -> Optional[Set[int]]:
+        try:
+            tokens = normalized_tokens(code)
+        except SyntaxError:
+            return None
+        if len(tokens) < self.min_tokens:
+            return None
+        return winnow(tokens)
+
+    def add(self, submission_id: str, player_id: str, code: str) -> bool:
+        """Index a submission, returns False if it's too short (or broken) to compare"""
+        fingerprints = self._fingerprint(code)
+        if not fingerprints:
+            return False
+        submission = Submission(submission_id, player_id, fingerprints, self.hasher.signature(fingerprints))
+        self.submissions[submission_id] = submission
+        for band, key in self._band_keys(submission.signature):
+            self._buckets[band].setdefault(key, []).append(submission_id)
+        return True
+
+    def candidates(self, signature: Tuple[int, ...]) -> Set[str]:
+        """Ids sharing at least one LSH band with the signature"""
+        found = set()
+        for band, key in self._band_keys(signature):
+            found.update(self._buckets[band].get(key, ()))
+        return found
+
+    def query(self, code: str, threshold: float = 0.8) -> List[Tuple[str, float]]:
+        """Indexed submissions at least `threshold` similar to `code`, most similar first"""
+        fingerprints = self._fingerprint(code)
+        if not fingerprints:
+            return []
+        matches = []
+        for submission_id in self.candidates(self.hasher.signature(fingerprints)):
+            similarity = jaccard(fingerprints, self.submissions[submission_id].fingerprints)
+            if similarity >= threshold:
+                matches.append((submission_id, similarity))
+        return sorted(matches, key=lambda match: -match[1])
+
+    def clusters(self, threshold: float = 0.8) -> List[dict]:
+        """Groups of different players' submissions linked by similarity >= threshold"""
+        parent = {submission_id: submission_id for submission_id in self.submissions}
+
+        def find(item):
+            while parent[item] != item:
+                parent[item] = parent[parent[item]]
+                item = parent[item]
+            return item
+
+        best: Dict[str, float] = {}
+        for submission in self.submissions.values():
+            for other_id in self.candidates(submission.signature):
+                other = self.submissions[other_id]
+                if other_id <= submission.id or other.player_id == submission.player_id:
+                    continue
+                similarity = jaccard(submission.fingerprints, other.fingerprints)
+                if similarity >= threshold:
+                    parent[find(other_id)] = find(submission.id)
+                    for member in (submission.id, other_id):
+                        best[member] = max(best.get(member, 0.0), similarity)
+
+        groups: Dict[str, List[str]] = {}
+        for submission_id in best:
+            groups.setdefault(find(submission_id), []).append(submission_id)
+        clusters = [{
+            "players": sorted(self.submissions[s].player_id for s in members),
+            "submissions": sorted(members),
+            "similarity": max(best[s] for s in members),
+        } for members in groups.values() if len(members) > 1]
+        return sorted(clusters, key=lambda cluster: (-len(cluster["submissions"]), -cluster["similarity"]))
+
+
+class SimilarityEngine:
+    """One index per challenge, fed from players' accepted solutions"""
+
+    def __init__(self, bands: int = BANDS, min_tokens: int = MIN_TOKENS):
+        self.hasher = MinHasher()
+        self.bands = bands
+        self.min_tokens = min_tokens
+        self.indexes: Dict[str, SimilarityIndex] = {}
+
+    def add(self, challenge_id: str, player_id: str, code: str) -> bool:
+        index = self.indexes.get(challenge_id)
+        if index is None:
+            index = self.indexes[challenge_id] = SimilarityIndex(self.hasher, self.bands, self.min_tokens)
+        return index.add(f"{player_id}:{challenge_id}", player_id, code)
+
+    def add_progress(self, progress_by_player: Dict[str, dict]):
+        """Index the "solutions" the engine saves in each player's progress"""
+        for player_id, progress in progress_by_player.items():
+            for challenge_id, code in progress.get("solutions", {}).items():
+                self.add(challenge_id, player_id, code)
+
+    def report(self, threshold: float = 0.8) -> Dict[str, List[dict]]:
+        """Suspicious clusters per challenge (challenges without any are left out)"""
+        report = {}
+        for challenge_id, index in sorted(self.indexes.items()):
+            clusters = index.clusters(threshold)
+            if clusters:
+                report[challenge_id] = clusters
+        return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find clusters of near-identical solutions")
+    parser.add_argument('players_dir', nargs='?', default="players", help="shared <player_id>.json directory")
+    parser.add_argument('--threshold', type=float, default=0.8, help="fingerprint Jaccard similarity to flag")
+    parser.add_argument('--min-tokens', type=int, default=MIN_TOKENS, help="ignore solutions shorter than this")
+    args = parser.parse_args(argv)
+
+    engine = SimilarityEngine(min_tokens=args.min_tokens)
+    engine.add_progress(load_progress_store(args.players_dir))
+    report = engine.report(args.threshold)
+    if not report:
+        print("No suspicious clusters found.")
+    for challenge_id, clusters in report.items():
+        print(f"\n{challenge_id}: {len(clusters)} cluster(s)")
+        for cluster in clusters:
+            print(f"  {cluster['similarity']:.0%}  {', '.join(cluster['players'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+Per-challenge solve-time statistics: "you were faster than 73% of learners".
+
+Each challenge keeps a Welford running mean/variance and a t-digest of solve times. Both
+take O(1) (amortized, for the digest) per completion, never look at past attempts again,
+and merge: two processes' stats combined are the same as if one had seen every solve.
+The digest keeps at most about COMPRESSION centroids however many solves it has seen,
+so the whole file stays small.
+
+Saving merges only the solves recorded since the last save into whatever is on disk,
+under a lock on a sidecar .lock file, so several game processes (or the daemon) can share
+one stats file.
+"""
+import contextlib
+import json
+import math
+import os
+from typing import Dict, List, Optional, Tuple
+try:
+    import fcntl
+except ImportError:  # Windows - saves from separate processes aren't serialized there
+    fcntl = None
+
+COMPRESSION = 100      # t-digest size/accuracy trade-off - about the most centroids kept
+BUFFER_SIZE = 50       # New values collected before they're merged into the centroids
+MIN_SAMPLES = 5        # Fewer solves than this and a percentile isn't worth showing
+
+
+class RunningStats:
+    """Welford's online mean and variance"""
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: 'RunningStats'):
+        # Chan et al.'s pairwise combination
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_list(self) -> list:
+        return [self.count, self.mean, self.m2]
+
+    @classmethod
+    def from_list(cls, data: list) -> 'RunningStats':
+        return cls(*data)
+
+
+class TDigest:
+    """Merging t-digest: centroids (mean, weight) that are small near the tails
+
+    A centroid may only span one unit of the k1 scale k(q) = C / (2 pi) * asin(2q - 1),
+    which is steep near q = 0 and 1 - so the extremes stay accurate (that's where "faster
+    than 95%" lives) and there are never more than about C centroids.
+    """
+
+    def __init__(self, compression: float = COMPRESSION):
+        self.compression = compression
+        self.centroids: List[List[float]] = []   # [mean, weight], sorted by mean
+        self._buffer: List[Tuple[float, float]] = []
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, weight: float = 1.0):
+        self._buffer.append((value, weight))
+        self.total += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= BUFFER_SIZE:
+            self._compress()
+
+    def merge(self, other: 'TDigest'):
+        other._compress()
+        for mean, weight in other.centroids:
+            self._buffer.append((mean, weight))
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        points = sorted([(mean, weight) for mean, weight in self.centroids] + self._buffer)
+        self._buffer = []
+        merged = []
+        below = 0.0   # Weight of the centroids already finished
+        mean, weight = points[0]
+        k_start = self._scale(0.0)
+        for next_mean, next_weight in points[1:]:
+            if self._scale((below + weight + next_weight) / self.total) - k_start <= 1.0:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                merged.append([mean, weight])
+                below += weight
+                k_start = self._scale(below / self.total)
+                mean, weight = next_mean, next_weight
+        merged.append([mean, weight])
+        self.centroids = merged
+
+    def _scale(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(min(1.0, max(-1.0, 2 * q - 1)))
+
+    def _knots(self):
+        # The cumulative weight at each centroid's mean, pinned at min (0) and max (total)
+        self._compress()
+        knots = [(self.min, 0.0)]
+        below = 0.0
+        for mean, weight in self.centroids:
+            knots.append((mean, below + weight / 2))
+            below += weight
+        knots.append((self.max, self.total))
+        return knots
+
+    def cdf(self, value: float) -> float:
+        """Estimated fraction of the values that are <= value"""
+        if self.total == 0:
+            return math.nan
+        if value < self.min:
+            return 0.0
+        if value >= self.max:
+            return 1.0
+        knots = self._knots()
+        for (left, left_rank), (right, right_rank) in zip(knots, knots[1:]):
+            if value < right:
+                if right == left:
+                    return left_rank / self.total
+                return (left_rank + (right_rank - left_rank) * (value - left) / (right - left)) / self.total
+        return 1.0
+
+    def quantile(self, q: float) -> float:
+        """Estimated value below which a fraction q of the values fall"""
+        if self.total == 0:
+            return math.nan
+        rank = min(max(q, 0.0), 1.0) * self.total
+        knots = self._knots()
+        for (left, left_rank), (right, right_rank) in zip(knots, knots[1:]):
+            if rank <= right_rank:
+                if right_rank == left_rank:
+                    return left
+                return left + (right - left) * (rank - left_rank) / (right_rank - left_rank)
+        return self.max
+
+    def to_dict(self) -> dict:
+        self._compress()
+        return {"centroids": [[round(mean, 4), weight] for mean, weight in self.centroids],
+                "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: dict, compression: float = COMPRESSION) -> 'TDigest':
+        digest = cls(compression)
+        digest.centroids = [list(centroid) for centroid in data["centroids"]]
+        digest.total = float(sum(weight for _, weight in digest.centroids))
+        digest.min = data["min"] if digest.centroids else math.inf
+        digest.max = data["max"] if digest.centroids else -math.inf
+        return digest
+
+
+class ChallengeTimes:
+    """Running stats and a digest of one challenge's solve times"""
+
+    def __init__(self, running: RunningStats = None, digest: TDigest = None):
+        self.running = running or RunningStats()
+        self.digest = digest or TDigest()
+
+    def add(self, seconds: float):
+        self.running.add(seconds)
+        self.digest.add(seconds)
+
+    def merge(self, other: 'ChallengeTimes'):
+        self.running.merge(other.running)
+        self.digest.merge(other.digest)
+
+    def faster_than(self, seconds: float) -> Optional[float]:
+        """Percentage of recorded solves that took longer, None with too few to compare"""
+        if self.running.count < MIN_SAMPLES:
+            return None
+        return 100.0 * (1.0 - self.digest.cdf(seconds))
+
+    def to_dict(self) -> dict:
+        return {"running": self.running.to_list(), "digest": self.digest.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ChallengeTimes':
+        return cls(RunningStats.from_list(data["running"]), TDigest.from_dict(data["digest"]))
+
+
+@contextlib.contextmanager
+def _file_lock(path: str):
+    """Exclusive lock on path + ".lock" - the stats file itself is replaced on every save, so it can't hold one"""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class SolveTimeStats:
+    """ChallengeTimes for every challenge, plus the solves recorded since the last save"""
+
+    def __init__(self, challenges: Dict[str, ChallengeTimes] = None):
+        self.challenges = challenges or {}
+        self._unsaved: Dict[str, ChallengeTimes] = {}
+
+    def record(self, challenge_id: str, seconds: float):
+        for table in (self.challenges, self._unsaved):
+            times = table.get(challenge_id)
+            if times is None:
+                times = table[challenge_id] = ChallengeTimes()
+            times.add(seconds)
+
+    def get(self, challenge_id: str) -> Optional[ChallengeTimes]:
+        return self.challenges.get(challenge_id)
+
+    def faster_than(self, challenge_id: str, seconds: float) -> Optional[float]:
+        times = self.challenges.get(challenge_id)
+        return times.faster_than(seconds) if times else None
+
+    def merge(self, other: 'SolveTimeStats'):
+        for challenge_id, times in other.challenges.items():
+            if challenge_id in self.challenges:
+                self.challenges[challenge_id].merge(times)
+            else:
+                self.challenges[challenge_id] = ChallengeTimes.from_dict(times.to_dict())
+
+    def to_dict(self) -> dict:
+        return {challenge_id: times.to_dict() for challenge_id, times in sorted(self.challenges.items())}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'SolveTimeStats':
+        return cls({challenge_id: ChallengeTimes.from_dict(times) for challenge_id, times in data.items()})
+
+    @classmethod
+    def load(cls, path: str) -> 'SolveTimeStats':
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+    def save(self, path: str):
+        """Merge the unsaved solves into the file (which other processes may have updated)"""
+        if not self._unsaved:
+            return
+        # Another process saving between our load and replace would lose its solves
+        with _file_lock(path):
+            merged = SolveTimeStats.load(path)
+            merged.merge(SolveTimeStats(self._unsaved))
+            temporary = f"{path}.tmp"
+            with open(temporary, 'w') as f:
+                json.dump(merged.to_dict(), f)
+            os.replace(temporary, path)
+        # Pick up everyone else's solves too
+        self.challenges = merged.challenges
+        self._unsaved = {}
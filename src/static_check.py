@@ -0,0 +1,83 @@
+"""
+Static checks on a submission's AST, run before any of its code is executed.
+
+Catches submissions that can't pass (syntax errors, no function with the right number of
+parameters, no loop where one is required) or that import modules we don't run, with a
+message saying exactly what's wrong.
+"""
+import ast
+import textwrap
+from typing import Optional, Tuple
+
+# Modules a solution never needs and that could touch the machine running the grader
+FORBIDDEN_IMPORTS = frozenset({
+    'os', 'subprocess', 'shutil', 'socket', 'ctypes', 'multiprocessing', 'importlib', 'pty',
+})
+
+LOOP_NODES = (ast.For, ast.AsyncFor, ast.While, ast.comprehension)
+
+
+class Requirements:
+    """What a submission must (and mustn't) contain"""
+
+    def __init__(self, function_arity: Optional[int] = None, needs_loop: bool = False,
+                 forbidden_imports=FORBIDDEN_IMPORTS):
+        self.function_arity = function_arity  # None if the challenge is a script
+        self.needs_loop = needs_loop
+        self.forbidden_imports = frozenset(forbidden_imports)
+
+
+def _positional_count(args: ast.arguments) -> int:
+    # Same count find_function_with_param_count uses (co_argcount)
+    return len(args.posonlyargs) + len(args.args)
+
+
+def _imported_modules(tree: ast.AST):
+    """(top-level module name, line) for every import, including __import__('x') calls"""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name.split('.')[0], node.lineno
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            yield node.module.split('.')[0], node.lineno
+        elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+              and node.func.id == '__import__' and node.args
+              and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)):
+            yield node.args[0].value.split('.')[0], node.lineno
+
+
+def has_loop(tree: ast.AST) -> bool:
+    return any(isinstance(node, LOOP_NODES) for node in ast.walk(tree))
+
+
+def precheck(code: str, requirements: Optional[Requirements] = None) -> Tuple[bool, str]:
+    """Check a submission without running it, returns (passed, message)"""
+    requirements = requirements or Requirements()
+    try:
+        # Checkers dedent submissions before running them, so parse the same text
+        tree = ast.parse(textwrap.dedent(code).strip())
+    except SyntaxError as e:
+        return False, f"Syntax error on line {e.lineno}: {e.msg}"
+
+    for module, line in _imported_modules(tree):
+        if module in requirements.forbidden_imports:
+            return False, f"Importing '{module}' isn't allowed here (line {line})"
+
+    if requirements.function_arity is not None:
+        arities = {}
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                arities.setdefault(node.name, _positional_count(node.args))
+            elif isinstance(node, ast.Lambda):
+                arities.setdefault('lambda', _positional_count(node.args))
+        if requirements.function_arity not in arities.values():
+            expected = f"a function that takes {requirements.function_arity} parameter(s)"
+            if not arities:
+                return False, f"Your code must define {expected}"
+            found = ", ".join(f"'{name}' takes {count}" for name, count in arities.items())
+            return False, f"Your code must define {expected} ({found})"
+
+    if requirements.needs_loop and not has_loop(tree):
+        return False, "Try using a for loop or while loop."
+
+    return True, ""
@@ -0,0 +1,96 @@
+"""
+Watches a learner's solution file and hands over its contents once a save has settled.
+
+Editors often write a file in several steps (truncate, write, rename), so a change only
+counts once the file's (mtime, size) has stayed the same for `debounce` seconds. Saves
+that don't change the content (same hash as the last graded version) are skipped.
+"""
+import hashlib
+import os
+import time
+from typing import Callable, Optional
+
+SUBMISSIONS_DIR = "submissions"
+
+
+def content_hash(code: str) -> str:
+    return hashlib.sha256(code.encode('utf-8')).hexdigest()
+
+
+def prepare_submission_file(challenge, directory: str = SUBMISSIONS_DIR, starter_code: str = "") -> str:
+    """Create submissions/<challenge id>.py (kept as is if it exists) and return its path"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{challenge.id}.py")
+    if not os.path.exists(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"# {challenge.title}\n")
+            for line in challenge.description.splitlines():
+                f.write(f"# {line}\n")
+            f.write("# Save this file to have it graded.\n\n")
+            f.write(starter_code)
+    return path
+
+
+class SubmissionWatcher:
+    """Polls one file and returns its code once per settled, changed save"""
+
+    def __init__(self, path: str, debounce: float = 0.5, interval: float = 0.1,
+                 clock: Callable[[], float] = time.monotonic, skip_current: bool = True):
+        self.path = path
+        self.debounce = debounce
+        self.interval = interval
+        self.clock = clock
+        self._signature = self._stat()
+        self._changed_at = None
+        # Whatever is in the file when we start doesn't count as a submission
+        self.last_hash = self._read_hash() if skip_current else None
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self) -> Optional[str]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def _read_hash(self) -> Optional[str]:
+        code = self._read()
+        return content_hash(code) if code is not None else None
+
+    def poll(self) -> Optional[str]:
+        """The file's code if a new save has settled since the last call, else None"""
+        signature = self._stat()
+        now = self.clock()
+        if signature != self._signature:
+            # Still being written (or just saved) - wait for it to settle
+            self._signature = signature
+            self._changed_at = now
+            return None
+        if self._changed_at is None or now - self._changed_at < self.debounce:
+            return None
+
+        self._changed_at = None
+        code = self._read()
+        if code is None:
+            return None
+        digest = content_hash(code)
+        if digest == self.last_hash:
+            return None  # Saved without changes
+        self.last_hash = digest
+        return code
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Block until poll() returns code, or None after `timeout` seconds"""
+        deadline = None if timeout is None else self.clock() + timeout
+        while deadline is None or self.clock() < deadline:
+            code = self.poll()
+            if code is not None:
+                return code
+            time.sleep(self.interval)
+        return None
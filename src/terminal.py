@@ -0,0 +1,76 @@
+"""
+Frame-buffered terminal output - each screen is built in memory and written in one go
+"""
+import os
+import sys
+
+# ANSI sequences: move the cursor home, clear the screen and the scrollback
+CLEAR_SEQUENCE = "\x1b[H\x1b[2J\x1b[3J"
+
+
+class TerminalRenderer:
+    """Collects text for the current frame and writes it with a single syscall"""
+
+    def __init__(self, stream=None):
+        self._stream = stream
+        self._parts = []
+        self._clear_pending = False
+
+    @property
+    def stream(self):
+        # Look up sys.stdout lazily so redirection (tests, piping) keeps working
+        return self._stream if self._stream is not None else sys.stdout
+
+    @property
+    def is_tty(self) -> bool:
+        try:
+            return self.stream.isatty()
+        except (AttributeError, ValueError):
+            return False
+
+    def clear(self):
+        """Start a fresh frame - anything not yet written is dropped"""
+        self._parts = []
+        # Only real terminals understand the clear sequence, piped output just keeps scrolling
+        self._clear_pending = self.is_tty
+
+    def write(self, text: str):
+        self._parts.append(text)
+
+    def print(self, *values, sep: str = " ", end: str = "\n"):
+        """Same signature as the builtin print, but goes into the frame buffer"""
+        self._parts.append(sep.join(str(value) for value in values) + end)
+
+    def flush(self):
+        """Write the buffered frame out with one write call"""
+        if not self._parts and not self._clear_pending:
+            return
+        frame = "".join(self._parts)
+        if self._clear_pending:
+            frame = CLEAR_SEQUENCE + frame
+        self._parts = []
+        self._clear_pending = False
+
+        stream = self.stream
+        fd = self._raw_fd(stream)
+        if fd is None:
+            # Not a TTY (or Windows, where colorama needs to see the text) - use the stream
+            stream.write(frame)
+            stream.flush()
+            return
+
+        # Anything print()-ed directly must land before our frame
+        stream.flush()
+        data = frame.encode(getattr(stream, 'encoding', None) or 'utf-8', errors='replace')
+        while data:
+            written = os.write(fd, data)
+            data = data[written:]
+
+    def _raw_fd(self, stream):
+        # Only bypass the Python stream when we're sure it's a plain terminal
+        if os.name == 'nt' or not self.is_tty:
+            return None
+        try:
+            return stream.fileno()
+        except (AttributeError, ValueError, OSError):
+            return None
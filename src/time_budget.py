@@ -0,0 +1,178 @@
+"""
+Hidden large-input time budgets for the optimization challenges.
+
+The reference solution is timed on this machine (the first time the challenge is graded)
+at a series of doubling-ish input sizes. A submission runs on the same inputs, smallest
+first, and has to finish each one within `factor` times the reference's time. Quadratic
+solutions blow through the budget at a moderate size and are stopped there by an alarm,
+so they fail in well under a second instead of grinding through n=10^6.
+"""
+import contextlib
+import copy
+import signal
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from input_generators import generate_large_input
+from output_compare import describe_mismatch
+
+DEFAULT_FACTOR = 5.0       # Allowed multiple of the reference time
+MIN_BUDGET = 0.05          # Seconds - tiny inputs would otherwise be all timer noise
+ALARM_SLACK = 0.001        # Seconds an itimer may go off ahead of our own clock
+
+
+class _DeadlineExpired(BaseException):
+    """Raised by the alarm inside the user's code - BaseException so `except Exception` can't eat it"""
+
+
+def _raise_deadline(signum, frame):
+    raise _DeadlineExpired()
+
+
+def _fresh(args: tuple) -> tuple:
+    # Generated inputs are flat lists of ints/strings, so a shallow copy is enough for
+    # solutions that modify their input in place (and much cheaper than deepcopy at n=10^6)
+    return tuple(list(arg) if isinstance(arg, list) else copy.deepcopy(arg) for arg in args)
+
+
+def can_use_alarm() -> bool:
+    """SIGALRM only exists on Unix, and Python only runs signal handlers on the main thread"""
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+
+@contextlib.contextmanager
+def alarm(seconds: float, handler: Callable, interval: float = 0.0):
+    """Call handler(signum, frame) after `seconds` (then every `interval`) until the block ends
+
+    Nests inside an alarm that's already running (verify_catalog's per-challenge timeout,
+    say): if that one is due first it still goes off, through its own handler, and when the
+    block ends it's re-armed with whatever time it had left. Main thread only.
+    """
+    outer_handler = signal.getsignal(signal.SIGALRM)
+    outer_delay, outer_interval = signal.getitimer(signal.ITIMER_REAL)
+    now = time.monotonic()
+    outer_due = now + outer_delay if outer_delay else None
+    due = now + seconds
+
+    def on_alarm(signum, frame):
+        now = time.monotonic() + ALARM_SLACK
+        if outer_due is not None and now >= outer_due and callable(outer_handler):
+            outer_handler(signum, frame)
+        if now >= due:
+            handler(signum, frame)
+        else:
+            signal.setitimer(signal.ITIMER_REAL, due - now + ALARM_SLACK, interval)
+
+    signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, min(seconds, outer_delay) if outer_delay else seconds, interval)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, outer_handler)
+        if outer_due is not None:
+            # Overdue already? Then it goes off straight away
+            signal.setitimer(signal.ITIMER_REAL, max(outer_due - time.monotonic(), 1e-6), outer_interval)
+
+
+def run_with_deadline(func: Callable, args: tuple, seconds: float) -> Tuple[bool, float, object]:
+    """Run func(*args), returns (finished in time, elapsed seconds, result)
+
+    Interrupts the call with SIGALRM where possible (main thread on Unix); elsewhere the
+    call runs to completion and is judged on its elapsed time.
+    """
+    started = time.perf_counter()
+    result = None
+    try:
+        with alarm(seconds, _raise_deadline) if can_use_alarm() else contextlib.nullcontext():
+            result = func(*args)
+        finished = True
+    except _DeadlineExpired:
+        finished = False
+    elapsed = time.perf_counter() - started
+    return finished and elapsed <= seconds, elapsed, result
+
+
+class TimeBudget:
+    """Sizes to test, the reference's calibrated times, and how much slower is allowed"""
+
+    def __init__(self, problem: str, sizes: List[int], factor: float = DEFAULT_FACTOR,
+                 min_budget: float = MIN_BUDGET, seed: int = 0):
+        self.problem = problem
+        self.sizes = sorted(sizes)
+        self.factor = factor
+        self.min_budget = min_budget
+        self.seed = seed
+        self.inputs: Dict[int, tuple] = {}
+        self.expected: Dict[int, object] = {}
+        self.reference_times: Optional[Dict[int, float]] = None
+        # Calibration may run on a warm-up thread while a submission wants it too
+        self._calibration_lock = threading.Lock()
+
+    def to_dict(self) -> dict:
+        """Settings only - calibration is specific to the machine, so it's redone after loading"""
+        return {"problem": self.problem, "sizes": list(self.sizes), "factor": self.factor,
+                "min_budget": self.min_budget, "seed": self.seed}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TimeBudget':
+        return cls(**data)
+
+    def calibrate(self, reference: Callable, repeats: int = 3):
+        """Generate the inputs, time the reference on them (best of `repeats`) and keep its answers"""
+        inputs, expected, reference_times = {}, {}, {}
+        for n in self.sizes:
+            inputs[n] = generate_large_input(self.problem, n, self.seed)
+            best = None
+            for _ in range(repeats):
+                args = _fresh(inputs[n])
+                started = time.perf_counter()
+                expected[n] = reference(*args)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+                if elapsed > 0.2:
+                    break  # Long runs aren't noisy enough to be worth repeating
+            reference_times[n] = best
+        self.inputs, self.expected, self.reference_times = inputs, expected, reference_times
+
+    def ensure_calibrated(self, reference: Callable) -> Tuple[Dict[int, tuple], Dict[int, object], Dict[int, float]]:
+        """Calibrate unless that's done already (or wait for a calibration in progress)
+
+        Returns (inputs, expected, reference_times) as they are now, so a reset() from
+        another thread can't pull them out from under the caller.
+        """
+        with self._calibration_lock:
+            if self.reference_times is None:
+                self.calibrate(reference)
+            return self.inputs, self.expected, self.reference_times
+
+    def reset(self):
+        """Drop the calibration and its inputs (up to 10^6 elements per size)"""
+        with self._calibration_lock:
+            self.inputs, self.expected, self.reference_times = {}, {}, None
+
+    def budget(self, n: int, reference_times: Dict[int, float] = None) -> float:
+        reference_times = reference_times if reference_times is not None else self.reference_times
+        return max(reference_times[n] * self.factor, self.min_budget)
+
+    def check(self, user_func: Callable, reference: Callable) -> Tuple[bool, str]:
+        """Run the submission on every size, stopping at the first one over budget"""
+        inputs, expected, reference_times = self.ensure_calibrated(reference)
+
+        elapsed = 0.0
+        for n in self.sizes:
+            args = _fresh(inputs[n])
+            allowed = self.budget(n, reference_times)
+            try:
+                finished, elapsed, result = run_with_deadline(user_func, args, allowed)
+            except Exception as e:
+                return False, f"Your solution failed at n={n:,}: {e}"
+            if not finished:
+                return False, (f"Too slow at n={n:,}: stopped after {allowed:.2f}s. "
+                               "Look for an O(n) or O(n log n) approach.")
+            if result != expected[n]:
+                return False, f"Wrong answer on a large input (n={n:,}). {describe_mismatch(expected[n], result)}"
+
+        largest = self.sizes[-1]
+        ratio = elapsed / max(reference_times[largest], 1e-9)
+        return True, f"Fast enough up to n={largest:,} ({elapsed:.3f}s, {ratio:.1f}x the reference)"
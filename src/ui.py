@@ -1,7 +1,9 @@
-import os
 from typing import List
+import time
 from colorama import init, Fore, Back, Style
 from challenge import Challenge, Category, Difficulty
+from challenge_browser import ChallengeBrowser
+from terminal import TerminalRenderer
 
 # Initialize colorama for cross-platform colored output
 init()
@@ -19,47 +21,89 @@ class GameUI:
         }
         # Store the last submitted code for copy/paste functionality
         self.last_submitted_code = ""
+        # Everything is drawn into a frame buffer and written out in one go before we wait for input
+        self.screen = TerminalRenderer()
+    
+    def echo(self, *values, end="\n"):
+        # Drop-in for print() that draws into the current frame
+        self.screen.print(*values, end=end)
+    
+    def flush(self):
+        # Push the current frame to the terminal
+        self.screen.flush()
     
     def clear_screen(self):
-        # Clear terminal for cleaner display
-        os.system('cls' if os.name == 'nt' else 'clear')
+        # Clear terminal for cleaner display (ANSI escape, no shell spawned)
+        self.screen.clear()
     
     def print_header(self):
         # Main game title and branding
-        print(f"\n{self.colors['header']}")
-        print("=" * 50)
-        print("     CODE CHALLENGE ARENA")
-        print("   Level up your coding skills!")
-        print("=" * 50)
-        print(f"{self.colors['reset']}")
+        self.echo(f"\n{self.colors['header']}")
+        self.echo("=" * 50)
+        self.echo("     CODE CHALLENGE ARENA")
+        self.echo("   Level up your coding skills!")
+        self.echo("=" * 50)
+        self.echo(f"{self.colors['reset']}")
     
     def show_main_menu(self):
         # Display the main menu options
-        print(f"\n{self.colors['info']}What would you like to do?{self.colors['reset']}")
-        print("1. Start a challenge")
-        print("2. View your progress")
-        print("3. View available categories")
-        print("4. Quit")
-        print(f"\n{self.colors['warning']}Enter your choice (1-4): {self.colors['reset']}", end="")
+        self.echo(f"\n{self.colors['info']}What would you like to do?{self.colors['reset']}")
+        self.echo("1. Start a challenge")
+        self.echo("2. View your progress")
+        self.echo("3. View available categories")
+        self.echo("4. Review completed challenges")
+        self.echo("5. Quit")
+        self.echo(f"\n{self.colors['warning']}Enter your choice (1-5): {self.colors['reset']}", end="")
     
     def show_challenges(self, challenges: List[Challenge]):
         # Display available challenges in a nice format
         if not challenges:
-            print(f"\n{self.colors['warning']}No challenges available right now!{self.colors['reset']}")
+            self.echo(f"\n{self.colors['warning']}No challenges available right now!{self.colors['reset']}")
             return
         
-        print(f"\n{self.colors['header']}Available Challenges:{self.colors['reset']}")
-        print("-" * 40)
+        self.echo(f"\n{self.colors['header']}Available Challenges:{self.colors['reset']}")
+        self.echo("-" * 40)
         
+        self._print_challenge_list(challenges)
+    
+    def show_challenge_page(self, browser: ChallengeBrowser):
+        # Render just the visible page of the browser - cost is the page size, not the catalog
+        if browser.total == 0:
+            self.echo(f"\n{self.colors['warning']}No challenges match these filters.{self.colors['reset']}")
+        else:
+            first = browser.first_number()
+            last = first + len(browser.visible()) - 1
+            self.echo(f"\n{self.colors['header']}Available Challenges{self.colors['reset']} "
+                  f"(page {browser.page + 1}/{browser.page_count}, showing {first}-{last} of {browser.total})")
+            self.echo(f"{self.colors['info']}{browser.describe_filters()}{self.colors['reset']}")
+            self.echo("-" * 40)
+            self._print_challenge_list(browser.visible())
+
+        self.echo(f"{self.colors['info']}Commands:{self.colors['reset']} number = pick, n/p = next/prev page, j <page> = jump,")
+        self.echo("  s <recommended|title|difficulty|category|default> = sort, c <category|all> / d <difficulty|all> = filter, 0 = back")
+
+    def _print_challenge_list(self, challenges: List[Challenge]):
         for i, challenge in enumerate(challenges, 1):
             # Color code by difficulty
             difficulty_color = self._get_difficulty_color(challenge.difficulty)
-            print(f"{i}. {challenge.title}")
-            print(f"   Category: {challenge.category.value.replace('_', ' ').title()}")
-            print(f"   Difficulty: {difficulty_color}{challenge.difficulty.name}{self.colors['reset']}")
-            print(f"   {challenge.description[:60]}...")
-            print()
-    
+            self.echo(f"{i}. {challenge.title}")
+            self.echo(f"   Category: {challenge.category.value.replace('_', ' ').title()}")
+            self.echo(f"   Difficulty: {difficulty_color}{challenge.difficulty.name}{self.colors['reset']}")
+            self.echo(f"   {challenge.description[:60]}...")
+            self.echo()
+
+    def get_browser_command(self) -> str:
+        # Free-form input for the challenge browser (numbers and paging commands)
+        self.echo(f"\n{self.colors['warning']}Choose a challenge or enter a command: {self.colors['reset']}", end="")
+        try:
+            self.flush()
+            return input().strip()
+        except (KeyboardInterrupt, EOFError):
+            return '0'
+
+    def show_error(self, message: str):
+        self.echo(f"{self.colors['error']}{message}{self.colors['reset']}")
+
     def _get_difficulty_color(self, difficulty: Difficulty):
         # Return appropriate color for each difficulty level
         colors = {
@@ -73,43 +117,43 @@ class GameUI:
     def show_challenge_details(self, challenge: Challenge):
         # Show full challenge description and rules
         self.clear_screen()
-        print(f"\n{self.colors['header']}Challenge: {challenge.title}{self.colors['reset']}")
-        print("=" * 50)
-        print(f"\nCategory: {challenge.category.value.replace('_', ' ').title()}")
+        self.echo(f"\n{self.colors['header']}Challenge: {challenge.title}{self.colors['reset']}")
+        self.echo("=" * 50)
+        self.echo(f"\nCategory: {challenge.category.value.replace('_', ' ').title()}")
         difficulty_color = self._get_difficulty_color(challenge.difficulty)
-        print(f"Difficulty: {difficulty_color}{challenge.difficulty.name}{self.colors['reset']}")
-        print(f"\nDescription:")
-        print(challenge.description)
-        print(f"\n{self.colors['info']}Available hints: {len(challenge.hints)}{self.colors['reset']}")
-        print(f"\n{self.colors['warning']}HOW TO SUBMIT:{self.colors['reset']}")
-        print("1. Type your Python code (multiple lines allowed)")
-        print("2. When done, press Enter to go to a new line")
-        print(f"3. Type {self.colors['success']}SUBMIT{self.colors['reset']} and press Enter to check your solution")
-        print(f"\nCommands: {self.colors['info']}HINT{self.colors['reset']} (get a hint), {self.colors['info']}EDIT{self.colors['reset']} (edit previous code), {self.colors['info']}QUIT{self.colors['reset']} (return to menu)")
-        print("-" * 50)
+        self.echo(f"Difficulty: {difficulty_color}{challenge.difficulty.name}{self.colors['reset']}")
+        self.echo(f"\nDescription:")
+        self.echo(challenge.description)
+        self.echo(f"\n{self.colors['info']}Available hints: {len(challenge.hints)}{self.colors['reset']}")
+        self.echo(f"\n{self.colors['warning']}HOW TO SUBMIT:{self.colors['reset']}")
+        self.echo("1. Type your Python code (multiple lines allowed)")
+        self.echo("2. When done, press Enter to go to a new line")
+        self.echo(f"3. Type {self.colors['success']}SUBMIT{self.colors['reset']} and press Enter to check your solution")
+        self.echo(f"\nCommands: {self.colors['info']}HINT{self.colors['reset']} (get a hint), {self.colors['info']}EDIT{self.colors['reset']} (edit previous code), {self.colors['info']}WATCH{self.colors['reset']} (write it in your editor, graded on save), {self.colors['info']}QUIT{self.colors['reset']} (return to menu)")
+        self.echo("-" * 50)
     
     def get_user_code(self, editing_mode=False, previous_code=""):
         # Multi-line code input from user
         if editing_mode:
-            print(f"\n{self.colors['info']}Editing Mode - Start fresh or modify your previous code:{self.colors['reset']}")
-            print(f"{self.colors['warning']}Your previous code:{self.colors['reset']}")
+            self.echo(f"\n{self.colors['info']}Editing Mode - Start fresh or modify your previous code:{self.colors['reset']}")
+            self.echo(f"{self.colors['warning']}Your previous code:{self.colors['reset']}")
             # Show the existing code
             if previous_code:
-                print("-" * 30)
+                self.echo("-" * 30)
                 for i, line in enumerate(previous_code.split('\n'), 1):
-                    print(f"{i:2d}: {line}")
-                print("-" * 30)
-            print(f"{self.colors['info']}Type your code below (this will replace the previous code):{self.colors['reset']}")
-            print(f"{self.colors['warning']}Tip: You can copy parts from above if needed. Type SUBMIT when done.{self.colors['reset']}")
+                    self.echo(f"{i:2d}: {line}")
+                self.echo("-" * 30)
+            self.echo(f"{self.colors['info']}Type your code below (this will replace the previous code):{self.colors['reset']}")
+            self.echo(f"{self.colors['warning']}Tip: You can copy parts from above if needed. Type SUBMIT when done.{self.colors['reset']}")
             lines = []
             line_number = 1
             current_indent = 0
         else:
-            print(f"\n{self.colors['info']}Enter your code (type SUBMIT when done):{self.colors['reset']}")
+            self.echo(f"\n{self.colors['info']}Enter your code (type SUBMIT when done):{self.colors['reset']}")
             if self.last_submitted_code:
-                print(f"{self.colors['warning']}Tips: Use 2 spaces for indentation. Auto-indent will help you! Type EDIT to modify your previous code.{self.colors['reset']}")
+                self.echo(f"{self.colors['warning']}Tips: Use 2 spaces for indentation. Auto-indent will help you! Type EDIT to modify your previous code.{self.colors['reset']}")
             else:
-                print(f"{self.colors['warning']}Tips: Use 2 spaces for indentation. Auto-indent will help you!{self.colors['reset']}")
+                self.echo(f"{self.colors['warning']}Tips: Use 2 spaces for indentation. Auto-indent will help you!{self.colors['reset']}")
             lines = []
             line_number = 1
             current_indent = 0
@@ -119,13 +163,14 @@ class GameUI:
                 # Show line numbers and auto-indent prompt
                 prompt = f"{line_number:2d}> " + " " * current_indent
                 
+                self.flush()
                 line = input(prompt)
                 
                 if line.strip().upper() == 'SUBMIT':
                     if lines:  # Make sure they actually wrote some code
                         break
                     else:
-                        print(f"{self.colors['warning']}Please write some code first, then type SUBMIT{self.colors['reset']}")
+                        self.echo(f"{self.colors['warning']}Please write some code first, then type SUBMIT{self.colors['reset']}")
                         continue
                 elif line.strip().upper() == 'HINT':
                     return 'HINT'
@@ -133,10 +178,12 @@ class GameUI:
                     if self.last_submitted_code and not editing_mode:
                         return 'EDIT'
                     else:
-                        print(f"{self.colors['warning']}No previous code to edit, or already in edit mode.{self.colors['reset']}")
+                        self.echo(f"{self.colors['warning']}No previous code to edit, or already in edit mode.{self.colors['reset']}")
                         continue
                 elif line.strip().upper() == 'QUIT':
                     return 'QUIT'
+                elif line.strip().upper() == 'WATCH':
+                    return 'WATCH'
                 
                 # Store the line exactly as typed (including any leading spaces from the prompt)
                 # The prompt already provides the correct indentation, so we just need the user's input
@@ -159,11 +206,11 @@ class GameUI:
                 return 'QUIT'
         
         # Show what they submitted for confirmation
-        print(f"\n{self.colors['info']}Code submitted:{self.colors['reset']}")
-        print("-" * 30)
+        self.echo(f"\n{self.colors['info']}Code submitted:{self.colors['reset']}")
+        self.echo("-" * 30)
         for i, line in enumerate(lines, 1):
-            print(f"{i:2d}: {line}")
-        print("-" * 30)
+            self.echo(f"{i:2d}: {line}")
+        self.echo("-" * 30)
         
         # Store the submitted code for potential editing later
         submitted_code = '\n'.join(lines)
@@ -173,46 +220,103 @@ class GameUI:
     
     def show_hint(self, hint: str):
         # Display hint with special formatting
-        print(f"\n{self.colors['warning']}HINT: {hint}{self.colors['reset']}")
-        print(f"{self.colors['info']}(Note: Using hints will reduce your final score){self.colors['reset']}\n")
+        self.echo(f"\n{self.colors['warning']}HINT: {hint}{self.colors['reset']}")
+        self.echo(f"{self.colors['info']}(Note: Using hints will reduce your final score){self.colors['reset']}\n")
     
-    def show_result(self, success: bool, message: str, score: int = None):
+    def show_result(self, success: bool, message: str, score: int = None, faster_than: float = None):
         # Show challenge completion result
         if success:
-            print(f"\n{self.colors['success']}SUCCESS! {message}{self.colors['reset']}")
+            self.echo(f"\n{self.colors['success']}SUCCESS! {message}{self.colors['reset']}")
             if score:
-                print(f"{self.colors['success']}Score earned: {score} points!{self.colors['reset']}")
+                self.echo(f"{self.colors['success']}Score earned: {score} points!{self.colors['reset']}")
+            if faster_than is not None:
+                self.echo(f"{self.colors['info']}You were faster than {faster_than:.0f}% of learners on this challenge.{self.colors['reset']}")
         else:
-            print(f"\n{self.colors['error']}Not quite right: {message}{self.colors['reset']}")
-            print(f"{self.colors['info']}Try again! You can do this.{self.colors['reset']}")
+            self.echo(f"\n{self.colors['error']}Not quite right: {message}{self.colors['reset']}")
+            self.echo(f"{self.colors['info']}Try again! You can do this.{self.colors['reset']}")
+    
+    def show_no_reviews(self, next_due):
+        # Nothing due yet - say when the next review comes up (next_due is a timestamp or None)
+        if next_due is None:
+            self.echo(f"\n{self.colors['warning']}Complete a challenge first - it'll come back here for review.{self.colors['reset']}")
+            return
+        hours = max(0, next_due - time.time()) / 3600
+        when = f"{hours:.0f} hour(s)" if hours < 48 else f"{hours / 24:.0f} day(s)"
+        self.echo(f"\n{self.colors['success']}No reviews due right now.{self.colors['reset']} Next one in {when}.")
+    
+    def show_review_scheduled(self, card: dict):
+        days = card['interval']
+        self.echo(f"{self.colors['info']}Next review of this challenge in {days:g} day(s).{self.colors['reset']}")
+    
+    def show_watching(self, path: str):
+        # File-watch mode: the learner edits in their own editor and every save is graded
+        self.echo(f"\n{self.colors['info']}Watching {path}{self.colors['reset']}")
+        self.echo("Open it in your editor - every save is checked automatically.")
+        self.echo(f"{self.colors['warning']}Press Ctrl+C to stop watching.{self.colors['reset']}")
+        self.flush()
+    
+    def show_challenge_reload(self, updated: list, removed_ids: list, errors: list):
+        # Problem files changed on disk while the game was running
+        if updated or removed_ids:
+            self.echo(f"{self.colors['info']}Challenges reloaded: {len(updated)} updated, {len(removed_ids)} removed{self.colors['reset']}")
+        for path, error in errors:
+            self.show_error(f"Couldn't load {path}: {error}")
+    
+    def show_unlocks(self, unlocks: list):
+        # Celebrate level-ups, new categories and achievements right after a completion
+        for unlock in unlocks:
+            if unlock.kind == 'level':
+                self.echo(f"\n{self.colors['success']}Level up! You're now {unlock.title}! Keep up the great work!{self.colors['reset']}")
+            elif unlock.kind == 'category':
+                self.echo(f"{self.colors['header']}New category unlocked: {unlock.title}{self.colors['reset']}")
+            else:
+                self.echo(f"{self.colors['warning']}Achievement unlocked: {unlock.title}{self.colors['reset']} - {unlock.description}")
     
     def show_progress(self, stats: dict):
         # Display player progress and achievements
-        print(f"\n{self.colors['header']}Your Progress:{self.colors['reset']}")
-        print("=" * 30)
-        print(f"Level: {self.colors['success']}{stats['level']}{self.colors['reset']}")
-        print(f"Total Score: {self.colors['success']}{stats['score']}{self.colors['reset']}")
-        print(f"Challenges Completed: {self.colors['success']}{stats['completed']}{self.colors['reset']}")
-        print(f"\nUnlocked Categories:")
+        self.echo(f"\n{self.colors['header']}Your Progress:{self.colors['reset']}")
+        self.echo("=" * 30)
+        self.echo(f"Level: {self.colors['success']}{stats['level']}{self.colors['reset']}")
+        self.echo(f"Total Score: {self.colors['success']}{stats['score']}{self.colors['reset']}")
+        self.echo(f"Challenges Completed: {self.colors['success']}{stats['completed']}{self.colors['reset']}")
+        if 'rating' in stats:
+            self.echo(f"Skill Rating: {self.colors['success']}{stats['rating']}{self.colors['reset']}")
+        if stats.get('rank'):
+            self.echo(f"Leaderboard Rank: {self.colors['success']}#{stats['rank']}{self.colors['reset']} of {stats['players']}")
+        if stats.get('achievements'):
+            self.echo(f"Achievements: {self.colors['success']}{', '.join(stats['achievements'])}{self.colors['reset']}")
+        self.echo(f"\nUnlocked Categories:")
         for category in stats['unlocked_categories']:
-            print(f"  - {category.replace('_', ' ').title()}")
+            self.echo(f"  - {category.replace('_', ' ').title()}")
+    
+    def show_leaderboard(self, title: str, entries: List[tuple], player_id: str = None):
+        # Top players on one board, highlighting the current player
+        self.echo(f"\n{self.colors['header']}{title}{self.colors['reset']}")
+        self.echo("-" * 30)
+        if not entries:
+            self.echo("  Nobody has scored here yet.")
+        for position, (name, score) in enumerate(entries, 1):
+            color = self.colors['success'] if name == player_id else ''
+            self.echo(f"{color}{position:3d}. {name:<18} {score:>6}{self.colors['reset']}")
     
     def get_user_choice(self, max_choice: int):
         # Get and validate user input for menu choices
         while True:
             try:
+                self.flush()
                 choice = input().strip()
                 choice_num = int(choice)
                 if 1 <= choice_num <= max_choice:
                     return choice_num
                 else:
-                    print(f"{self.colors['error']}Please enter a number between 1 and {max_choice}: {self.colors['reset']}", end="")
+                    self.echo(f"{self.colors['error']}Please enter a number between 1 and {max_choice}: {self.colors['reset']}", end="")
             except ValueError:
-                print(f"{self.colors['error']}Please enter a valid number: {self.colors['reset']}", end="")
+                self.echo(f"{self.colors['error']}Please enter a valid number: {self.colors['reset']}", end="")
             except KeyboardInterrupt:
                 return None
     
     def pause(self):
         # Wait for user before continuing
-        print(f"\n{self.colors['info']}Press Enter to continue...{self.colors['reset']}")
+        self.echo(f"\n{self.colors['info']}Press Enter to continue...{self.colors['reset']}")
+        self.flush()
         input()
\ No newline at end of file
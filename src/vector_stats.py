@@ -0,0 +1,94 @@
+"""
+Per-test failure statistics, used to run the test vectors most likely to fail first.
+
+Each challenge keeps [runs, failures] per test vector (keyed by the vector's repr, so
+reordering or adding vectors doesn't mix up the counts). Vectors are ordered by their
+smoothed failure rate, so a wrong submission usually hits its failing case on the first
+call and the rest are skipped.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+def vector_key(args: tuple) -> str:
+    return repr(tuple(args))
+
+
+class VectorFailureStats:
+    """[runs, failures] per test vector per challenge, saved as JSON"""
+
+    def __init__(self, stats: Dict[str, Dict[str, List[int]]] = None):
+        self.stats = stats or {}
+        self.dirty = False
+
+    def failure_rate(self, challenge_id: str, key: str) -> float:
+        runs, failures = self.stats.get(challenge_id, {}).get(key, (0, 0))
+        # Laplace smoothing - an unseen vector sits in the middle instead of at 0 or 1
+        return (failures + 1) / (runs + 2)
+
+    def order(self, challenge_id: str, keys: List[str]) -> List[int]:
+        """Indices of `keys`, most likely to fail first (ties keep the authored order)"""
+        rates = [self.failure_rate(challenge_id, key) for key in keys]
+        return sorted(range(len(keys)), key=lambda index: -rates[index])
+
+    def record(self, challenge_id: str, key: str, failed: bool):
+        counts = self.stats.setdefault(challenge_id, {}).setdefault(key, [0, 0])
+        counts[0] += 1
+        if failed:
+            counts[1] += 1
+        self.dirty = True
+
+    def save(self, path: str):
+        if not self.dirty:
+            return
+        with open(path, 'w') as f:
+            json.dump(self.stats, f)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str) -> 'VectorFailureStats':
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+
+class TestRun:
+    """Which challenge is being graded, its stats and whether to stop at the first failure"""
+
+    __test__ = False  # Not a pytest test class
+
+    def __init__(self, challenge_id: str, stats: Optional[VectorFailureStats], fail_fast: bool = True):
+        self.challenge_id = challenge_id
+        self.stats = stats
+        self.fail_fast = fail_fast
+
+    def order(self, keys: List[str]) -> List[int]:
+        if self.stats is None:
+            return list(range(len(keys)))
+        return self.stats.order(self.challenge_id, keys)
+
+    def record(self, key: str, failed: bool):
+        if self.stats is not None:
+            self.stats.record(self.challenge_id, key, failed)
+
+
+_state = threading.local()
+
+
+def active_run() -> Optional[TestRun]:
+    return getattr(_state, 'run', None)
+
+
+@contextmanager
+def ordering(run: TestRun):
+    """Make `run` the one used by run_test_vectors() for the duration of a check"""
+    previous = active_run()
+    _state.run = run
+    try:
+        yield run
+    finally:
+        _state.run = previous
@@ -0,0 +1,192 @@
+"""
+Catalog self-verification: run every challenge's own expected answer through its checker.
+
+    python src/verify_catalog.py --workers 4 --timeout 5
+
+Each worker process loads the catalog once (the initializer), then verifies challenges by
+id. A reference that fails its own checker is broken, one over --slow seconds is slow,
+and a function challenge whose checker never called the function is untested. Problem
+files that don't parse are reported as broken too.
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from challenge import Challenge
+from challenge_parser import ChallengeParser
+from output_compare import BoundedCapture
+from time_budget import alarm, can_use_alarm
+from challenges_data import (create_builtin_challenges, create_pack_challenges,
+                             PROBLEMS_PATH, SKIPPED_EXTERNAL_IDS)
+
+DEFAULT_TIMEOUT = 10.0      # Seconds before a reference counts as hung
+DEFAULT_SLOW = 1.0          # Seconds before a passing reference counts as slow
+VERIFY_BUDGET = 50_000_000  # Executed lines, stops runaway references even without SIGALRM
+STATUSES = ('broken', 'timeout', 'untested', 'slow', 'ok')
+
+
+class CheckTimeout(BaseException):
+    """Raised by the alarm - a BaseException so checkers' `except Exception` can't swallow it"""
+
+
+def load_catalog(problems_directory: str = None, packs_directory: str = None) -> Tuple[List[Challenge], List[dict]]:
+    """Every challenge plus a 'broken' result for each problem file that didn't parse
+
+    The same challenges as get_all_challenges() - only the problem files are loaded
+    differently, so parse failures are reported instead of printed.
+    """
+    challenges = create_builtin_challenges()
+    failures = []
+
+    # Parse file by file (instead of parse_all_problems) so failures are kept, not printed
+    parser = ChallengeParser(problems_directory or PROBLEMS_PATH)
+    if os.path.isdir(parser.problems_directory):
+        for filename in sorted(os.listdir(parser.problems_directory)):
+            if not parser._is_problem_file(filename):
+                continue
+            try:
+                challenge = parser.parse_problem_file(os.path.join(parser.problems_directory, filename))
+            except Exception as e:
+                failures.append({"id": filename, "status": "broken", "seconds": 0.0,
+                                 "message": f"Failed to parse: {e}"})
+                continue
+            if challenge.id not in SKIPPED_EXTERNAL_IDS:
+                challenges.append(challenge)
+
+    challenges.extend(create_pack_challenges(packs_directory))
+    return challenges, failures
+
+
+def verify_challenge(challenge: Challenge, timeout: float = DEFAULT_TIMEOUT,
+                     slow: float = DEFAULT_SLOW) -> dict:
+    """Check a challenge's expected answer against its own checker"""
+    result = {"id": challenge.id, "status": "ok", "seconds": 0.0, "message": ""}
+    if not challenge.expected_answer:
+        result.update(status="untested", message="No expected answer to verify")
+        return result
+
+    # Metering shows whether the checker actually called the reference, and caps loops
+    challenge.metering = True
+    challenge.instruction_budget = VERIFY_BUDGET
+    deadline = alarm(timeout, _raise_timeout) if can_use_alarm() else contextlib.nullcontext()
+    started = time.perf_counter()
+    try:
+        with deadline, contextlib.redirect_stdout(BoundedCapture(limit=0)):
+            success, message = challenge.check_solution(challenge.expected_answer)
+    except CheckTimeout:
+        success, message = None, f"Still running after {timeout:g}s"
+    finally:
+        result["seconds"] = time.perf_counter() - started
+
+    if success is None:
+        result.update(status="timeout", message=message)
+    elif not success:
+        result.update(status="broken", message=message.strip().splitlines()[0])
+    elif challenge.requirements.function_arity is not None and challenge.execution_cost is None:
+        result.update(status="untested", message="Checker passed without calling the function")
+    elif result["seconds"] > slow:
+        result.update(status="slow", message=f"Took {result['seconds']:.2f}s")
+    return result
+
+
+def _raise_timeout(signum, frame):
+    raise CheckTimeout()
+
+
+# Per-worker catalog, loaded once by the pool initializer
+_worker_catalog: Dict[str, Challenge] = {}
+
+
+def _init_worker(problems_directory: Optional[str], packs_directory: Optional[str]):
+    with contextlib.redirect_stdout(io.StringIO()):
+        challenges, _ = load_catalog(problems_directory, packs_directory)
+    _worker_catalog.update((challenge.id, challenge) for challenge in challenges)
+
+
+def _verify_by_id(args: Tuple[str, float, float]) -> dict:
+    challenge_id, timeout, slow = args
+    return verify_challenge(_worker_catalog[challenge_id], timeout, slow)
+
+
+def verify_catalog(workers: int = None, timeout: float = DEFAULT_TIMEOUT, slow: float = DEFAULT_SLOW,
+                   problems_directory: str = None, packs_directory: str = None) -> dict:
+    """Verify every challenge on a process pool, returns the report"""
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        challenges, results = load_catalog(problems_directory, packs_directory)
+
+    seen = set()
+    ids = []
+    for challenge in challenges:
+        if challenge.id in seen:
+            results.append({"id": challenge.id, "status": "broken", "seconds": 0.0,
+                            "message": "Duplicate challenge id - only one of them is playable"})
+            continue
+        seen.add(challenge.id)
+        ids.append(challenge.id)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(ids) or 1))
+    pool = multiprocessing.Pool(workers, initializer=_init_worker,
+                                initargs=(problems_directory, packs_directory))
+    try:
+        pending = [(challenge_id, pool.apply_async(_verify_by_id, ((challenge_id, timeout, slow),)))
+                   for challenge_id in ids]
+        for challenge_id, pending_result in pending:
+            try:
+                # The worker's alarm should fire first - this catches workers that can't use one
+                results.append(pending_result.get(timeout + 5))
+            except multiprocessing.TimeoutError:
+                results.append({"id": challenge_id, "status": "timeout", "seconds": timeout,
+                                "message": f"No result after {timeout:g}s"})
+    finally:
+        # terminate() rather than close() so a hung worker can't keep us waiting
+        pool.terminate()
+        pool.join()
+
+    results.sort(key=lambda result: (STATUSES.index(result["status"]), result["id"]))
+    return {
+        "challenges": len(challenges),
+        "workers": workers,
+        "elapsed": time.perf_counter() - started,
+        "counts": {status: sum(1 for r in results if r["status"] == status) for status in STATUSES},
+        "results": results,
+    }
+
+
+def print_report(report: dict, show_ok: bool = False):
+    counts = report["counts"]
+    print(f"Verified {report['challenges']} challenges on {report['workers']} worker(s) "
+          f"in {report['elapsed']:.1f}s")
+    print(", ".join(f"{counts[status]} {status}" for status in STATUSES))
+    for result in report["results"]:
+        if result["status"] == "ok" and not show_ok:
+            continue
+        print(f"  {result['status'].upper():<9}{result['id']:<30}{result['seconds']:>7.2f}s  {result['message']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run every challenge's expected answer through its own checker")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="seconds before a check counts as hung")
+    parser.add_argument('--slow', type=float, default=DEFAULT_SLOW, help="seconds before a check counts as slow")
+    parser.add_argument('--problems', help="problems directory (default: $CHALLENGE_PROBLEMS_DIR)")
+    parser.add_argument('--packs', help="packs directory (default: $CHALLENGE_PACKS_DIR)")
+    parser.add_argument('--all', action='store_true', help="also list challenges that passed")
+    parser.add_argument('--json', action='store_true', help="print the raw report as JSON")
+    args = parser.parse_args(argv)
+
+    report = verify_catalog(args.workers, args.timeout, args.slow, args.problems, args.packs)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.all)
+    return 1 if report["counts"]["broken"] or report["counts"]["timeout"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
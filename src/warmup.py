@@ -0,0 +1,82 @@
+"""
+Speculative warm-up: prepare a challenge's checker while the learner is still reading.
+
+The first submission to a challenge pays for one-off work - compiling or importing the
+reference, computing the expected outputs, reading a pack entry and, for the optimization
+challenges, generating the large inputs and timing the reference on them (seconds). When a
+challenge is shown, Warmup does that work on a background thread. If the learner leaves
+without submitting, the preparation is cancelled and whatever it built is released (at
+once, or as soon as the background work finishes) - unless the challenge has been shown
+again in the meantime, in which case the newer preparation owns that state.
+"""
+import threading
+from typing import Optional
+from challenge import Challenge
+
+
+class Preparation:
+    """One background Challenge.prepare() call that can be cancelled"""
+
+    def __init__(self, challenge: Challenge):
+        self.challenge = challenge
+        self.error: Optional[BaseException] = None
+        self._done = threading.Event()
+        self._cancelled = False
+        self._lock = threading.Lock()
+        challenge.warmup_generation += 1
+        self.generation = challenge.warmup_generation
+        self._thread = threading.Thread(target=self._run, name=f"warmup-{challenge.id}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            if not self._cancelled:
+                self.challenge.prepare()
+        except Exception as e:
+            # Not fatal - the first submission just does the work itself (and reports any error)
+            self.error = e
+        with self._lock:
+            self._done.set()
+            if self._cancelled:
+                self._release()
+
+    def _release(self):
+        # A newer preparation of the same challenge shares (and may be using) this state
+        if self.challenge.warmup_generation == self.generation:
+            self.challenge.release()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def cancel(self):
+        """Drop the prepared state - now if it's ready, otherwise when the work finishes"""
+        with self._lock:
+            self._cancelled = True
+            if self._done.is_set():
+                self._release()
+
+
+class Warmup:
+    """Prepares whichever challenge is on screen"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.current: Optional[Preparation] = None
+
+    def start(self, challenge: Challenge) -> Optional[Preparation]:
+        self.cancel()  # Only one challenge is on screen at a time
+        if self.enabled:
+            self.current = Preparation(challenge)
+        return self.current
+
+    def keep(self):
+        # The learner submitted - the prepared state is in use, leave it with the challenge
+        self.current = None
+
+    def cancel(self):
+        if self.current is not None:
+            self.current.cancel()
+            self.current = None